@@ -12,16 +12,31 @@ import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest, RandomForestClassifier
 from sklearn.linear_model import LinearRegression
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.metrics.pairwise import cosine_similarity
 import joblib
 import threading
 import time
+import queue
+import copy
+from receipts import format_currency, ReceiptGenerator
+import query_tracing
+import inference_metrics
+import metrics_exporter
+import cold_archive
+import tree_compiler
+import db_backup
+import fraud_rules
+import online_detector
+import transfer_graph
+from fraud_rules import known_counterparties
+from velocity_features import velocity_store
+from write_coalescer import coalescer
 
 
 # Database connection and cursor
-conn = sqlite3.connect("bank.db", check_same_thread=False)
+conn = query_tracing.connect("bank.db", check_same_thread=False)
 cursor = conn.cursor()
 
 
@@ -38,11 +53,52 @@ def execute_with_retry(query, params=()):
             return
         except OperationalError as e:
             if "database is locked" in str(e) and attempt < MAX_RETRIES - 1:
+                metrics_exporter.DB_LOCK_RETRIES.inc()
                 time.sleep(RETRY_DELAY)
             else:
+                if "database is locked" in str(e):
+                    metrics_exporter.DB_LOCK_FAILURES.inc()
                 raise
 
 
+# ---------- Ledger writes ----------
+# Run on the write coalescer's thread, each inside its own savepoint of a
+# batch transaction (see write_coalescer.py)
+def _add_to_balance(cur, account_number, delta, floor=None):
+    """Add delta to a balance and return the new balance; None, changing nothing, if it would go below floor"""
+    if floor is None:
+        cur.execute("UPDATE accounts SET balance = balance + ? WHERE account_number=?", (delta, account_number))
+    else:
+        cur.execute("UPDATE accounts SET balance = balance + ? WHERE account_number=? AND balance + ? >= ?",
+                    (delta, account_number, delta, floor))
+    if cur.rowcount == 0:
+        return None
+    cur.execute("SELECT balance FROM accounts WHERE account_number=?", (account_number,))
+    return cur.fetchone()[0]
+
+def _insert_ledger_entry(cur, entry):
+    """Insert an entry from Account._ledger_entry with its category and fraud flag; returns the transaction id"""
+    cur.execute("""
+        INSERT INTO transactions 
+        (account_number, type, amount, description, timestamp, reference_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (entry["account_number"], entry["type"], entry["amount"], entry["description"],
+          entry["timestamp"], entry["reference_id"]))
+    transaction_id = cur.lastrowid
+    if entry["category"] is not None:
+        cur.execute("""
+            INSERT OR REPLACE INTO transaction_categories 
+            (transaction_id, category) VALUES (?, ?)
+        """, (transaction_id, entry["category"]))
+    if entry["is_fraud"]:
+        cur.execute("""
+            INSERT INTO flagged_transactions 
+            (transaction_ref, account_number, flagged_at, status)
+            VALUES (?, ?, ?, ?)
+        """, (entry["reference_id"], entry["account_number"], entry["timestamp"], 'pending'))
+    return transaction_id
+
+
 
 
 # # Create otps table
@@ -176,6 +232,19 @@ CREATE TABLE IF NOT EXISTS transaction_categories (
     FOREIGN KEY(transaction_id) REFERENCES transactions(id)
 )
 ''')
+
+# User corrections that feed incremental training of the category classifier
+cursor.execute('''
+CREATE TABLE IF NOT EXISTS category_corrections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    corrected_by TEXT,
+    corrected_at TEXT NOT NULL,
+    FOREIGN KEY(transaction_id) REFERENCES transactions(id)
+)
+''')
 conn.commit()
 
 
@@ -190,6 +259,36 @@ CREATE TABLE IF NOT EXISTS savings_goals_history (
     )
 ''')
 
+# Composite index backing keyset pagination of an account's history
+cursor.execute('''
+CREATE INDEX IF NOT EXISTS idx_transactions_account_time
+ON transactions(account_number, timestamp, id)
+''')
+conn.commit()
+
+# Tables tracking transactions moved to the Parquet archive
+cold_archive.ensure_schema(conn)
+
+# Per-account velocity counters for fraud scoring, from the last 7 days of the ledger
+velocity_store.rebuild(conn)
+known_counterparties.rebuild(conn)
+# Money-flow graph of the same window, scanned for mules and rings
+transfer_graph.graph.rebuild(conn)
+# Streaming anomaly detector, as it was at the last checkpoint
+online_detector.detector.load()
+
+
+def rebuild_ledger_state():
+    """Refill the in-memory state derived from the ledger, after a restore replaced bank.db"""
+    db = query_tracing.connect("bank.db")
+    try:
+        velocity_store.rebuild(db)
+        known_counterparties.rebuild(db)
+        transfer_graph.graph.rebuild(db)
+        online_detector.detector.rebuild(db)
+    finally:
+        db.close()
+
 
 class Account:
     def __init__(self, name, account_number, pin, username, national_id, address,
@@ -242,12 +341,16 @@ class Account:
         return Account(*row) if row else None
 
     def deposit(self, amount):
-        self.balance += amount
-        execute_with_retry("UPDATE accounts SET balance=? WHERE account_number=?", 
-                         (self.balance, self.account_number))
         ref = str(uuid.uuid4())[:8]
-        self._record_transaction("Deposit", amount, "Deposit made", ref)
-        conn.commit()
+        entry = self._ledger_entry("Deposit", amount, "Deposit made", ref)
+
+        def write(cur):
+            balance = _add_to_balance(cur, self.account_number, amount)
+            _insert_ledger_entry(cur, entry)
+            return balance
+
+        self.balance = coalescer.execute(write)
+        self._recorded(entry)
         return ref
     
 
@@ -262,15 +365,23 @@ class Account:
     
 
     def withdraw(self, amount):
-        if self.balance >= amount:
-            self.balance -= amount
-            cursor.execute("UPDATE accounts SET balance=? WHERE account_number=?", 
-                         (self.balance, self.account_number))
-            reference_id = str(uuid.uuid4())[:8]
-            self._record_transaction("Withdrawal", amount, "Withdrawal made", reference_id)
-            conn.commit()
-            return reference_id
-        return None
+        if self.balance < amount:
+            return None
+        reference_id = str(uuid.uuid4())[:8]
+        entry = self._ledger_entry("Withdrawal", amount, "Withdrawal made", reference_id)
+
+        def write(cur):
+            balance = _add_to_balance(cur, self.account_number, -amount, floor=0)
+            if balance is not None:
+                _insert_ledger_entry(cur, entry)
+            return balance
+
+        balance = coalescer.execute(write)
+        if balance is None:
+            return None
+        self.balance = balance
+        self._recorded(entry)
+        return reference_id
 
     def send_money(self, recipient_acc_no, amount):
         try:
@@ -281,53 +392,72 @@ class Account:
                 return None, "Recipient account is frozen"
             if self.balance < amount:
                 return None, "Insufficient funds"
-                
-            self.balance -= amount
-            recipient.balance += amount
-            
-            cursor.execute("UPDATE accounts SET balance=? WHERE account_number=?", 
-                         (self.balance, self.account_number))
-            cursor.execute("UPDATE accounts SET balance=? WHERE account_number=?", 
-                         (recipient.balance, recipient.account_number))
-            
+
             reference_id = str(uuid.uuid4())[:8]
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Sender transaction
-            cursor.execute("""
-                INSERT INTO transactions 
-                (account_number, type, amount, description, timestamp, reference_id)
-                VALUES (?, 'Transfer Out', ?, ?, ?, ?)
-            """, (self.account_number, -amount, f"To: {recipient_acc_no}", timestamp, reference_id))
-            
-            # Recipient transaction
-            cursor.execute("""
-                INSERT INTO transactions 
-                (account_number, type, amount, description, timestamp, reference_id)
-                VALUES (?, 'Transfer In', ?, ?, ?, ?)
-            """, (recipient_acc_no, amount, f"From: {self.account_number}", timestamp, reference_id))
-            
-            conn.commit()
+            transaction = {
+                'account_number': self.account_number,
+                'type': 'Transfer Out',
+                'amount': amount,
+                'timestamp': timestamp,
+                'description': f"To: {recipient_acc_no}",
+                'counterparty': recipient_acc_no,
+            }
+            is_fraud, fraud_source = fraud_cascade.check(transaction)
+            fraud_detector.get_online_score(transaction)  # exported with the other scores
+
+            def write(cur):
+                balance = _add_to_balance(cur, self.account_number, -amount, floor=0)
+                if balance is None:
+                    return None
+                _add_to_balance(cur, recipient_acc_no, amount)
+
+                # Sender transaction
+                cur.execute("""
+                    INSERT INTO transactions 
+                    (account_number, type, amount, description, timestamp, reference_id)
+                    VALUES (?, 'Transfer Out', ?, ?, ?, ?)
+                """, (self.account_number, -amount, f"To: {recipient_acc_no}", timestamp, reference_id))
+
+                # Recipient transaction
+                cur.execute("""
+                    INSERT INTO transactions 
+                    (account_number, type, amount, description, timestamp, reference_id)
+                    VALUES (?, 'Transfer In', ?, ?, ?, ?)
+                """, (recipient_acc_no, amount, f"From: {self.account_number}", timestamp, reference_id))
+
+                if is_fraud:
+                    cur.execute("""
+                        INSERT INTO flagged_transactions 
+                        (transaction_ref, account_number, flagged_at, status)
+                        VALUES (?, ?, ?, 'pending')
+                    """, (reference_id, self.account_number, timestamp))
+                return balance
+
+            balance = coalescer.execute(write)
+            if balance is None:
+                return None, "Insufficient funds"
+            self.balance = balance
+            velocity_store.record(self.account_number, "Transfer Out", amount, timestamp)
+            online_detector.detector.learn(transaction)
+            known_counterparties.record(self.account_number, recipient_acc_no)
+            transfer_graph.graph.record(self.account_number, recipient_acc_no, amount, timestamp)
+            metrics_exporter.TRANSACTIONS.inc("Transfer Out")
+            metrics_exporter.TRANSACTION_AMOUNT.inc("Transfer Out", amount=abs(amount))
+            metrics_exporter.TRANSACTIONS.inc("Transfer In")
+            metrics_exporter.TRANSACTION_AMOUNT.inc("Transfer In", amount=abs(amount))
+            if is_fraud:
+                metrics_exporter.FRAUD_FLAGS.inc("rules" if fraud_source.startswith("rule:") else "model")
             return reference_id, "Transfer successful"
             
         except Exception as e:
-            conn.rollback()
             return None, str(e)
 
-    def _record_transaction(self, txn_type, amount, description, reference_id):
+    def _ledger_entry(self, txn_type, amount, description, reference_id):
+        """A new ledger row with its fraud check and category, worked out before the write"""
         # Get current timestamp
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # First insert the transaction record
-        cursor.execute("""
-            INSERT INTO transactions 
-            (account_number, type, amount, description, timestamp, reference_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (self.account_number, txn_type, amount, description, timestamp, reference_id))
-        
-        # Get the auto-incremented transaction ID
-        transaction_id = cursor.lastrowid
-        
+
         # Prepare transaction data for fraud detection
         transaction_data = {
             'account_number': self.account_number,
@@ -336,61 +466,184 @@ class Account:
             'timestamp': timestamp,
             'description': description
         }
-        
+
         # Fraud check only for withdrawals/transfers
-        is_fraud = False
+        is_fraud, fraud_source, online_score = False, None, None
         if txn_type in ["Withdrawal", "Transfer Out"]:
-            is_fraud = fraud_detector.is_fraudulent(transaction_data)
-            
+            is_fraud, fraud_source = fraud_cascade.check(transaction_data)
+            online_score = fraud_detector.get_online_score(transaction_data)
+
             # Log the detection result
-            print(f"Transaction {reference_id}: Amount {amount}, Type {txn_type} - {'FRAUD DETECTED' if is_fraud else 'Legitimate'}")
-            
-            if is_fraud:
-                self._flag_transaction(reference_id)
-        
+            print(f"Transaction {reference_id}: Amount {amount}, Type {txn_type} - {'FRAUD DETECTED' if is_fraud else 'Legitimate'} ({fraud_source}, online score {online_score:.2f})")
+
         # Transaction categorization
+        category = None
         try:
             category = transaction_classifier.categorize(description)
-            cursor.execute("""
-                INSERT OR REPLACE INTO transaction_categories 
-                (transaction_id, category) VALUES (?, ?)
-            """, (transaction_id, category))
         except Exception as e:
             print(f"Failed to categorize transaction: {e}")
-        
-        conn.commit()
 
-    def _flag_transaction(self, reference_id):
-        try:
-            cursor.execute("""
-                INSERT INTO flagged_transactions 
-                (transaction_ref, account_number, flagged_at, status)
-                VALUES (?, ?, ?, ?)
-            """, (reference_id, self.account_number, 
-                  datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'pending'))
-            conn.commit()
-        except:
-            pass
+        return dict(transaction_data, reference_id=reference_id, is_fraud=is_fraud,
+                    fraud_source=fraud_source, online_score=online_score, category=category)
+
+    def _recorded(self, entry):
+        """Count a ledger entry once its batch has committed"""
+        velocity_store.record(entry["account_number"], entry["type"], entry["amount"], entry["timestamp"])
+        online_detector.detector.learn(entry)
+        metrics_exporter.TRANSACTIONS.inc(entry["type"])
+        metrics_exporter.TRANSACTION_AMOUNT.inc(entry["type"], amount=abs(entry["amount"]))
+        if entry["is_fraud"]:
+            metrics_exporter.FRAUD_FLAGS.inc("rules" if entry["fraud_source"].startswith("rule:") else "model")
+
+    def _record_transaction(self, txn_type, amount, description, reference_id):
+        entry = self._ledger_entry(txn_type, amount, description, reference_id)
+        coalescer.execute(_insert_ledger_entry, entry)
+        self._recorded(entry)
 
     def get_transaction_history(self, limit=None):
         query = """
-            SELECT type, amount, description, timestamp, reference_id 
+            SELECT id, type, amount, description, timestamp, reference_id 
             FROM transactions 
             WHERE account_number=? 
-            ORDER BY timestamp DESC
+            ORDER BY timestamp DESC, id DESC
         """
+        params = (self.account_number,)
         if limit:
-            query += f" LIMIT {limit}"
-        cursor.execute(query, (self.account_number,))
-        return cursor.fetchall()
+            query += " LIMIT ?"
+            params += (int(limit),)
+        cursor.execute(query, params)
+        rows = self._with_archived(cursor.fetchall(), limit)
+        return [row[1:] for row in rows]
+
+    def _with_archived(self, rows, limit, after=None, filters=None):
+        """Merge in archived rows that belong among the newest ``limit`` rows.
+
+        When the hot rows already fill the limit, only archived months
+        reaching past the oldest of them are read.
+        """
+        since = rows[-1][4] if limit and len(rows) >= limit else None
+        archived = cold_archive.archive.history(cursor, self.account_number, after, limit, filters, since)
+        if not archived:
+            return rows
+        rows = sorted(rows + archived, key=lambda row: (row[4], row[0]), reverse=True)
+        return rows[:limit] if limit else rows
+
+    def get_history_page(self, after=None, page_size=20, filters=None):
+        """Fetch one page of history, newest first.
+
+        ``after`` is the (timestamp, id) of the last row of the previous page.
+        Seeking past it on idx_transactions_account_time makes every page cost
+        the same, however deep. Returns (rows, next_cursor); next_cursor is
+        None on the last page.
+        """
+        query = """
+            SELECT id, type, amount, description, timestamp, reference_id
+            FROM transactions
+            WHERE account_number=?
+        """
+        params = [self.account_number]
+        if after:
+            query += " AND (timestamp, id) < (?, ?)"
+            params += [after[0], after[1]]
+
+        filters = filters or {}
+        if filters.get("types"):
+            query += f" AND type IN ({','.join('?' * len(filters['types']))})"
+            params += list(filters["types"])
+        if filters.get("start_date"):
+            query += " AND timestamp >= ?"
+            params.append(f"{filters['start_date']} 00:00:00")
+        if filters.get("end_date"):
+            query += " AND timestamp <= ?"
+            params.append(f"{filters['end_date']} 23:59:59")
+        if filters.get("min_amount") is not None:
+            query += " AND ABS(amount) >= ?"
+            params.append(filters["min_amount"])
+        if filters.get("max_amount") is not None:
+            query += " AND ABS(amount) <= ?"
+            params.append(filters["max_amount"])
+
+        # Fetch one extra row to learn whether another page exists
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(int(page_size) + 1)
+        cursor.execute(query, params)
+        rows = self._with_archived(cursor.fetchall(), int(page_size) + 1, after, filters)
+
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, (rows[-1][4], rows[-1][0])
+
+    def iter_history(self, after=None, page_size=100, filters=None):
+        """Yield history rows newest first, fetching one keyset page at a time"""
+        while True:
+            rows, after = self.get_history_page(after, page_size, filters)
+            yield from rows
+            if after is None:
+                return
 
     def get_transaction_by_reference(self, reference_id):
+        """(type, amount, description, timestamp, reference_id), from bank.db or the archive"""
         cursor.execute("""
             SELECT type, amount, description, timestamp, reference_id 
             FROM transactions 
             WHERE account_number=? AND reference_id=?
         """, (self.account_number, reference_id))
-        return cursor.fetchone()
+        row = cursor.fetchone()
+        if row:
+            return row
+        archived = cold_archive.archive.find(cursor, self.account_number, reference_id)
+        return archived[0][1:] if archived else None
+
+    def get_transaction_category(self, reference_id):
+        cursor.execute("""
+            SELECT c.category
+            FROM transactions t
+            LEFT JOIN transaction_categories c ON c.transaction_id = t.id
+            WHERE t.account_number=? AND t.reference_id=?
+        """, (self.account_number, reference_id))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        archived = cold_archive.archive.find(cursor, self.account_number, reference_id)
+        return archived[1] if archived else None
+
+    def correct_transaction_category(self, reference_id, category):
+        """Store a user's category correction and queue it for classifier training"""
+        if category not in transaction_classifier.categories:
+            return False, "Unknown category"
+
+        cursor.execute("""
+            SELECT id, description FROM transactions
+            WHERE account_number=? AND reference_id=?
+        """, (self.account_number, reference_id))
+        row = cursor.fetchone()
+        if not row:
+            # archived months are immutable Parquet files
+            if cold_archive.archive.find(cursor, self.account_number, reference_id):
+                return False, "Archived transactions can't be recategorized"
+            return False, "Transaction not found"
+        transaction_id, description = row
+
+        try:
+            cursor.execute("""
+                INSERT OR REPLACE INTO transaction_categories
+                (transaction_id, category) VALUES (?, ?)
+            """, (transaction_id, category))
+            cursor.execute("""
+                INSERT INTO category_corrections
+                (transaction_id, description, category, corrected_by, corrected_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (transaction_id, description or "", category, self.username,
+                  datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            correction_id = cursor.lastrowid
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            return False, str(e)
+
+        transaction_classifier.add_correction(correction_id, description or "", category)
+        return True, f"Category updated to {category}"
 
     def update_profile_in_db(self):
         cursor.execute("""
@@ -443,38 +696,38 @@ class Account:
             return False, "Insufficient funds in main account"
         
         try:
-            # Get current goal amount
-            cursor.execute("SELECT current_amount FROM savings_goals WHERE id=?", (goal_id,))
-            current = cursor.fetchone()[0]
-            new_goal_amount = current + amount
-            
-            # Update balances
-            self.balance -= amount
-            cursor.execute("UPDATE accounts SET balance=? WHERE account_number=?", 
-                         (self.balance, self.account_number))
-            cursor.execute("UPDATE savings_goals SET current_amount=? WHERE id=?", 
-                         (new_goal_amount, goal_id))
-            
-            # Record contribution history - FIXED
-            cursor.execute("""
-                INSERT INTO savings_goals_history 
-                (goal_id, contribution_amount, current_amount, timestamp)
-                VALUES (?, ?, ?, ?)
-            """, (goal_id, amount, new_goal_amount, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
-            
-            # Record transaction
             reference_id = str(uuid.uuid4())[:8]
-            self._record_transaction(
-                "Savings Contribution", 
-                amount, 
-                f"Contribution to goal ID: {goal_id}", 
-                reference_id
-            )
-            
-            conn.commit()
+            entry = self._ledger_entry("Savings Contribution", amount,
+                                       f"Contribution to goal ID: {goal_id}", reference_id)
+
+            def write(cur):
+                # Update balances
+                balance = _add_to_balance(cur, self.account_number, -amount, floor=0)
+                if balance is None:
+                    return None
+                cur.execute("UPDATE savings_goals SET current_amount = current_amount + ? WHERE id=?",
+                            (amount, goal_id))
+                cur.execute("SELECT current_amount FROM savings_goals WHERE id=?", (goal_id,))
+                new_goal_amount = cur.fetchone()[0]
+
+                # Record contribution history - FIXED
+                cur.execute("""
+                    INSERT INTO savings_goals_history 
+                    (goal_id, contribution_amount, current_amount, timestamp)
+                    VALUES (?, ?, ?, ?)
+                """, (goal_id, amount, new_goal_amount, entry["timestamp"]))
+
+                # Record transaction
+                _insert_ledger_entry(cur, entry)
+                return balance
+
+            balance = coalescer.execute(write)
+            if balance is None:
+                return False, "Insufficient funds in main account"
+            self.balance = balance
+            self._recorded(entry)
             return True, f"Successfully added {format_currency(amount)} to goal"
         except Exception as e:
-            conn.rollback()
             return False, str(e)
 
     def withdraw_from_goal(self, goal_id, amount):
@@ -488,31 +741,33 @@ class Account:
             
             if current_amount < amount:
                 return False, "Insufficient funds in goal"
-                
-            # Perform withdrawal
-            self.balance += amount
-            cursor.execute("UPDATE accounts SET balance=? WHERE account_number=?", 
-                         (self.balance, self.account_number))
-            
-            cursor.execute("""
-                UPDATE savings_goals
-                SET current_amount = current_amount - ?
-                WHERE id=? AND account_number=?
-            """, (amount, goal_id, self.account_number))
-            
-            # Record transaction
+
             reference_id = str(uuid.uuid4())[:8]
-            self._record_transaction(
-                "Savings Withdrawal", 
-                amount, 
-                f"Withdrawal from goal ID: {goal_id}", 
-                reference_id
-            )
-            
-            conn.commit()
+            entry = self._ledger_entry("Savings Withdrawal", amount,
+                                       f"Withdrawal from goal ID: {goal_id}", reference_id)
+
+            def write(cur):
+                # Perform withdrawal, unless another one emptied the goal meanwhile
+                cur.execute("""
+                    UPDATE savings_goals
+                    SET current_amount = current_amount - ?
+                    WHERE id=? AND account_number=? AND current_amount >= ?
+                """, (amount, goal_id, self.account_number, amount))
+                if cur.rowcount == 0:
+                    return None
+                balance = _add_to_balance(cur, self.account_number, amount)
+
+                # Record transaction
+                _insert_ledger_entry(cur, entry)
+                return balance
+
+            balance = coalescer.execute(write)
+            if balance is None:
+                return False, "Insufficient funds in goal"
+            self.balance = balance
+            self._recorded(entry)
             return True, f"Successfully withdrew {format_currency(amount)} from goal"
         except Exception as e:
-            conn.rollback()
             return False, str(e)
 
     def delete_savings_goal(self, goal_id):
@@ -546,19 +801,42 @@ initialize_admin_account()
 
 class CurrencyConverter:
     SUPPORTED_CURRENCIES = ["USD", "EUR", "GBP", "KES", "GHS"]
-    
+    RATES_TTL = 600          # seconds; the converter page asks for rates on every rerun
+    FALLBACK_RATES_TTL = 60  # retry sooner when only the built-in table was available
+    _rates_cache = None      # (expires_at, rates)
+    _rates_lock = threading.Lock()
+
     @staticmethod
     def get_rates():
+        cached = CurrencyConverter._rates_cache
+        if cached and time.monotonic() < cached[0]:
+            metrics_exporter.CACHE_REQUESTS.inc("exchange_rates", "hit")
+            return dict(cached[1])
+
+        with CurrencyConverter._rates_lock:
+            cached = CurrencyConverter._rates_cache
+            if cached and time.monotonic() < cached[0]:
+                metrics_exporter.CACHE_REQUESTS.inc("exchange_rates", "hit")
+                return dict(cached[1])
+            metrics_exporter.CACHE_REQUESTS.inc("exchange_rates", "miss")
+            rates, live = CurrencyConverter._fetch_rates()
+            ttl = CurrencyConverter.RATES_TTL if live else CurrencyConverter.FALLBACK_RATES_TTL
+            CurrencyConverter._rates_cache = (time.monotonic() + ttl, rates)
+            return dict(rates)
+
+    @staticmethod
+    def _fetch_rates():
+        """(rates, live); live is False when falling back to the built-in table"""
         try:
             response = requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=3)
             rates = response.json()['rates']
             if "GHS" not in rates:
                 rates["GHS"] = 11.50
-            return rates
+            return rates, True
         except:
             try:
                 c = CurrencyRates()
-                return {currency: c.get_rate("USD", currency) for currency in CurrencyConverter.SUPPORTED_CURRENCIES}
+                return {currency: c.get_rate("USD", currency) for currency in CurrencyConverter.SUPPORTED_CURRENCIES}, True
             except:
                 return {
                     'USD': 1.0,
@@ -566,7 +844,7 @@ class CurrencyConverter:
                     'GBP': 0.79,
                     'KES': 141.50,
                     'GHS': 11.90
-                }
+                }, False
 
     @staticmethod
     def convert(amount, from_currency, to_currency):
@@ -577,30 +855,6 @@ class CurrencyConverter:
         return usd_value * rates[to_currency]
 
 
-def format_currency(amount, currency="GHS"):
-    return f"{currency} {amount:,.2f}"
-
-class ReceiptGenerator:
-    @staticmethod
-    def generate_receipt(transaction_data, account):
-        receipt = f"""
-        ╔══════════════════════════════════╗
-        ║        SMARTBANK RECEIPT         ║
-        ╠══════════════════════════════════╣
-        ║ Date: {transaction_data[3]:<25}║
-        ║ Transaction: {transaction_data[0]:<16}║
-        ║ Account: {account.account_number:<20}║
-        ║ Name: {account.name:<23}║
-        ╠══════════════════════════════════╣
-        ║ Amount: {format_currency(abs(transaction_data[1])):<21}║
-        ║ Reference: {transaction_data[4]:<17}║
-        ╠══════════════════════════════════╣
-        ║ Description:                     ║
-        ║ {transaction_data[2]:<30}║
-        ╚══════════════════════════════════╝
-        """
-        return receipt
-
 # ---------- Paystack Integration ----------
 PAYSTACK_SECRET = st.secrets["api_key"]
 HEADERS = {"Authorization": f"Bearer {PAYSTACK_SECRET}"}
@@ -622,11 +876,10 @@ def initiate_deposit(account, amount, method="card"):
     ref = data["data"]["reference"]
     auth_url = data["data"]["authorization_url"]
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute(
+    coalescer.execute_sql(
         "INSERT INTO payments (account_number, amount, currency, method, reference, status, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?)",
         (account.account_number, amount, "GHS", method, ref, "pending", now, now)
     )
-    conn.commit()
     return auth_url, ref
 
 def initiate_deposit(account, amount, method="card"):
@@ -646,11 +899,10 @@ def initiate_deposit(account, amount, method="card"):
     ref = data["data"]["reference"]
     auth_url = data["data"]["authorization_url"]
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute(
+    coalescer.execute_sql(
         "INSERT OR IGNORE INTO payments (account_number, amount, currency, method, reference, status, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?)",
         (account.account_number, amount, "GHS", method, ref, "pending", now, now)
     )
-    conn.commit()
     return auth_url, ref
 
 
@@ -667,18 +919,19 @@ def verify_payment(reference):
     )
     data = resp.json()
     if not data.get("status"):  # API-level failure
+        metrics_exporter.PAYMENT_VERIFICATIONS.inc("deposit", "error")
         raise Exception("Verification error: " + data.get("message", ""))
     status = data["data"]["status"]
+    metrics_exporter.PAYMENT_VERIFICATIONS.inc("deposit", status)
     amount = data["data"]["amount"] / 100  # convert back
     meta = data["data"]["metadata"]
     account_no = meta.get("account_number")
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     # Update payment record
-    cursor.execute(
+    coalescer.execute_sql(
         "UPDATE payments SET status=?, updated_at=? WHERE reference=?",
         (status, now, reference)
     )
-    conn.commit()
 
     # If successful and was not already credited, credit user's balance
     if status == 'success' and old_status != 'success':
@@ -732,23 +985,32 @@ def initiate_withdrawal(account, amount, momo_number):
     if not res_data.get("status"):
         raise Exception(f"Transfer failed: {res_data.get('message')}")
 
-    # Record disbursement request
-    cursor.execute(
-        "INSERT OR IGNORE INTO disbursements (account_number, amount, method, reference, status, created_at, updated_at) VALUES (?,?,?,?,?,?,?)",
-        (account.account_number, amount, "momo", transfer_ref, "pending", now, now)
-    )
+    withdraw_ref = str(uuid.uuid4())[:8]
 
-    # Deduct balance immediately
-    account.balance -= amount
-    cursor.execute("UPDATE accounts SET balance=? WHERE account_number=?", (account.balance, account.account_number))
+    def write(cur):
+        # Record disbursement request
+        cur.execute(
+            "INSERT OR IGNORE INTO disbursements (account_number, amount, method, reference, status, created_at, updated_at) VALUES (?,?,?,?,?,?,?)",
+            (account.account_number, amount, "momo", transfer_ref, "pending", now, now)
+        )
 
-    # Record transaction
-    withdraw_ref = str(uuid.uuid4())[:8]
-    cursor.execute(
-        "INSERT INTO transactions (account_number, type, amount, description, timestamp, reference_id) VALUES (?,?,?,?,?,?)",
-        (account.account_number, "Withdrawal", -amount, f"MoMo to {momo_number}", now, withdraw_ref)
-    )
-    conn.commit()
+        # Deduct balance immediately
+        balance = _add_to_balance(cur, account.account_number, -amount)
+
+        # Record transaction
+        cur.execute(
+            "INSERT INTO transactions (account_number, type, amount, description, timestamp, reference_id) VALUES (?,?,?,?,?,?)",
+            (account.account_number, "Withdrawal", -amount, f"MoMo to {momo_number}", now, withdraw_ref)
+        )
+        return balance
+
+    account.balance = coalescer.execute(write)
+    # counted once committed, as Account._recorded counts ledger entries
+    entry = {"account_number": account.account_number, "type": "Withdrawal", "amount": amount, "timestamp": now}
+    velocity_store.record(entry["account_number"], entry["type"], entry["amount"], entry["timestamp"])
+    online_detector.detector.learn(entry)
+    metrics_exporter.TRANSACTIONS.inc("Withdrawal")
+    metrics_exporter.TRANSACTION_AMOUNT.inc("Withdrawal", amount=abs(amount))
     return transfer_ref
 
 def verify_withdrawal(reference):
@@ -757,27 +1019,38 @@ def verify_withdrawal(reference):
     res_data = res.json()
     if res_data.get("status"):
         status = res_data["data"]["status"]
+        metrics_exporter.PAYMENT_VERIFICATIONS.inc("withdrawal", status)
     else:
+        metrics_exporter.PAYMENT_VERIFICATIONS.inc("withdrawal", "error")
         raise Exception("Verification failed: Unable to fetch status")
 
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute(
+    coalescer.execute_sql(
         "UPDATE disbursements SET status=?, updated_at=? WHERE reference=?",
         (status, now, reference)
     )
-    conn.commit()
     return status
 
 
 
+# Ledger types under the names fraud_model.pkl was trained on
+MODEL_TRANSACTION_TYPES = {"Withdrawal": "ATM Withdrawal", "Transfer Out": "Bank Transfer"}
+DAYS_PER_MONTH = 30.4375
+
+
 class FraudDetector:
     def __init__(self, model_path="fraud_model.pkl", vectorizer_path="fraud_vectorizer.pkl"):
         try:
             # Load pre-trained model and vectorizer
             self.model = joblib.load(model_path)
-            self.vectorizer = joblib.load(vectorizer_path)
+            if hasattr(self.model, "steps"):
+                # A Pipeline brings its own preprocessing
+                self.vectorizer = None
+                self.feature_names = list(self.model.feature_names_in_)
+            else:
+                self.vectorizer = joblib.load(vectorizer_path)
+                self.feature_names = self.vectorizer.get_feature_names_out()
             self.is_trained = True
-            self.feature_names = self.vectorizer.get_feature_names_out()
             print("Loaded pre-trained fraud detection model")
         except Exception as e:
             print(f"Error loading pre-trained model: {e}")
@@ -785,19 +1058,53 @@ class FraudDetector:
             self.vectorizer = None
             self.is_trained = False
             print("Using new fraud detection model")
-    
+        self.compiled = None
+        if self.is_trained and self.vectorizer is None:
+            try:
+                self.compiled = tree_compiler.compile_model(self.model)
+                print(f"Compiled fraud model: {self.compiled.forest.n_trees} trees, {self.compiled.forest.n_nodes} nodes")
+            except Exception as e:
+                print(f"Fraud model not compiled, using sklearn: {e}")
+
     def extract_features(self, transaction):
-        """Convert transaction data into features for the model"""
-        features = {
+        """Convert transaction data into features for the model.
+
+        An ``account_age_days`` already looked up (by the fraud rules) is used
+        as it is. fraud_model.pkl takes no velocity features; the rules and the
+        online detector read those from velocity_store themselves.
+        """
+        with inference_metrics.stage("account_age"):
+            account_age_days = transaction.get('account_age_days')
+            if account_age_days is None:
+                account_age_days = self.calculate_account_age(transaction['account_number'])
+        with inference_metrics.stage("parse_timestamp"):
+            return self._transaction_features(transaction, account_age_days)
+
+    def _transaction_features(self, transaction, account_age_days):
+        when = datetime.strptime(transaction['timestamp'], '%Y-%m-%d %H:%M:%S')
+        return {
             'amount': transaction['amount'],
             'type': transaction['type'],
-            'hour_of_day': datetime.strptime(transaction['timestamp'], '%Y-%m-%d %H:%M:%S').hour,
-            'day_of_week': datetime.strptime(transaction['timestamp'], '%Y-%m-%d %H:%M:%S').weekday(),
-            'account_age_days': self.calculate_account_age(transaction['account_number']),
-            'is_weekend': int(datetime.strptime(transaction['timestamp'], '%Y-%m-%d %H:%M:%S').weekday() >= 5),
+            'hour_of_day': when.hour,
+            'day_of_week': when.weekday(),
+            'account_age_days': account_age_days,
+            'is_weekend': int(when.weekday() >= 5),
             'transaction_size_category': self.get_amount_category(transaction['amount'])
         }
-        return features
+
+    def extract_features_batch(self, transactions, db=None):
+        """Features of many transactions as one DataFrame, with one account-age query for all of them"""
+        db = db or conn
+        account_numbers = sorted({txn['account_number'] for txn in transactions})
+        created = dict(db.execute(
+            f"SELECT account_number, created_at FROM accounts WHERE account_number IN ({','.join('?' * len(account_numbers))})",
+            account_numbers).fetchall()) if account_numbers else {}
+        now = datetime.now()
+        rows = []
+        for txn in transactions:
+            age = (now - datetime.strptime(created[txn['account_number']], '%Y-%m-%d %H:%M:%S')).days
+            rows.append(self._transaction_features(txn, age))
+        return pd.DataFrame(rows)
     
     def get_amount_category(self, amount):
         if amount < 100: return 'small'
@@ -811,50 +1118,108 @@ class FraudDetector:
         created_date = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
         return (datetime.now() - created_date).days
     
+    def model_input(self, features):
+        """Model input for a list of feature dicts: vectorized, or the Pipeline's columns"""
+        if self.vectorizer is not None:
+            return self.vectorizer.transform(pd.DataFrame(features))
+        columns = {
+            'Transaction_Amount': [abs(f['amount']) for f in features],
+            'Transaction_Type': [MODEL_TRANSACTION_TYPES.get(f['type'], f['type']) for f in features],
+            'Time_of_Transaction': [f['hour_of_day'] for f in features],
+            # the training data counts account age in months
+            'Account_Age': [f['account_age_days'] / DAYS_PER_MONTH for f in features],
+        }
+        return columns if self.compiled else pd.DataFrame(columns)
+
+    def _scorer(self):
+        return self.compiled or self.model
+
     def is_fraudulent(self, transaction):
         """Check if transaction is suspicious using pre-trained model"""
         if not self.is_trained:
             return False
             
         try:
-            # Extract features
-            features = self.extract_features(transaction)
-            
-            # Create feature vector in same format as training
-            feature_df = pd.DataFrame([features])
-            
-            # Vectorize categorical features
-            X = self.vectorizer.transform(feature_df)
-            
-            # Predict
-            prediction = self.model.predict(X)
+            with inference_metrics.timed("fraud"):
+                # Extract features
+                with inference_metrics.stage("extract_features"):
+                    features = self.extract_features(transaction)
+
+                # Build the model input in the same format as training
+                with inference_metrics.stage("vectorize"):
+                    X = self.model_input([features])
+
+                # Predict
+                with inference_metrics.stage("predict"):
+                    prediction = self._scorer().predict(X)
             return prediction[0] == -1  # -1 means fraud in IsolationForest
             
         except Exception as e:
             print(f"Fraud detection error: {e}")
             return False
     
+    def is_fraudulent_batch(self, transactions, db=None):
+        """is_fraudulent for many ledger rows at once: one model input, one model call"""
+        if not self.is_trained or not transactions:
+            return [False] * len(transactions)
+
+        try:
+            with inference_metrics.timed("fraud_batch"):
+                with inference_metrics.stage("extract_features"):
+                    feature_df = self.extract_features_batch(transactions, db)
+                with inference_metrics.stage("vectorize"):
+                    X = self.model_input(feature_df.to_dict("records"))
+                with inference_metrics.stage("predict"):
+                    predictions = self._scorer().predict(X)
+            return [prediction == -1 for prediction in predictions]
+
+        except Exception as e:
+            print(f"Fraud detection error: {e}")
+            return [False] * len(transactions)
+
     def get_fraud_probability(self, transaction):
         """Get fraud probability score if model supports it"""
         if not self.is_trained:
             return 0.0
             
         try:
-            features = self.extract_features(transaction)
-            feature_df = pd.DataFrame([features])
-            X = self.vectorizer.transform(feature_df)
-            
-            if hasattr(self.model, 'decision_function'):
-                score = self.model.decision_function(X)[0]
-                # Convert to probability-like score (0-1)
-                return 1 / (1 + np.exp(-score))
-            elif hasattr(self.model, 'predict_proba'):
-                return self.model.predict_proba(X)[0][1]
-            else:
-                return 0.0 if self.model.predict(X)[0] == 1 else 1.0
+            with inference_metrics.timed("fraud_probability"):
+                with inference_metrics.stage("extract_features"):
+                    features = self.extract_features(transaction)
+                with inference_metrics.stage("vectorize"):
+                    X = self.model_input([features])
+
+                with inference_metrics.stage("predict"):
+                    scorer = self._scorer()
+                    if self.compiled and self.compiled.forest.kind == "classifier":
+                        return scorer.predict_proba(X)[0][1]
+                    elif hasattr(scorer, 'decision_function'):
+                        score = scorer.decision_function(X)[0]
+                        # Convert to probability-like score (0-1)
+                        return 1 / (1 + np.exp(-score))
+                    elif hasattr(scorer, 'predict_proba'):
+                        return scorer.predict_proba(X)[0][1]
+                    else:
+                        return 0.0 if scorer.predict(X)[0] == 1 else 1.0
         except:
             return 0.0
 
+    def get_online_score(self, transaction):
+        """Anomaly score 0-1 of a pending withdrawal or transfer from the online detector.
+
+        Unlike the model, the online detector keeps learning from committed
+        transactions (online_detector.py). The score is exported and logged,
+        not used to flag.
+        """
+        try:
+            with inference_metrics.timed("online"):
+                score = online_detector.detector.score(transaction)
+            metrics_exporter.ONLINE_ANOMALY_SCORE.observe(score)
+            return score
+        except Exception as e:
+            print(f"Online anomaly detection error: {e}")
+            return 0.0
+
 
 class FinanceChatbot:
     def __init__(self):
@@ -877,13 +1242,16 @@ class FinanceChatbot:
         self.vectorizer = TfidfVectorizer().fit(self.questions)
         
     def get_response(self, query):
-        # Vectorize input
-        query_vec = self.vectorizer.transform([query.lower()])
-        question_vecs = self.vectorizer.transform(self.questions)
-        
-        # Calculate similarity
-        similarities = cosine_similarity(query_vec, question_vecs)
-        max_index = np.argmax(similarities)
+        with inference_metrics.timed("chatbot"):
+            # Vectorize input
+            with inference_metrics.stage("vectorize"):
+                query_vec = self.vectorizer.transform([query.lower()])
+                question_vecs = self.vectorizer.transform(self.questions)
+
+            # Calculate similarity
+            with inference_metrics.stage("similarity"):
+                similarities = cosine_similarity(query_vec, question_vecs)
+                max_index = np.argmax(similarities)
         
         if similarities[0, max_index] > 0.3:
             return self.answers[max_index]
@@ -892,18 +1260,23 @@ class FinanceChatbot:
 
 class SavingsPredictor:
     def predict_achievement_date(self, goal_id, account_number):
+        with inference_metrics.timed("savings"):
+            return self._predict_achievement_date(goal_id, account_number)
+
+    def _predict_achievement_date(self, goal_id, account_number):
         try:
             # Use a new connection
-            pred_conn = sqlite3.connect("bank.db")
+            pred_conn = query_tracing.connect("bank.db")
             pred_cursor = pred_conn.cursor()
             
             # Get goal details
-            pred_cursor.execute("""
-                SELECT target_amount, current_amount, target_date, created_at 
-                FROM savings_goals 
-                WHERE id=? AND account_number=?
-            """, (goal_id, account_number))
-            goal = pred_cursor.fetchone()
+            with inference_metrics.stage("goal_query"):
+                pred_cursor.execute("""
+                    SELECT target_amount, current_amount, target_date, created_at 
+                    FROM savings_goals 
+                    WHERE id=? AND account_number=?
+                """, (goal_id, account_number))
+                goal = pred_cursor.fetchone()
             
             if not goal:
                 return "Goal not found"
@@ -911,13 +1284,14 @@ class SavingsPredictor:
             target_amount, current_amount, target_date, created_at = goal
             
             # Get contributions - FIXED QUERY
-            pred_cursor.execute("""
-                SELECT timestamp, current_amount 
-                FROM savings_goals_history 
-                WHERE goal_id=?
-                ORDER BY timestamp
-            """, (goal_id,))
-            contributions = pred_cursor.fetchall()
+            with inference_metrics.stage("history_query"):
+                pred_cursor.execute("""
+                    SELECT timestamp, current_amount 
+                    FROM savings_goals_history 
+                    WHERE goal_id=?
+                    ORDER BY timestamp
+                """, (goal_id,))
+                contributions = pred_cursor.fetchall()
             
             # Calculate basic metrics
             remaining = target_amount - current_amount
@@ -960,7 +1334,6 @@ class SavingsPredictor:
             predicted_date = datetime.now() + timedelta(days=days_needed)
             
             # Compare with target date
-            target_date = datetime.strptime(target_date, "%Y-%m-%d")
             status = "ahead of schedule" if predicted_date < target_date else "behind schedule"
             
             return f"Predicted {predicted_date.strftime('%b %d, %Y')} ({status})"
@@ -972,23 +1345,41 @@ class SavingsPredictor:
             pred_conn.close()
 
 class TransactionClassifier:
+    """Naive Bayes categorizer trained incrementally from user corrections.
+
+    Descriptions are hashed with a stateless HashingVectorizer, so there is no
+    vocabulary to refit; corrections are queued and applied in mini-batches
+    with ``partial_fit`` on a background thread.
+    """
+    MODEL_PATH = 'category_classifier.pkl'
+    N_FEATURES = 2 ** 14
+    BATCH_SIZE = 32          # corrections per partial_fit call
+    FLUSH_INTERVAL = 5.0     # seconds to wait for a batch to fill
+
     def __init__(self):
         self.categories = ['Food', 'Transport', 'Entertainment', 'Utilities', 'Shopping']
         self.model = None
-        self.vectorizer = None
+        self.vectorizer = HashingVectorizer(n_features=self.N_FEATURES,
+                                            alternate_sign=False, norm=None)
+        self.last_correction_id = 0
+        self._corrections = queue.Queue()
+        self._updater = None
+        self._updater_lock = threading.Lock()
         self._initialize_model()
-    
+
     def _initialize_model(self):
         try:
-            self.vectorizer = joblib.load('vectorizer.pkl')
-            self.model = joblib.load('classifier.pkl')
+            state = joblib.load(self.MODEL_PATH)
+            self.model = state['model']
+            self.last_correction_id = state['last_correction_id']
             print("Loaded pre-trained classifier")
         except:
             print("Training new classifier...")
             self.train_model()
-    
+        self._queue_unapplied_corrections()
+
     def train_model(self):
-        # Expanded training data
+        """Seed the classifier from the built-in examples"""
         descriptions = [
             "supermarket", "grocery", "restaurant", "coffee shop", "food delivery",
             "gas station", "bus fare", "taxi", "uber", "lyft", "train ticket",
@@ -997,29 +1388,99 @@ class TransactionClassifier:
             "clothing", "electronics", "shopping mall", "online purchase", "other"
         ]
         labels = [0,0,0,0,0, 1,1,1,1,1,1, 2,2,2,2,2, 3,3,3,3,3, 4,4,4,4,4]
-        
-        # Vectorize text
-        self.vectorizer = CountVectorizer()
-        X = self.vectorizer.fit_transform(descriptions)
-        
-        # Train classifier
-        self.model = MultinomialNB()
-        self.model.fit(X, labels)
-        
-        # Save models
-        joblib.dump(self.vectorizer, 'vectorizer.pkl')
-        joblib.dump(self.model, 'classifier.pkl')
+
+        model = MultinomialNB()
+        model.partial_fit(self.vectorizer.transform(descriptions), labels,
+                          classes=np.arange(len(self.categories)))
+        self.model = model
+        self.last_correction_id = 0
+        self._save_model()
         print("Classifier trained and saved")
-    
+
+    def _save_model(self):
+        joblib.dump({'model': self.model, 'last_correction_id': self.last_correction_id},
+                    self.MODEL_PATH)
+
+    def _queue_unapplied_corrections(self):
+        """Replay corrections saved after the last persisted model update"""
+        try:
+            replay_conn = query_tracing.connect("bank.db")
+            rows = replay_conn.execute("""
+                SELECT id, description, category FROM category_corrections
+                WHERE id > ? ORDER BY id
+            """, (self.last_correction_id,)).fetchall()
+            replay_conn.close()
+        except Exception as e:
+            print(f"Failed to load category corrections: {e}")
+            return
+        for correction_id, description, category in rows:
+            self.add_correction(correction_id, description, category)
+
+    def add_correction(self, correction_id, description, category):
+        """Queue a corrected (description, category) pair for the next mini-batch"""
+        if category not in self.categories:
+            return
+        self._corrections.put((correction_id, description.lower()[:50],
+                               self.categories.index(category)))
+        with self._updater_lock:
+            if self._updater is None or not self._updater.is_alive():
+                self._updater = threading.Thread(target=self._apply_corrections_forever,
+                                                 daemon=True)
+                self._updater.start()
+
+    def _next_batch(self):
+        batch = [self._corrections.get()]
+        deadline = time.monotonic() + self.FLUSH_INTERVAL
+        while len(batch) < self.BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._corrections.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _apply_corrections_forever(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self.apply_corrections(batch)
+            except Exception as e:
+                print(f"Classifier update failed: {e}")
+
+    def apply_corrections(self, batch):
+        """partial_fit a copy of the model on one batch, then swap it in.
+
+        Work is proportional to the batch, never to the full correction
+        history, and categorize() keeps using the old model until the swap.
+        """
+        batch = [item for item in batch if item[0] > self.last_correction_id]
+        if not batch:
+            return
+        X = self.vectorizer.transform([desc for _, desc, _ in batch])
+        y = [label for _, _, label in batch]
+
+        model = copy.deepcopy(self.model)
+        model.partial_fit(X, y)
+        self.model = model
+        self.last_correction_id = max(correction_id for correction_id, _, _ in batch)
+        self._save_model()
+        print(f"Classifier updated with {len(batch)} corrections")
+
     def categorize(self, description):
-        if not self.model:
+        model = self.model
+        if not model:
             return "Uncategorized"
-        
+
         try:
-            # Preprocess description
-            clean_desc = description.lower()[:50]  # Truncate long descriptions
-            X = self.vectorizer.transform([clean_desc])
-            prediction = self.model.predict(X)
+            with inference_metrics.timed("classifier"):
+                # Preprocess description
+                clean_desc = description.lower()[:50]  # Truncate long descriptions
+                with inference_metrics.stage("vectorize"):
+                    X = self.vectorizer.transform([clean_desc])
+                with inference_metrics.stage("predict"):
+                    prediction = model.predict(X)
             return self.categories[prediction[0]]
         except Exception as e:
             print(f"Categorization error: {e}")
@@ -1053,40 +1514,96 @@ class CreditScorer:
         if not self.model:
             self.train_model()
         
-        # Get account features
-        cursor.execute("""
-            SELECT balance, 
-                   (SELECT COUNT(*) FROM transactions 
-                    WHERE account_number = ?) as transaction_count,
-                   (SELECT AVG(amount) FROM transactions 
-                    WHERE account_number = ?) as avg_transaction,
-                   MAX(balance) as max_balance
-            FROM accounts
-            WHERE account_number = ?
-        """, (account_number, account_number, account_number))
-        features = cursor.fetchone()
-        
-        if not features or None in features:
-            return "Insufficient data"
-        
-        # Predict
-        prediction = self.model.predict([features])
+        with inference_metrics.timed("credit"):
+            # Get account features
+            with inference_metrics.stage("query"):
+                cursor.execute("""
+                    SELECT balance, 
+                           (SELECT COUNT(*) FROM transactions 
+                            WHERE account_number = ?) as transaction_count,
+                           (SELECT AVG(amount) FROM transactions 
+                            WHERE account_number = ?) as avg_transaction,
+                           MAX(balance) as max_balance
+                    FROM accounts
+                    WHERE account_number = ?
+                """, (account_number, account_number, account_number))
+                features = cursor.fetchone()
+
+            if not features or None in features:
+                return "Insufficient data"
+
+            # Predict
+            with inference_metrics.stage("predict"):
+                prediction = self.model.predict([features])
         return "Good credit risk" if prediction[0] else "Higher risk profile"
 
 # Initialize ML components
 fraud_detector = FraudDetector()
+fraud_cascade = fraud_rules.FraudCascade(fraud_detector.is_fraudulent, fraud_detector.calculate_account_age,
+                                         velocity_store, known_counterparties.count)
 finance_chatbot = FinanceChatbot()
 savings_predictor = SavingsPredictor()
 transaction_classifier = TransactionClassifier()
 credit_scorer = CreditScorer()
 
+def scan_recent_transactions(task=None, limit=500):
+    """Run the fraud model over the latest transactions and flag new hits; returns the number flagged"""
+    scan_conn = query_tracing.connect("bank.db")
+    try:
+        recent_txns = scan_conn.execute("""
+            SELECT t.account_number, t.type, t.amount, t.timestamp, t.reference_id, a.name
+            FROM transactions t
+            JOIN accounts a ON t.account_number = a.account_number
+            ORDER BY t.timestamp DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+
+        candidates = []
+        for i, txn in enumerate(recent_txns):
+            if task and i % 25 == 0:
+                task.report(i / len(recent_txns), f"Checked {i} of {len(recent_txns)} transactions")
+            txn_data = {
+                'account_number': txn[0],
+                'type': txn[1],
+                'amount': txn[2],
+                'timestamp': txn[3],
+                'description': f"Proactive scan: {txn[1]}"
+            }
+
+            # Skip if already flagged
+            if scan_conn.execute("SELECT 1 FROM flagged_transactions WHERE transaction_ref=?", (txn[4],)).fetchone():
+                continue
+            candidates.append((txn, txn_data))
+
+        # Score all candidates in one model call
+        verdicts = fraud_detector.is_fraudulent_batch([txn_data for _, txn_data in candidates], scan_conn)
+
+        new_flags = 0
+        for (txn, _), is_fraud in zip(candidates, verdicts):
+            if is_fraud:
+                try:
+                    scan_conn.execute("""
+                        INSERT INTO flagged_transactions 
+                        (transaction_ref, account_number, flagged_at, status)
+                        VALUES (?, ?, datetime('now'), 'pending')
+                    """, (txn[4], txn[0]))
+                    new_flags += 1
+                    metrics_exporter.FRAUD_FLAGS.inc("proactive_scan")
+                except:
+                    pass
+
+        scan_conn.commit()
+        return new_flags
+    finally:
+        scan_conn.close()
+
 # Background thread for model training
 def train_models_periodically():
     while True:
         try:
             print("Training models...")
             fraud_detector.train_model()
-            transaction_classifier.train_model()
+            # transaction_classifier learns incrementally from corrections
             credit_scorer.train_model()
             print("Model training completed")
             time.sleep(86400)  # Retrain daily
@@ -1099,6 +1616,11 @@ training_thread = None
 if not hasattr(sys, '_called_from_test'):  # Only start in production
     training_thread = threading.Thread(target=train_models_periodically, daemon=True)
     training_thread.start()
+    metrics_exporter.start()
+    db_backup.manager.start()
+    cold_archive.archive.start()
+    transfer_graph.graph.start()
+    online_detector.detector.start()
 
 
 # Database migration for existing installations
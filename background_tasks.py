@@ -0,0 +1,105 @@
+"""Thread pool for slow work started from the UI (Paystack calls, fraud scans).
+
+Pages submit a function and keep the returned task id in
+``st.session_state``; a fragment polls ``get(task_id)`` until the task is
+done, so the script thread is free for other sessions in the meantime.
+Finished tasks are dropped after ``RESULT_TTL`` seconds.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+MAX_WORKERS = 8
+RESULT_TTL = 900  # seconds a finished task's result stays available
+
+
+class Task:
+    def __init__(self, name, owner=None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.owner = owner
+        self.status = "pending"    # pending -> running -> done | failed
+        self.result = None
+        self.error = None
+        self.progress = None       # 0.0-1.0 when the task reports it
+        self.message = None
+        self.submitted_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed")
+
+    @property
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - (self.started or self.submitted)
+
+    def report(self, progress=None, message=None):
+        """Called from inside the task to publish progress for the UI"""
+        if progress is not None:
+            self.progress = min(1.0, max(0.0, progress))
+        if message is not None:
+            self.message = message
+
+
+class TaskRunner:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wirebuddy-task")
+        self.tasks = {}
+        self.lock = threading.Lock()
+
+    def submit(self, name, fn, *args, owner=None, with_task=False, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and return the task id.
+
+        With ``with_task=True`` the Task is passed as the first argument so
+        the function can call ``task.report(...)``.
+        """
+        task = Task(name, owner)
+        with self.lock:
+            self._expire()
+            self.tasks[task.id] = task
+        self.executor.submit(self._run, task, fn, args, kwargs, with_task)
+        return task.id
+
+    def _run(self, task, fn, args, kwargs, with_task):
+        task.status = "running"
+        task.started = time.monotonic()
+        try:
+            task.result = fn(task, *args, **kwargs) if with_task else fn(*args, **kwargs)
+            task.status = "done"
+        except Exception as e:
+            print(f"Background task {task.name} failed: {e}")
+            task.error = str(e)
+            task.status = "failed"
+        finally:
+            task.finished = time.monotonic()
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [task_id for task_id, task in self.tasks.items()
+                   if task.finished is not None and now - task.finished > RESULT_TTL]
+        for task_id in expired:
+            del self.tasks[task_id]
+
+    def get(self, task_id):
+        if task_id is None:
+            return None
+        with self.lock:
+            return self.tasks.get(task_id)
+
+    def forget(self, task_id):
+        with self.lock:
+            self.tasks.pop(task_id, None)
+
+    def active(self):
+        with self.lock:
+            return [task for task in self.tasks.values() if not task.done]
+
+
+task_runner = TaskRunner()
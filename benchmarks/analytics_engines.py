@@ -0,0 +1,144 @@
+"""Admin fraud analytics with pandas vs DuckDB at a million flagged rows.
+
+Builds a synthetic database (synthetic_db.py, then the transactions table
+doubled until it holds ``--flags`` rows, every one of which gets flagged)
+and computes the fraud analytics tab's tables with both engines of
+fraud_analytics.py:
+
+    pandas  fetch the flagged join into a DataFrame, to_datetime, groupbys
+            (what the tab did on every rerun before the DuckDB engine)
+    duckdb  attach the database with DuckDB's sqlite extension, aggregate
+            in SQL and fetch Arrow tables
+
+plus a rerun served from the per-generation cache. Reports the median of
+``--repeats`` runs and checks both engines agree on the counts.
+
+    python benchmarks/analytics_engines.py --flags 1000000
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fraud_analytics
+import synthetic_db
+
+
+class _Snapshot:
+    """Stands in for reporting_snapshot.snapshot: a path and an unchanging generation"""
+
+    def __init__(self, path):
+        self.path = path
+        self.generation = 1
+
+
+def build_database(path, flags, seed):
+    synthetic_db.generate(path, accounts=1000, transactions=100_000, flags=0, seed=seed)
+    conn = sqlite3.connect(path)
+    while conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] < flags:
+        conn.execute("""
+            INSERT INTO transactions (account_number, type, amount, description, timestamp, reference_id)
+            SELECT account_number, type, amount, description, timestamp, reference_id || '-' || id
+            FROM transactions
+        """)
+        conn.commit()
+    conn.execute("""
+        INSERT INTO flagged_transactions (transaction_ref, account_number, flagged_at, status)
+        SELECT reference_id, account_number, timestamp,
+               CASE id % 10 WHEN 0 THEN 'confirmed' WHEN 1 THEN 'confirmed'
+                            WHEN 2 THEN 'approved' WHEN 3 THEN 'approved' WHEN 4 THEN 'approved'
+                            ELSE 'pending' END
+        FROM transactions ORDER BY id LIMIT ?
+    """, (flags,))
+    conn.commit()
+    flagged = conn.execute("SELECT COUNT(*) FROM flagged_transactions").fetchone()[0]
+    conn.close()
+    return flagged
+
+
+def time_engine(compute, path, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        results = compute(path)
+        timings.append(time.perf_counter() - started)
+    return results, {"median_s": round(statistics.median(timings), 3), "min_s": round(min(timings), 3)}
+
+
+def time_cached(path, engine, repeats):
+    analytics = fraud_analytics.FraudAnalytics(engine)
+    snapshot = _Snapshot(path)
+    analytics.results(snapshot)
+    timings = []
+    for _ in range(max(repeats, 100)):
+        started = time.perf_counter()
+        analytics.results(snapshot)
+        timings.append(time.perf_counter() - started)
+    return {"median_s": round(statistics.median(timings), 9)}
+
+
+def run(flags, repeats, seed, workdir=None):
+    temporary = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="wirebuddy-analytics-")
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, "bank.db")
+    try:
+        started = time.perf_counter()
+        flagged = build_database(path, flags, seed)
+        report = {"config": {"flags": flagged, "repeats": repeats, "seed": seed,
+                             "size_mb": round(os.path.getsize(path) / 1024 / 1024, 1),
+                             "build_seconds": round(time.perf_counter() - started, 1)}}
+        pandas_results, report["pandas"] = time_engine(fraud_analytics.compute_pandas, path, repeats)
+        if fraud_analytics.duckdb is None:
+            print("duckdb is not installed; timing the pandas engine only")
+        else:
+            duckdb_results, report["duckdb"] = time_engine(fraud_analytics.compute_duckdb, path, repeats)
+            report["speedup"] = round(report["pandas"]["median_s"] / report["duckdb"]["median_s"], 1)
+            if pandas_results["summary"] != duckdb_results["summary"]:
+                raise AssertionError(f"Engines disagree: {pandas_results['summary']} vs {duckdb_results['summary']}")
+        report["cached_rerun"] = time_cached(path, fraud_analytics.ENGINE, repeats)
+    finally:
+        if temporary:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def print_report(report):
+    config = report["config"]
+    print(f"{config['flags']:,} flagged rows, {config['size_mb']} MB database (built in {config['build_seconds']}s)")
+    print(f"{'engine':<14}{'median s':>10}{'min s':>9}")
+    for engine in ("pandas", "duckdb"):
+        if engine in report:
+            print(f"{engine:<14}{report[engine]['median_s']:>10}{report[engine]['min_s']:>9}")
+    if "speedup" in report:
+        print(f"duckdb is {report['speedup']}x faster")
+    print(f"cached rerun: {report['cached_rerun']['median_s'] * 1e6:.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin fraud analytics, pandas vs DuckDB")
+    parser.add_argument("--flags", type=int, default=1_000_000, help="flagged transactions in the database")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", help="build the database here instead of a temporary directory")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.flags, args.repeats, args.seed, args.workdir)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
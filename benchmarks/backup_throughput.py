@@ -0,0 +1,174 @@
+"""Throughput of db_backup on a large bank.db, and what it costs live writers.
+
+Builds a synthetic database (synthetic_db.py, then the transactions table
+doubled until the file reaches ``--size-mb``), then backs it up once per
+``--pages`` setting while a writer thread commits one small transaction
+every few milliseconds. Reports MB/s, how often writes restarted the copy,
+and the writer's commit latency during the copy. Finally times a restore
+(one backup step into the live file) under the same writer.
+
+    python benchmarks/backup_throughput.py --size-mb 4096 --pages 64 256 1024 -1
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import db_backup
+import synthetic_db
+
+
+def build_database(path, size_mb, seed):
+    synthetic_db.generate(path, accounts=1000, transactions=100_000, seed=seed)
+    conn = sqlite3.connect(path)
+    while os.path.getsize(path) < size_mb * 1024 * 1024:
+        conn.execute("""
+            INSERT INTO transactions (account_number, type, amount, description, timestamp, reference_id)
+            SELECT account_number, type, amount, description, timestamp, reference_id || '-' || id
+            FROM transactions
+        """)
+        conn.commit()
+    conn.close()
+
+
+class Writer(threading.Thread):
+    """Commits one small transaction every interval seconds, timing each commit"""
+
+    def __init__(self, path, interval=0.005):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.latencies = []
+        self.failures = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        conn = sqlite3.connect(self.path, timeout=60)
+        while not self.stopped.is_set():
+            started = time.perf_counter()
+            try:
+                conn.execute("UPDATE accounts SET balance = balance + 1 WHERE account_number = '0200000001'")
+                conn.commit()
+                self.latencies.append((time.perf_counter() - started) * 1000)
+            except sqlite3.OperationalError:
+                self.failures += 1
+            time.sleep(self.interval)
+        conn.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        latencies = sorted(self.latencies) or [0.0]
+        return {
+            "writes": len(self.latencies),
+            "failed_writes": self.failures,
+            "write_p50_ms": round(statistics.median(latencies), 2),
+            "write_p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2),
+            "write_max_ms": round(latencies[-1], 2),
+        }
+
+
+def time_backup(source_path, dest_path, pages, sleep, with_writer):
+    steps = []
+    writer = Writer(source_path) if with_writer else None
+    if writer:
+        writer.start()
+    started = time.perf_counter()
+    db_backup.backup_file(dest_path, source_path, pages=pages, sleep=sleep,
+                          progress=lambda copied, total: steps.append(copied))
+    seconds = time.perf_counter() - started
+    # copied drops back when a write to the source restarted the copy
+    restarts = sum(1 for a, b in zip(steps, steps[1:]) if b < a)
+    row = {"pages": pages, "seconds": round(seconds, 2),
+           "mb_per_s": round(os.path.getsize(dest_path) / 1e6 / seconds, 1), "restarts": restarts}
+    if writer:
+        row.update(writer.stop())
+    os.remove(dest_path)
+    return row
+
+
+def time_restore(live_path, staging_path):
+    writer = Writer(live_path)
+    writer.start()
+    started = time.perf_counter()
+    source = sqlite3.connect(staging_path)
+    live = sqlite3.connect(live_path, timeout=db_backup.LOCK_TIMEOUT)
+    try:
+        db_backup.copy_database(source, live, pages=-1)
+    finally:
+        live.close()
+        source.close()
+    seconds = time.perf_counter() - started
+    row = {"seconds": round(seconds, 2), "mb_per_s": round(os.path.getsize(staging_path) / 1e6 / seconds, 1)}
+    row.update(writer.stop())
+    return row
+
+
+def run(size_mb, pages_settings, sleep, seed, workdir=None):
+    temporary = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="wirebuddy-backup-")
+    os.makedirs(workdir, exist_ok=True)
+    source_path = os.path.join(workdir, "bank.db")
+    try:
+        started = time.perf_counter()
+        build_database(source_path, size_mb, seed)
+        report = {"config": {"size_mb": round(os.path.getsize(source_path) / 1024 / 1024, 1),
+                             "sleep": sleep, "seed": seed,
+                             "build_seconds": round(time.perf_counter() - started, 1)},
+                  "idle": [], "under_writes": []}
+        dest_path = os.path.join(workdir, "backup.db")
+        for pages in pages_settings:
+            report["idle"].append(time_backup(source_path, dest_path, pages, sleep, False))
+            report["under_writes"].append(time_backup(source_path, dest_path, pages, sleep, True))
+
+        staging_path = os.path.join(workdir, "staging.db")
+        shutil.copyfile(source_path, staging_path)
+        report["restore"] = time_restore(source_path, staging_path)
+    finally:
+        if temporary:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def print_report(report):
+    print(f"database: {report['config']['size_mb']} MB (built in {report['config']['build_seconds']}s)")
+    print(f"{'pages':>6}{'idle MB/s':>11}{'busy MB/s':>11}{'restarts':>10}{'writes':>8}"
+          f"{'write p50':>11}{'write p99':>11}{'write max':>11}")
+    for idle, busy in zip(report["idle"], report["under_writes"]):
+        print(f"{idle['pages']:>6}{idle['mb_per_s']:>11}{busy['mb_per_s']:>11}{busy['restarts']:>10}"
+              f"{busy['writes']:>8}{busy['write_p50_ms']:>11}{busy['write_p99_ms']:>11}{busy['write_max_ms']:>11}")
+    restore = report["restore"]
+    print(f"restore: {restore['seconds']}s ({restore['mb_per_s']} MB/s), writes waited up to "
+          f"{restore['write_max_ms']} ms, {restore['failed_writes']} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backup and restore throughput of db_backup")
+    parser.add_argument("--size-mb", type=int, default=512, help="grow the database to at least this size")
+    parser.add_argument("--pages", type=int, nargs="+", default=[64, db_backup.PAGES_PER_STEP, 1024, -1],
+                        help="pages per backup step to compare (-1 copies in one step)")
+    parser.add_argument("--sleep", type=float, default=db_backup.STEP_SLEEP, help="seconds between steps")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", help="build the database here instead of a temporary directory")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.size_mb, args.pages, args.sleep, args.seed, args.workdir)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmarks for the queries behind the admin panel tabs.
+
+The SQL mirrors what app.py runs on each admin rerun.
+"""
+import pandas as pd
+import pytest
+
+
+FLAGGED_TRANSACTIONS_SQL = """
+    SELECT f.id, f.transaction_ref, a.name, a.account_number,
+           t.amount, t.type, t.timestamp, t.description,
+           f.status, f.flagged_at, f.reviewed_by, f.reviewed_at
+    FROM flagged_transactions f
+    JOIN transactions t ON f.transaction_ref = t.reference_id
+    JOIN accounts a ON t.account_number = a.account_number
+    ORDER BY f.flagged_at DESC
+"""
+
+ACCOUNT_AGE_SQL = """
+    SELECT a.account_number,
+           julianday('now') - julianday(a.created_at) as age_days,
+           COUNT(f.id) as fraud_count
+    FROM accounts a
+    LEFT JOIN flagged_transactions f ON f.account_number = a.account_number
+    GROUP BY a.account_number
+"""
+
+RECENT_TRANSACTIONS_SQL = """
+    SELECT type, amount, description, timestamp, reference_id
+    FROM transactions
+    WHERE account_number=?
+    ORDER BY timestamp DESC
+    LIMIT 5
+"""
+
+SCAN_CANDIDATES_SQL = """
+    SELECT t.account_number, t.type, t.amount, t.timestamp, t.reference_id, a.name
+    FROM transactions t
+    JOIN accounts a ON t.account_number = a.account_number
+    ORDER BY t.timestamp DESC
+    LIMIT 500
+"""
+
+MONTHLY_SPENDING_SQL = """
+    SELECT strftime('%Y-%m', timestamp) as month,
+           SUM(amount) as total
+    FROM transactions
+    WHERE account_number=? AND amount < 0
+    GROUP BY strftime('%Y-%m', timestamp)
+    ORDER BY month DESC
+    LIMIT 6
+"""
+
+
+def test_all_accounts(benchmark, backend):
+    accounts = benchmark(backend.Account.get_all_accounts)
+    assert accounts
+
+
+def test_fraud_tab_flagged_join(benchmark, backend):
+    def run():
+        backend.cursor.execute(FLAGGED_TRANSACTIONS_SQL)
+        return backend.cursor.fetchall()
+    assert benchmark(run)
+
+
+def test_fraud_tab_pattern_analysis(benchmark, backend):
+    backend.cursor.execute(FLAGGED_TRANSACTIONS_SQL)
+    flagged = backend.cursor.fetchall()
+
+    def run():
+        fraud_df = pd.DataFrame(flagged, columns=[
+            "id", "reference", "name", "account", "amount",
+            "type", "timestamp", "description", "status",
+            "flagged_at", "reviewed_by", "reviewed_at"
+        ])
+        fraud_df['date'] = pd.to_datetime(fraud_df['timestamp']).dt.date
+        fraud_df['hour'] = pd.to_datetime(fraud_df['timestamp']).dt.hour
+        fraud_df.groupby('date').size()
+        fraud_df.groupby('hour').size()
+        fraud_df.groupby('type').agg({'amount': ['count', 'mean', 'sum'],
+                                      'status': lambda x: (x == 'confirmed').mean()})
+        return fraud_df.groupby(['account', 'name']).agg({'amount': ['count', 'sum'],
+                                                          'status': lambda x: (x == 'confirmed').mean()})
+    benchmark(run)
+
+
+def test_fraud_tab_duckdb_analytics(benchmark, backend):
+    fraud_analytics = pytest.importorskip("fraud_analytics")
+    if fraud_analytics.duckdb is None:
+        pytest.skip("duckdb is not installed")
+    results = benchmark(fraud_analytics.compute_duckdb, "bank.db")
+    assert results["summary"]["total"]
+
+
+def test_fraud_tab_account_age(benchmark, backend):
+    def run():
+        backend.cursor.execute(ACCOUNT_AGE_SQL)
+        return backend.cursor.fetchall()
+    assert benchmark(run)
+
+
+def test_system_tab_recent_transactions_loop(benchmark, backend):
+    accounts = backend.Account.get_all_accounts()
+
+    def run():
+        rows = []
+        for acc in accounts:
+            backend.cursor.execute(RECENT_TRANSACTIONS_SQL, (acc.account_number,))
+            rows.extend(backend.cursor.fetchall())
+        return rows
+    assert benchmark(run)
+
+
+def test_proactive_scan_candidates(benchmark, backend):
+    def run():
+        backend.cursor.execute(SCAN_CANDIDATES_SQL)
+        return backend.cursor.fetchall()
+    assert len(benchmark(run)) == 500
+
+
+def test_dashboard_monthly_spending(benchmark, backend, busiest_account):
+    def run():
+        backend.cursor.execute(MONTHLY_SPENDING_SQL, (busiest_account.account_number,))
+        return backend.cursor.fetchall()
+    assert benchmark(run)
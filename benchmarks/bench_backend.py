@@ -0,0 +1,155 @@
+"""Benchmarks for the customer-facing backend paths and ML components"""
+import itertools
+
+import pytest
+
+
+def test_send_money(benchmark, backend, busiest_account):
+    backend.cursor.execute(
+        "SELECT account_number FROM accounts WHERE is_active=1 AND account_number != ? LIMIT 1",
+        (busiest_account.account_number,)
+    )
+    recipient = backend.cursor.fetchone()[0]
+    reference_id, message = benchmark(busiest_account.send_money, recipient, 0.01)
+    assert reference_id, message
+
+
+def test_get_transaction_history_recent(benchmark, busiest_account):
+    rows = benchmark(busiest_account.get_transaction_history, 5)
+    assert len(rows) == 5
+
+
+def test_get_transaction_history_full(benchmark, busiest_account):
+    rows = benchmark(busiest_account.get_transaction_history)
+    assert rows
+
+
+def test_get_history_page_deep(benchmark, busiest_account):
+    cursor = None
+    for _ in range(20):
+        _, cursor = busiest_account.get_history_page(cursor, page_size=50)
+    rows, _ = benchmark(busiest_account.get_history_page, cursor, 50)
+    assert rows
+
+
+def test_fraud_detector_is_fraudulent(benchmark, backend, sample_transactions):
+    transaction = sample_transactions[0]
+    benchmark(backend.fraud_detector.is_fraudulent, transaction)
+
+
+def test_fraud_detector_probability(benchmark, backend, sample_transactions):
+    transaction = sample_transactions[0]
+    benchmark(backend.fraud_detector.get_fraud_probability, transaction)
+
+
+def test_fraud_detector_online_score(benchmark, backend, sample_transactions):
+    transaction = sample_transactions[0]
+    benchmark(backend.fraud_detector.get_online_score, transaction)
+
+
+def test_online_detector_learn(benchmark, backend, sample_transactions):
+    transactions = itertools.cycle(sample_transactions)
+    benchmark(lambda: backend.online_detector.detector.learn(next(transactions)))
+
+
+VELOCITY_SQL = """
+    SELECT COUNT(*), COALESCE(SUM(ABS(amount)), 0), COALESCE(MAX(ABS(amount)), 0)
+    FROM transactions
+    WHERE account_number=? AND type IN ('Withdrawal', 'Transfer Out')
+      AND timestamp > ? AND timestamp <= ?
+"""
+
+
+def test_velocity_features_store(benchmark, backend, sample_transactions):
+    transaction = sample_transactions[0]
+    features = benchmark(backend.velocity_store.features,
+                         transaction["account_number"], transaction["timestamp"], transaction["amount"])
+    assert features["velocity_count_7d"] >= 1
+
+
+def test_velocity_features_sql(benchmark, backend, sample_transactions):
+    # The same four windows computed by scanning the account's ledger rows
+    from datetime import datetime, timedelta
+    transaction = sample_transactions[0]
+    end = datetime.strptime(transaction["timestamp"], '%Y-%m-%d %H:%M:%S')
+
+    def run():
+        return [backend.cursor.execute(VELOCITY_SQL, (
+            transaction["account_number"], (end - timedelta(seconds=seconds)).strftime('%Y-%m-%d %H:%M:%S'),
+            transaction["timestamp"])).fetchone() for _, seconds, _ in backend.velocity_store.windows]
+    assert len(benchmark(run)) == 4
+
+
+def test_fraud_detector_batch(benchmark, backend, sample_transactions):
+    verdicts = benchmark(backend.fraud_detector.is_fraudulent_batch, sample_transactions[:500])
+    assert len(verdicts) == 500
+
+
+@pytest.fixture(scope="module")
+def replay_transactions(sample_transactions):
+    # transfers carry their recipient, as send_money passes it to the rules
+    return [dict(txn, counterparty=txn["description"][len("To: "):]) if txn["description"].startswith("To: ") else txn
+            for txn in sample_transactions[:200]]
+
+
+@pytest.mark.parametrize("stages", ["model_only", "cascade"])
+def test_fraud_check_replay(benchmark, backend, replay_transactions, stages):
+    # Compare the two ids for the model time the rule prefilter saves
+    cascade = backend.fraud_cascade
+    if stages == "model_only":
+        check = backend.fraud_detector.is_fraudulent
+    else:
+        cascade.reset()
+        check = cascade.check
+    benchmark(lambda: [check(txn) for txn in replay_transactions])
+    if stages == "cascade":
+        report = cascade.report()
+        benchmark.extra_info["stages"] = {row["stage"]: row["decided"] for row in report["stages"]}
+        assert report["checks"] >= len(replay_transactions)
+
+
+@pytest.mark.parametrize("engine", ["sklearn", "compiled"])
+@pytest.mark.parametrize("rows", [1, 500], ids=["single", "batch"])
+def test_fraud_model_predict(benchmark, backend, sample_transactions, engine, rows):
+    # The model call alone, on the inputs is_fraudulent and the proactive scan build
+    import pandas as pd
+    detector = backend.fraud_detector
+    features = detector.extract_features_batch(sample_transactions[:rows]).to_dict("records")
+    data = detector.model_input(features)
+    if engine == "sklearn":
+        scorer, data = detector.model, pd.DataFrame(data)
+    else:
+        scorer = detector.compiled
+    predictions = benchmark(scorer.predict, data)
+    assert len(predictions) == rows
+
+
+@pytest.mark.parametrize("sample_rate", [0.0, 1.0], ids=["unsampled", "sampled"])
+def test_transaction_classifier_categorize(benchmark, backend, sample_rate):
+    # Compare the two ids to see the cost of the per-stage inference timers
+    import inference_metrics
+
+    previous = inference_metrics.metrics.sample_rate
+    inference_metrics.metrics.set_sample_rate(sample_rate)
+    try:
+        category = benchmark(backend.transaction_classifier.categorize, "MoMo to 0241234567 for groceries")
+    finally:
+        inference_metrics.metrics.set_sample_rate(previous)
+    assert category in backend.transaction_classifier.categories + ["Uncategorized"]
+
+
+def test_savings_predictor(benchmark, backend):
+    backend.cursor.execute("""
+        SELECT g.id, g.account_number FROM savings_goals g
+        JOIN savings_goals_history h ON h.goal_id = g.id
+        GROUP BY g.id HAVING COUNT(*) >= 2 LIMIT 1
+    """)
+    goal_id, account_number = backend.cursor.fetchone()
+    result = benchmark(backend.savings_predictor.predict_achievement_date, goal_id, account_number)
+    assert "unavailable" not in result
+
+
+def test_credit_scorer(benchmark, backend, busiest_account):
+    # The first call trains and saves the model when none exists yet
+    backend.credit_scorer.predict_creditworthiness(busiest_account.account_number)
+    benchmark(backend.credit_scorer.predict_creditworthiness, busiest_account.account_number)
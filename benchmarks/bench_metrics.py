@@ -0,0 +1,35 @@
+"""Metric updates on the hot path, and what short-lived threads leave behind"""
+import gc
+import threading
+
+import metrics_exporter
+
+
+def test_counter_inc(benchmark):
+    counter = metrics_exporter.Counter("bench_counter_total", "Benchmark counter", ["kind"])
+    benchmark(counter.inc, "transfer")
+
+
+def test_histogram_observe(benchmark):
+    histogram = metrics_exporter.Histogram("bench_histogram_seconds", "Benchmark histogram", ["stage"])
+    benchmark(histogram.observe, 0.003, "predict")
+
+
+def test_thread_shards_are_folded():
+    counter = metrics_exporter.Counter("bench_threads_total", "Short-lived thread counter", ["kind"])
+    histogram = metrics_exporter.Histogram("bench_threads_seconds", "Short-lived thread histogram")
+
+    def work():
+        counter.inc("rerun")
+        histogram.observe(0.01)
+
+    for _ in range(500):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert not counter._shards
+    assert not histogram._shards
+    assert counter.values() == {("rerun",): 500}
+    assert "bench_threads_seconds_count 500" in histogram.render()
@@ -0,0 +1,22 @@
+"""Benchmarks for statement export on the busiest account"""
+import io
+import sqlite3
+
+from statements import Statement, write_statement_csv, write_statement_pdf
+
+
+def _export(bench_dir, account_number, writer):
+    conn = sqlite3.connect(str(bench_dir / "bank.db"))
+    try:
+        statement = Statement(conn, account_number, "2020-01-01", "2026-12-31")
+        return writer(statement, io.BytesIO())
+    finally:
+        conn.close()
+
+
+def test_statement_csv(benchmark, bench_dir, busiest_account):
+    assert benchmark(_export, bench_dir, busiest_account.account_number, write_statement_csv)
+
+
+def test_statement_pdf(benchmark, bench_dir, busiest_account):
+    assert benchmark(_export, bench_dir, busiest_account.account_number, write_statement_pdf)
@@ -0,0 +1,97 @@
+"""Shared fixtures for the benchmark suite.
+
+The suite runs against a synthetic bank.db in a temporary working
+directory, because backend opens ``bank.db`` relative to the current
+directory and reads credentials from Streamlit secrets on import. Dataset
+size is set with environment variables:
+
+    WIREBUDDY_BENCH_ACCOUNTS      (default 1000)
+    WIREBUDDY_BENCH_TRANSACTIONS  (default 100000)
+    WIREBUDDY_BENCH_GOALS         (default 300)
+    WIREBUDDY_BENCH_FLAGS         (default 200)
+    WIREBUDDY_BENCH_SEED          (default 42)
+"""
+import importlib
+import os
+import shutil
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic_db
+
+SECRETS = """api_key = "sk_test_benchmark"
+
+[admin]
+account_number = "0000000000"
+pin = "0000"
+username = "admin"
+"""
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+@pytest.fixture(scope="session")
+def dataset_config():
+    return {
+        "accounts": _env_int("WIREBUDDY_BENCH_ACCOUNTS", 1000),
+        "transactions": _env_int("WIREBUDDY_BENCH_TRANSACTIONS", 100_000),
+        "goals": _env_int("WIREBUDDY_BENCH_GOALS", 300),
+        "flags": _env_int("WIREBUDDY_BENCH_FLAGS", 200),
+        "seed": _env_int("WIREBUDDY_BENCH_SEED", 42),
+    }
+
+
+@pytest.fixture(scope="session")
+def bench_dir(tmp_path_factory, dataset_config):
+    """Working directory holding the synthetic bank.db, model and rules files and secrets"""
+    workdir = tmp_path_factory.mktemp("wirebuddy")
+    synthetic_db.generate(str(workdir / "bank.db"), **dataset_config)
+    shutil.copy(os.path.join(REPO_ROOT, "fraud_model.pkl"), workdir)
+    shutil.copy(os.path.join(REPO_ROOT, "fraud_rules.json"), workdir)
+    (workdir / ".streamlit").mkdir()
+    (workdir / ".streamlit" / "secrets.toml").write_text(SECRETS)
+    return workdir
+
+
+@pytest.fixture(scope="session")
+def backend(bench_dir, request):
+    """The backend module, imported against the synthetic database"""
+    previous = os.getcwd()
+    os.chdir(bench_dir)
+    sys._called_from_test = True  # keeps backend from starting its training thread
+    module = importlib.import_module("backend")
+    request.addfinalizer(lambda: os.chdir(previous))
+    return module
+
+
+@pytest.fixture(scope="session")
+def busiest_account(backend):
+    """The account with the most ledger rows"""
+    backend.cursor.execute("""
+        SELECT account_number FROM transactions
+        GROUP BY account_number ORDER BY COUNT(*) DESC LIMIT 1
+    """)
+    return backend.Account.get_by_account_number(backend.cursor.fetchone()[0])
+
+
+@pytest.fixture(scope="session")
+def sample_transactions(backend):
+    """Outgoing transactions in the dict shape FraudDetector expects"""
+    backend.cursor.execute("""
+        SELECT account_number, type, ABS(amount), timestamp, description
+        FROM transactions
+        WHERE type IN ('Withdrawal', 'Transfer Out')
+        ORDER BY id LIMIT 1000
+    """)
+    return [
+        {"account_number": acc, "type": txn_type, "amount": amount,
+         "timestamp": timestamp, "description": description}
+        for acc, txn_type, amount, timestamp, description in backend.cursor.fetchall()
+    ]
@@ -0,0 +1,345 @@
+"""Headless load test for app.py using Streamlit's AppTest.
+
+Simulates N concurrent users, each with its own AppTest session in its own
+process (AppTest installs a process-wide mock runtime, so sessions cannot
+share an interpreter), scripting the login, dashboard, history, transfer,
+planner and (for admins) admin flows against one synthetic bank.db. Paystack and the exchange-rate API are
+replaced with in-process fakes, so no network calls are made. Every rerun
+is timed and attributed to the page it rendered; the report gives
+p50/p95/p99 rerun latency per page, throughput and error rate.
+
+    python benchmarks/load_app.py --users 20 --iterations 5 --json load.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import multiprocessing
+import threading
+import time
+import traceback
+import uuid
+from collections import defaultdict
+from unittest import mock
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic_db
+
+SECRETS = """api_key = "sk_test_loadtest"
+
+[admin]
+account_number = "0000000000"
+pin = "0000"
+username = "admin"
+"""
+ADMIN = {"username": "admin", "account_number": "0000000000", "pin": "0000"}
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+        self.status_code = 200
+
+    def json(self):
+        return self.payload
+
+
+class FakePaystack:
+    """Answers the Paystack and exchange-rate calls made by backend"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.initialized = {}
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, **kwargs):
+        time.sleep(self.latency)
+        if url.endswith("/transaction/initialize"):
+            reference = uuid.uuid4().hex[:12]
+            with self.lock:
+                self.initialized[reference] = json
+            return FakeResponse({"status": True, "data": {
+                "reference": reference,
+                "authorization_url": f"https://checkout.paystack.test/{reference}",
+            }})
+        if url.endswith("/transferrecipient"):
+            return FakeResponse({"status": True, "data": {"recipient_code": f"RCP_{uuid.uuid4().hex[:8]}"}})
+        if url.endswith("/transfer"):
+            return FakeResponse({"status": True, "data": {"status": "pending"}})
+        return FakeResponse({"status": False, "message": f"unexpected POST {url}"})
+
+    def get(self, url, **kwargs):
+        time.sleep(self.latency)
+        if "/transaction/verify/" in url:
+            reference = url.rsplit("/", 1)[-1]
+            with self.lock:
+                payload = self.initialized.get(reference)
+            if not payload:
+                return FakeResponse({"status": False, "message": "Transaction not found"})
+            return FakeResponse({"status": True, "data": {
+                "status": "success", "amount": payload["amount"], "metadata": payload["metadata"],
+            }})
+        if "/transfer/verify/" in url:
+            return FakeResponse({"status": True, "data": {"status": "success"}})
+        if "exchangerate-api" in url:
+            return FakeResponse({"rates": {"USD": 1.0, "EUR": 0.93, "GBP": 0.79, "KES": 141.5, "GHS": 11.9}})
+        return FakeResponse({"status": False, "message": f"unexpected GET {url}"})
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = []
+        self.lock = threading.Lock()
+
+    def record(self, page, seconds, error=None):
+        with self.lock:
+            self.latencies[page].append(seconds)
+            if error:
+                self.errors[page] += 1
+                if len(self.error_samples) < 20:
+                    self.error_samples.append({"page": page, "error": error})
+
+    def report(self, wall_seconds):
+        def percentile(values, q):
+            if len(values) == 1:
+                return values[0]
+            return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+        pages = {}
+        total = errors = 0
+        for page, values in sorted(self.latencies.items()):
+            total += len(values)
+            errors += self.errors[page]
+            pages[page] = {
+                "reruns": len(values),
+                "errors": self.errors[page],
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(max(values) * 1000, 1),
+            }
+        return {
+            "pages": pages,
+            "reruns": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "wall_seconds": round(wall_seconds, 2),
+            "reruns_per_second": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+            "error_samples": self.error_samples,
+        }
+
+
+class SimulatedUser:
+    def __init__(self, app_path, credentials, recipient, stats, timeout, is_admin=False):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(app_path, default_timeout=timeout)
+        self.credentials = credentials
+        self.recipient = recipient
+        self.stats = stats
+        self.is_admin = is_admin
+
+    def _timed(self, action):
+        """Run one interaction and record it against the page it rendered"""
+        started = time.perf_counter()
+        error = None
+        try:
+            action()
+            if self.at.exception:
+                error = self.at.exception[0].value
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+        try:
+            page = self.at.session_state.page
+        except Exception:
+            page = "unknown"
+        self.stats.record(page, elapsed, error)
+        return error is None
+
+    def _input(self, widgets, label, value):
+        next(w for w in widgets if w.label == label).set_value(value)
+
+    def _submit(self, label):
+        next(b for b in self.at.button if b.label == label and b.key and b.key.startswith("FormSubmitter")).click()
+        self.at.run()
+
+    def _navigate(self, key):
+        self.at.button(key=key).click()
+        self.at.run()
+
+    def login(self):
+        self._timed(self.at.run)
+        self._input(self.at.text_input, "Username", self.credentials["username"])
+        self._input(self.at.text_input, "Account Number", self.credentials["account_number"])
+        self._input(self.at.text_input, "PIN", self.credentials["pin"])
+        return self._timed(lambda: self._submit("Login"))
+
+    def dashboard(self):
+        self._timed(lambda: self._navigate("nav_home"))
+
+    def history(self):
+        self._timed(lambda: self._navigate("nav_history"))
+
+    def transfer(self):
+        if not self._timed(lambda: self._navigate("quick_transfer")):
+            return
+        if not any(w.label == "Recipient Account Number" for w in self.at.text_input):
+            return  # zero balance: the page only offers a way back
+        self._input(self.at.text_input, "Recipient Account Number", self.recipient)
+        self._input(self.at.number_input, "Amount", 0.01)
+        self._input(self.at.text_input, "Enter 4‑digit PIN", self.credentials["pin"])
+        self._timed(lambda: self._submit("Send Money"))
+
+    def planner(self):
+        self._timed(lambda: self._navigate("nav_planner"))
+
+    def admin(self):
+        self._timed(lambda: self._navigate("nav_admin_panel"))
+
+    def run(self, iterations):
+        if not self.login():
+            return
+        for _ in range(iterations):
+            self.dashboard()
+            if self.is_admin:
+                self.admin()
+                continue
+            self.history()
+            self.dashboard()
+            self.transfer()
+            self.planner()
+
+
+def prepare_workdir(workdir, accounts, transactions, seed):
+    synthetic_db.generate(os.path.join(workdir, "bank.db"), accounts=accounts,
+                          transactions=transactions, goals=max(accounts // 3, 1),
+                          flags=max(transactions // 500, 1), seed=seed)
+    shutil.copy(os.path.join(REPO_ROOT, "fraud_model.pkl"), workdir)
+    shutil.copytree(os.path.join(REPO_ROOT, "assets"), os.path.join(workdir, "assets"))
+    os.makedirs(os.path.join(workdir, ".streamlit"))
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as f:
+        f.write(SECRETS)
+
+
+def _user_process(workdir, user_args, iterations, paystack_latency, ready, start, results):
+    """Run one simulated user and send its timings back to the parent"""
+    os.chdir(workdir)
+    sys._called_from_test = True  # no background training thread
+    stats = LoadStats()
+    paystack = FakePaystack(paystack_latency)
+    try:
+        with mock.patch("requests.post", paystack.post), mock.patch("requests.get", paystack.get):
+            import backend  # connect and load the models before the clock starts
+
+            user = SimulatedUser(os.path.join(REPO_ROOT, "app.py"), stats=stats, **user_args)
+            ready.release()
+            start.wait()
+            user.run(iterations)
+    except Exception:
+        ready.release()
+        stats.record("harness", 0.0, traceback.format_exc(limit=3))
+    results.put((dict(stats.latencies), dict(stats.errors), stats.error_samples))
+
+
+def _warm_up(workdir):
+    """Import backend once so schema migrations and the admin account exist up front"""
+    os.chdir(workdir)
+    sys._called_from_test = True
+    import backend
+
+
+def run_load(users, iterations, admins, accounts, transactions, seed, paystack_latency, timeout):
+    workdir = tempfile.mkdtemp(prefix="wirebuddy-load-")
+    context = multiprocessing.get_context("spawn")
+    stats = LoadStats()
+    try:
+        prepare_workdir(workdir, accounts, transactions, seed)
+        warm_up = context.Process(target=_warm_up, args=(workdir,))
+        warm_up.start()
+        warm_up.join()
+
+        ready, start, results = context.Semaphore(0), context.Event(), context.Queue()
+        processes = []
+        for i in range(users):
+            if i < admins:
+                credentials, is_admin = ADMIN, True
+            else:
+                n = (i * 7919) % accounts
+                credentials = {"username": f"user{n}", "account_number": f"02{n:08d}", "pin": "1234"}
+                is_admin = False
+            user_args = {"credentials": credentials, "recipient": f"02{(i * 7919 + 1) % accounts:08d}",
+                         "timeout": timeout, "is_admin": is_admin}
+            process = context.Process(target=_user_process, args=(
+                workdir, user_args, iterations, paystack_latency, ready, start, results))
+            process.start()
+            processes.append(process)
+
+        for _ in processes:
+            ready.acquire()
+        started = time.perf_counter()
+        start.set()
+        for _ in processes:
+            latencies, errors, samples = results.get()
+            for page, values in latencies.items():
+                stats.latencies[page].extend(values)
+            for page, count in errors.items():
+                stats.errors[page] += count
+            stats.error_samples.extend(samples[:20 - len(stats.error_samples)])
+        wall = time.perf_counter() - started
+        for process in processes:
+            process.join()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = stats.report(wall)
+    report["config"] = {"users": users, "iterations": iterations, "admins": admins,
+                        "accounts": accounts, "transactions": transactions, "seed": seed,
+                        "paystack_latency_ms": paystack_latency * 1000}
+    return report
+
+
+def print_report(report):
+    print(f"{'page':<16}{'reruns':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for page, row in report["pages"].items():
+        print(f"{page:<16}{row['reruns']:>8}{row['errors']:>8}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}")
+    print(f"\n{report['reruns']} reruns in {report['wall_seconds']}s "
+          f"({report['reruns_per_second']}/s), error rate {report['error_rate']:.2%}")
+    for sample in report["error_samples"][:5]:
+        print(f"  error on {sample['page']}: {sample['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless load test for app.py")
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=3, help="flow repetitions per user")
+    parser.add_argument("--admins", type=int, default=1, help="how many of the users are admins")
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--paystack-latency-ms", type=float, default=0.0,
+                        help="simulated Paystack round-trip time")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun timeout in seconds")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run_load(args.users, args.iterations, args.admins, args.accounts, args.transactions,
+                      args.seed, args.paystack_latency_ms / 1000, args.timeout)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
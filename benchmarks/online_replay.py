@@ -0,0 +1,248 @@
+"""Online anomaly detector replay: updates per second, detection and adaptation lag.
+
+Replays a synthetic stream of withdrawals and transfers through
+online_detector.OnlineDetector (with its own velocity counters), scoring
+each transaction before it is recorded and learning from it after, as
+backend does. The stream has:
+
+    background  ``--transactions`` payments by ``--accounts`` accounts over
+                ``--days`` days, in the daytime, amounts around each
+                account's own typical amount
+    drift       from ``--drift-at`` (share of the stream) on, everyone pays
+                eight times as much, and mostly by transfer
+    attacks     ``--attacks`` bursts of 8 night-time transfers from one
+                account, each 3-8 times its typical amount and a minute or
+                two apart, before and after the drift
+
+A transaction scoring at least ``--threshold`` is an alert. Reports:
+
+    throughput       transactions per second end to end (features, score,
+                     learn), and learn / score calls per second on
+                     precomputed feature vectors
+    detection lag    per attack burst, how many of its transfers went by
+                     before the first alert, and the seconds that took
+    adaptation lag   transactions after the drift until the alert rate per
+                     window is back within twice the rate before it; and
+                     the alert rate of a copy frozen at the drift, as a
+                     model that is not retrained would see it
+    checkpoint       save and load time and file size
+
+    python benchmarks/online_replay.py --transactions 200000 --json online.json
+"""
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import online_detector
+from velocity_features import VelocityStore
+
+BURST = 8
+
+
+def synthetic_stream(transactions, accounts, days, attacks, drift_at, seed):
+    rng = np.random.default_rng(seed)
+    start = datetime(2026, 1, 5)
+    typical = rng.lognormal(4.0, 0.8, accounts)
+    activity = rng.pareto(1.5, accounts) + 1
+    owners = rng.choice(accounts, transactions, p=activity / activity.sum())
+    seconds = np.sort(rng.integers(0, days * 86400, transactions))
+    hours = np.clip(np.round(rng.normal(13, 3, transactions)), 6, 23).astype(int)
+    seconds = seconds // 86400 * 86400 + hours * 3600 + rng.integers(0, 3600, transactions)
+    drifted = np.arange(transactions) >= int(transactions * drift_at)
+    amounts = np.round(typical[owners] * rng.lognormal(0, 0.5, transactions) * np.where(drifted, 8, 1), 2)
+    kinds = np.where(rng.random(transactions) < np.where(drifted, 0.3, 0.7), "Withdrawal", "Transfer Out")
+    stream = [{"account_number": f"02{owner:08d}", "type": str(kind), "amount": float(amount),
+               "offset": int(offset), "attack": None}
+              for owner, kind, amount, offset in zip(owners, kinds, amounts, seconds)]
+
+    # attack bursts, half of them before and half after the drift, none in the first day
+    drift_offset = int(seconds[int(transactions * drift_at)]) if transactions else 0
+    for burst in range(attacks):
+        low, high = (86400, drift_offset) if burst % 2 == 0 else (drift_offset + 86400, days * 86400)
+        night = int(rng.integers(low, high)) // 86400 * 86400 + int(rng.integers(0, 4 * 3600))
+        owner = int(rng.choice(accounts))
+        scale = typical[owner] * (8 if low > drift_offset else 1)
+        for i in range(BURST):
+            stream.append({"account_number": f"02{owner:08d}", "type": "Transfer Out",
+                           "amount": round(float(scale * rng.uniform(3, 8)), 2),
+                           "offset": night + i * int(rng.integers(60, 180)), "attack": burst})
+    stream.sort(key=lambda txn: txn["offset"])
+    for txn in stream:
+        txn["timestamp"] = (start + timedelta(seconds=txn["offset"])).strftime('%Y-%m-%d %H:%M:%S')
+    drift_index = next((i for i, txn in enumerate(stream) if txn["offset"] >= drift_offset), len(stream))
+    return stream, drift_index
+
+
+def replay(detector, velocity, stream, drift_index):
+    """Scores of the stream, and of its normal transactions from the drift on by a copy frozen there"""
+    scores = np.empty(len(stream))
+    frozen = None
+    frozen_scores = []
+    elapsed = 0.0
+    for i, txn in enumerate(stream):
+        if i == drift_index:
+            frozen = copy.deepcopy(detector.model)
+        if frozen is not None and txn["attack"] is None:
+            frozen_scores.append(frozen.score_path(frozen.path(detector.vector(txn))))
+        started = time.perf_counter()
+        scores[i] = detector.score(txn)
+        velocity.record(txn["account_number"], txn["type"], txn["amount"], txn["timestamp"])
+        detector.learn(txn)
+        elapsed += time.perf_counter() - started
+    return scores, np.array(frozen_scores), elapsed
+
+
+def detection(stream, scores, threshold):
+    bursts = {}
+    for txn, score in zip(stream, scores):
+        if txn["attack"] is not None:
+            bursts.setdefault(txn["attack"], []).append((txn["offset"], score))
+    lags, seconds = [], []
+    for rows in bursts.values():
+        hit = next((i for i, (_, score) in enumerate(rows) if score >= threshold), None)
+        if hit is not None:
+            lags.append(hit)
+            seconds.append(rows[hit][0] - rows[0][0])
+    return {
+        "bursts": len(bursts), "detected": len(lags),
+        "lag_transactions_p50": statistics.median(lags) if lags else None,
+        "lag_transactions_max": max(lags) if lags else None,
+        "lag_seconds_p50": statistics.median(seconds) if seconds else None,
+        "attack_transactions_alerted": round(float(np.mean([s >= threshold for rows in bursts.values()
+                                                            for _, s in rows])), 3) if bursts else None,
+    }
+
+
+def adaptation(stream, scores, frozen_scores, threshold, drift_index, window):
+    normal = np.array([txn["attack"] is None for txn in stream])
+    alerts = scores >= threshold
+    before = alerts[:drift_index][normal[:drift_index]]
+    baseline = float(before[-20 * window:].mean()) if len(before) else 0.0
+    after = alerts[drift_index:][normal[drift_index:]]
+    lag = None
+    for start in range(0, len(after) - window + 1, window // 4):
+        if after[start:start + window].mean() <= max(2 * baseline, 1 / window):
+            lag = start
+            break
+    frozen_alerts = frozen_scores >= threshold
+    return {
+        "alert_rate_before": round(baseline, 4),
+        "alert_rate_first_window_after": round(float(after[:window].mean()), 4) if len(after) else None,
+        "alert_rate_after": round(float(after[5 * window:].mean()), 4) if len(after) > 5 * window else None,
+        "frozen_alert_rate_after": round(float(frozen_alerts[5 * window:].mean()), 4)
+        if len(frozen_alerts) > 5 * window else None,
+        "lag_transactions": lag,
+    }
+
+
+def model_throughput(model, vectors):
+    paths = [model.path(x) for x in vectors]
+    started = time.perf_counter()
+    for x in vectors:
+        model.path(x)
+    path_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for path in paths:
+        model.learn_path(path)
+    learn_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for path in paths:
+        model.score_path(path)
+    score_s = time.perf_counter() - started
+    return {
+        "path_per_s": round(len(vectors) / path_s),
+        "learn_updates_per_s": round(len(vectors) / (path_s + learn_s)),
+        "score_per_s": round(len(vectors) / (path_s + score_s)),
+    }
+
+
+def run(transactions, accounts, days, attacks, drift_at, threshold, window, seed):
+    stream, drift_index = synthetic_stream(transactions, accounts, days, attacks, drift_at, seed)
+    velocity = VelocityStore()
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "online_detector.npz")
+        detector = online_detector.OnlineDetector(velocity, checkpoint, checkpoint_interval=0, window=window)
+        report = {"config": {"transactions": len(stream), "accounts": accounts, "days": days, "attacks": attacks,
+                             "drift_at": drift_index, "threshold": threshold, "window": window, "seed": seed},
+                  "model": {name: value for name, value in detector.report().items()
+                            if name in ("trees", "height", "memory_kb")}}
+        scores, frozen_scores, elapsed = replay(detector, velocity, stream, drift_index)
+        report["replay"] = {"seconds": round(elapsed, 2), "transactions_per_s": round(len(stream) / elapsed),
+                            "us_per_transaction": round(elapsed / len(stream) * 1e6, 1)}
+        vectors = [detector.vector(txn, recorded=True) for txn in stream[-min(20_000, len(stream)):]]
+        report["model_only"] = model_throughput(copy.deepcopy(detector.model), vectors)
+        report["detection"] = detection(stream, scores, threshold)
+        report["adaptation"] = adaptation(stream, scores, frozen_scores, threshold, drift_index, window)
+        normal = np.array([txn["attack"] is None for txn in stream])
+        report["alerts_per_day"] = round(float((scores[normal] >= threshold).sum()) / days, 1)
+        report["score_percentiles"] = {f"p{q}": round(float(np.percentile(scores[normal], q)), 3)
+                                       for q in (50, 90, 99, 99.9)}
+
+        started = time.perf_counter()
+        detector.save()
+        saved = time.perf_counter() - started
+        started = time.perf_counter()
+        detector.load()
+        report["checkpoint"] = {"save_ms": round(saved * 1000, 1),
+                                "load_ms": round((time.perf_counter() - started) * 1000, 1),
+                                "kb": round(os.path.getsize(checkpoint) / 1024, 1)}
+    return report
+
+
+def print_report(report):
+    config, model = report["config"], report["model"]
+    print(f"{config['transactions']:,} transactions, {config['accounts']:,} accounts, {config['days']} days, "
+          f"{config['attacks']} attack bursts; {model['trees']} trees of height {model['height']}, "
+          f"window {config['window']}, {model['memory_kb']:,} KB")
+    replayed, only = report["replay"], report["model_only"]
+    print(f"replay {replayed['transactions_per_s']:,} transactions/s ({replayed['us_per_transaction']} µs each); "
+          f"model only: {only['learn_updates_per_s']:,} updates/s, {only['score_per_s']:,} scores/s")
+    percentiles = report["score_percentiles"]
+    print(f"normal scores " + ", ".join(f"{name} {value}" for name, value in percentiles.items())
+          + f"; {report['alerts_per_day']:,} alerts/day at {config['threshold']}")
+    found = report["detection"]
+    print(f"attacks detected {found['detected']}/{found['bursts']}, lag p50 {found['lag_transactions_p50']} "
+          f"transfers ({found['lag_seconds_p50']} s), max {found['lag_transactions_max']}; "
+          f"{found['attack_transactions_alerted']:.0%} of attack transfers alerted")
+    drift = report["adaptation"]
+    print(f"drift: alert rate {drift['alert_rate_before']:.2%} before, {drift['alert_rate_first_window_after']:.2%} "
+          f"right after, back within 2x after {drift['lag_transactions']} transactions, "
+          f"{drift['alert_rate_after']:.2%} later (frozen copy {drift['frozen_alert_rate_after']:.2%})")
+    checkpoint = report["checkpoint"]
+    print(f"checkpoint {checkpoint['kb']:,} KB, save {checkpoint['save_ms']} ms, load {checkpoint['load_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a transaction stream through the online anomaly detector")
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--accounts", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--attacks", type=int, default=20)
+    parser.add_argument("--drift-at", type=float, default=0.5)
+    parser.add_argument("--threshold", type=float, default=online_detector.ALERT_SCORE)
+    parser.add_argument("--window", type=int, default=online_detector.WINDOW)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.transactions, args.accounts, args.days, args.attacks, args.drift_at, args.threshold,
+                 args.window, args.seed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Image weight and decode time of the home carousel and login logo.
+
+Compares the source images in assets/ with the variants a browser picks
+from static/ (via build_assets.py) for a few viewport widths: bytes
+transferred, and the time to decode the file and scale it to the slide
+size (Pillow, as a stand-in for the browser's decode and paint). Also
+lists any third-party URLs left in the carousel markup.
+
+    python benchmarks/page_weight.py
+"""
+import argparse
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+from PIL import Image
+
+import build_assets
+
+CAROUSEL = ["5.jpg", "7.png", "6.jpg", "8.png"]
+LOGO = ("wb.png", 300)  # shown at 150 CSS px, 2x for high-DPI screens
+VIEWPORTS = (480, 1280, 1920)
+
+
+def pick(variants, width, fmt="webp"):
+    """The variant a browser takes from srcset for a slot of width pixels"""
+    candidates = sorted((v for v in variants if v["format"] == fmt), key=lambda v: v["width"])
+    for variant in candidates:
+        if variant["width"] >= width:
+            return variant
+    return candidates[-1]
+
+
+def decode_ms(path, width, repeat):
+    with open(path, "rb") as f:
+        data = f.read()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft("RGB", (width, width))  # lets JPEG decode at reduced size, as browsers do
+            image = image.convert("RGB")
+            if image.width > width:
+                image.resize((width, round(image.height * width / image.width)), Image.BILINEAR)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def external_urls():
+    with open(os.path.join(REPO_ROOT, "views", "home.py")) as f:
+        return sorted(set(re.findall(r"https?://[^\s'\")]+", f.read())))
+
+
+def measure(repeat):
+    with open(os.path.join(build_assets.STATIC_DIR, build_assets.MANIFEST)) as f:
+        images = json.load(f)["images"]
+
+    rows = []
+    for viewport in VIEWPORTS:
+        slots = [(name, viewport) for name in CAROUSEL] + [LOGO]
+        before_bytes = after_bytes = before_ms = after_ms = 0.0
+        for name, width in slots:
+            source = os.path.join(build_assets.ASSETS_DIR, name)
+            variant = pick(images[name]["variants"], width)
+            before_bytes += os.path.getsize(source)
+            after_bytes += variant["bytes"]
+            before_ms += decode_ms(source, width, repeat)
+            after_ms += decode_ms(os.path.join(build_assets.STATIC_DIR, variant["file"]), width, repeat)
+        rows.append({
+            "viewport": viewport,
+            "before_kib": round(before_bytes / 1024, 1),
+            "after_kib": round(after_bytes / 1024, 1),
+            "before_decode_ms": round(before_ms, 1),
+            "after_decode_ms": round(after_ms, 1),
+        })
+    return {"viewports": rows, "external_urls": external_urls()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carousel and logo image weight, before and after build_assets.py")
+    parser.add_argument("--repeat", type=int, default=5, help="decodes per image, the median is reported")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = measure(args.repeat)
+    print(f"{'viewport':>9}{'source KiB':>12}{'built KiB':>11}{'source decode ms':>18}{'built decode ms':>17}")
+    for row in report["viewports"]:
+        print(f"{row['viewport']:>9}{row['before_kib']:>12}{row['after_kib']:>11}"
+              f"{row['before_decode_ms']:>18}{row['after_decode_ms']:>17}")
+    print(f"third-party URLs in the carousel: {len(report['external_urls'])}")
+    for url in report["external_urls"]:
+        print(f"  {url}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
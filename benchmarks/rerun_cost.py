@@ -0,0 +1,128 @@
+"""CPU time and memory of one app.py rerun, per page.
+
+Each role (customer, admin) runs in its own process with an AppTest session
+logged in against a synthetic bank.db. Every page is rendered ``--reruns``
+times; the report gives the mean and p95 process CPU time per rerun, the
+peak Python memory allocated during a rerun (tracemalloc, measured on a
+separate pass because tracing slows the script down) and which modules
+the page imported for the first time.
+
+    python benchmarks/rerun_cost.py --reruns 20 --json rerun_cost.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from load_app import ADMIN, FakePaystack, prepare_workdir
+
+CUSTOMER = {"username": "user1", "account_number": "0200000001", "pin": "1234"}
+CUSTOMER_PAGES = ["home", "history", "deposit", "withdraw", "transfer", "profile",
+                  "planner", "₵_converter", "finbot"]
+ADMIN_PAGES = ["home", "admin_panel"]
+
+
+def _role_process(workdir, credentials, pages, reruns, results):
+    os.chdir(workdir)
+    sys._called_from_test = True  # no background training thread
+    with mock.patch("requests.post", FakePaystack().post), mock.patch("requests.get", FakePaystack().get):
+        from streamlit.testing.v1 import AppTest
+        from backend import Account
+
+        at = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=120)
+        at.run()
+        at.session_state.logged_in_user = Account.find_by_login(
+            credentials["username"], credentials["account_number"], credentials["pin"])
+
+        report = {}
+        for page in pages:
+            modules_before = set(sys.modules)
+            at.session_state.page = page
+            at.run()  # warm-up: first imports and caches
+            imported = sorted(m for m in set(sys.modules) - modules_before if "." not in m)
+
+            cpu = []
+            for _ in range(reruns):
+                started = time.process_time()
+                at.run()
+                cpu.append((time.process_time() - started) * 1000)
+
+            peaks = []
+            for _ in range(max(1, reruns // 4)):
+                tracemalloc.start()
+                at.run()
+                peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+                tracemalloc.stop()
+
+            cpu.sort()
+            report[page] = {
+                "reruns": reruns,
+                "cpu_mean_ms": round(statistics.fmean(cpu), 2),
+                "cpu_p95_ms": round(cpu[min(len(cpu) - 1, int(len(cpu) * 0.95))], 2),
+                "peak_kib": round(statistics.fmean(peaks), 1),
+                "errors": [str(e.value) for e in at.exception],
+                "new_modules": imported,
+            }
+    results.put(report)
+
+
+def run(reruns, accounts, transactions, seed):
+    workdir = tempfile.mkdtemp(prefix="wirebuddy-rerun-")
+    context = multiprocessing.get_context("spawn")
+    report = {}
+    try:
+        prepare_workdir(workdir, accounts, transactions, seed)
+        for role, credentials, pages in (("customer", CUSTOMER, CUSTOMER_PAGES),
+                                         ("admin", ADMIN, ADMIN_PAGES)):
+            results = context.Queue()
+            process = context.Process(target=_role_process,
+                                      args=(workdir, credentials, pages, reruns, results))
+            process.start()
+            report[role] = results.get()
+            process.join()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    report["config"] = {"reruns": reruns, "accounts": accounts, "transactions": transactions, "seed": seed}
+    return report
+
+
+def print_report(report):
+    print(f"{'role':<10}{'page':<14}{'cpu ms':>10}{'p95 ms':>10}{'peak KiB':>10}  new modules")
+    for role in ("customer", "admin"):
+        for page, row in report[role].items():
+            print(f"{role:<10}{page:<14}{row['cpu_mean_ms']:>10}{row['cpu_p95_ms']:>10}{row['peak_kib']:>10}"
+                  f"  {', '.join(row['new_modules'][:6])}")
+            for error in row["errors"]:
+                print(f"  error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page CPU time and memory of app.py reruns")
+    parser.add_argument("--reruns", type=int, default=20, help="timed reruns per page")
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.reruns, args.accounts, args.transactions, args.seed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark streaming statement export on a single large account.
+
+Builds a throwaway database holding one account with N transactions
+(10^6 by default), then times CSV and PDF export. With --trace-memory it also records peak
+Python heap use, which should stay flat as N grows.
+
+    python benchmarks/statement_export.py --rows 1000000 --trace-memory
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from statements import Statement, write_statement_csv, write_statement_pdf
+
+
+ACCOUNT = "0240000001"
+TYPES = ["Deposit", "Withdrawal", "Transfer In", "Transfer Out"]
+
+
+def build_database(path, rows, seed=42):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE accounts (account_number TEXT PRIMARY KEY, name TEXT, balance REAL)
+    """)
+    conn.execute("""
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, account_number TEXT, type TEXT,
+            amount REAL, description TEXT, timestamp TEXT, reference_id TEXT)
+    """)
+    conn.execute("""
+        CREATE INDEX idx_transactions_account_time ON transactions(account_number, timestamp, id)
+    """)
+
+    start = datetime(2015, 1, 1)
+    step = timedelta(days=3650) / rows
+
+    def generate():
+        for i in range(rows):
+            txn_type = rng.choice(TYPES)
+            amount = round(rng.lognormvariate(4, 1), 2)
+            yield (ACCOUNT, txn_type, amount, f"{txn_type} #{i}",
+                   (start + step * i).strftime('%Y-%m-%d %H:%M:%S'), f"{i:08x}")
+
+    conn.executemany("""
+        INSERT INTO transactions (account_number, type, amount, description, timestamp, reference_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, generate())
+    conn.execute("INSERT INTO accounts VALUES (?, 'Benchmark User', 1000000.0)", (ACCOUNT,))
+    conn.commit()
+    conn.close()
+
+
+def export(path, writer, out_path):
+    conn = sqlite3.connect(path)
+    try:
+        statement = Statement(conn, ACCOUNT, "2015-01-01", "2024-12-31")
+        with open(out_path, "wb") as out:
+            size = writer(statement, out)
+    finally:
+        conn.close()
+    return statement.transaction_count, size
+
+
+def run_export(path, writer, out_path, trace_memory):
+    started = time.perf_counter()
+    rows, size = export(path, writer, out_path)
+    elapsed = time.perf_counter() - started
+    result = {
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed),
+        "output_bytes": size,
+    }
+
+    # tracemalloc slows export several times over, so measure it in a second pass
+    if trace_memory:
+        tracemalloc.start()
+        export(path, writer, out_path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_python_heap_mb"] = round(peak / 2 ** 20, 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="re-run each export under tracemalloc to record peak heap use")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "bench.db")
+        started = time.perf_counter()
+        build_database(db_path, args.rows)
+        print(f"Built {args.rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+        results = {"rows": args.rows}
+        for name, writer in (("csv", write_statement_csv), ("pdf", write_statement_pdf)):
+            results[name] = run_export(db_path, writer, os.path.join(workdir, f"statement.{name}"),
+                                       args.trace_memory)
+            print(name, results[name])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Reproducible synthetic bank.db generator for benchmarks and load tests.
+
+Creates the tables the app reads from and fills them with seeded data:
+account activity is heavy-tailed (a few very busy customers), amounts are
+log-normal per transaction type, activity peaks during the day, transfers
+are written as Transfer Out/Transfer In pairs sharing a reference, and
+balances match the ledger. Tables it leaves empty are created by backend
+on import.
+
+    python benchmarks/synthetic_db.py --out bank.db --accounts 1000 --transactions 100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS accounts (
+        account_number TEXT PRIMARY KEY,
+        name TEXT,
+        pin TEXT,
+        username TEXT UNIQUE,
+        national_id TEXT,
+        address TEXT,
+        balance REAL DEFAULT 0.0,
+        created_at TEXT,
+        is_active BOOLEAN DEFAULT 1,
+        is_admin BOOLEAN DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_number TEXT,
+        type TEXT,
+        amount REAL,
+        description TEXT,
+        timestamp TEXT,
+        reference_id TEXT,
+        FOREIGN KEY(account_number) REFERENCES accounts(account_number)
+    )""",
+    """CREATE TABLE IF NOT EXISTS savings_goals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_number TEXT,
+        goal_name TEXT,
+        target_amount REAL,
+        current_amount REAL DEFAULT 0.0,
+        target_date TEXT,
+        created_at TEXT,
+        FOREIGN KEY(account_number) REFERENCES accounts(account_number)
+    )""",
+    """CREATE TABLE IF NOT EXISTS savings_goals_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        goal_id INTEGER,
+        contribution_amount REAL,
+        current_amount REAL,
+        timestamp TEXT,
+        FOREIGN KEY(goal_id) REFERENCES savings_goals(id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS flagged_transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        transaction_ref TEXT NOT NULL,
+        account_number TEXT NOT NULL,
+        flagged_at TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        reviewed_by TEXT,
+        reviewed_at TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS transaction_categories (
+        transaction_id INTEGER PRIMARY KEY,
+        category TEXT,
+        FOREIGN KEY(transaction_id) REFERENCES transactions(id)
+    )""",
+    """CREATE INDEX IF NOT EXISTS idx_transactions_account_time
+       ON transactions(account_number, timestamp, id)""",
+]
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# (type, probability, log-normal mu, sigma); a transfer yields two ledger rows
+TRANSACTION_MIX = [
+    ("Deposit", 0.32, 5.5, 0.9),
+    ("Withdrawal", 0.20, 4.6, 0.8),
+    ("Transfer", 0.33, 4.3, 1.0),
+    ("Savings Contribution", 0.10, 4.0, 0.7),
+    ("Savings Withdrawal", 0.05, 4.2, 0.7),
+]
+
+# Relative activity by hour of day: quiet overnight, peaking late morning and evening
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 4, 7, 9, 10, 11, 11, 10, 10, 9, 9, 10, 11, 12, 11, 9, 6, 4, 2]
+
+CATEGORIES = ['Food', 'Transport', 'Entertainment', 'Utilities', 'Shopping']
+FIRST_NAMES = ["Ama", "Kofi", "Akosua", "Kwame", "Esi", "Yaw", "Abena", "Kojo", "Adwoa", "Kwaku"]
+LAST_NAMES = ["Mensah", "Owusu", "Boateng", "Asante", "Osei", "Addo", "Appiah", "Darko", "Agyeman"]
+GOAL_NAMES = ["Emergency Fund", "School Fees", "New Phone", "Rent", "Holiday", "Car", "Wedding"]
+
+
+def _timestamp(dt):
+    return dt.strftime(TIMESTAMP_FORMAT)
+
+
+def generate(path, accounts=1000, transactions=100_000, goals=300, flags=200,
+             seed=42, now=None, overwrite=True):
+    """Write a synthetic database to ``path``; returns a summary dict"""
+    rng = random.Random(seed)
+    now = now or datetime(2026, 1, 1)
+    if overwrite and os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+    # Accounts: ages up to three years, heavy-tailed activity weights
+    account_rows = []
+    created = {}
+    for i in range(accounts):
+        account_number = f"02{i:08d}"
+        created_at = now - timedelta(days=rng.uniform(30, 1095), seconds=rng.randint(0, 86399))
+        created[account_number] = created_at
+        account_rows.append([
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", account_number, "1234",
+            f"user{i}", f"GHA-{rng.randint(10**8, 10**9 - 1)}", "Accra",
+            0.0, _timestamp(created_at), 1 if rng.random() > 0.02 else 0, 0
+        ])
+    account_numbers = list(created)
+    weights = [rng.paretovariate(1.2) for _ in account_numbers]
+
+    types = [mix[0] for mix in TRANSACTION_MIX]
+    type_weights = [mix[1] for mix in TRANSACTION_MIX]
+    amount_params = {mix[0]: mix[2:] for mix in TRANSACTION_MIX}
+
+    def random_time(account_number):
+        start = created[account_number]
+        day = start + timedelta(days=rng.uniform(0, (now - start).days))
+        hour = rng.choices(range(24), HOUR_WEIGHTS)[0]
+        return day.replace(hour=hour, minute=rng.randint(0, 59), second=rng.randint(0, 59))
+
+    ledger = []
+    while len(ledger) < transactions:
+        account_number = rng.choices(account_numbers, weights)[0]
+        kind = rng.choices(types, type_weights)[0]
+        mu, sigma = amount_params[kind]
+        amount = round(rng.lognormvariate(mu, sigma), 2)
+        when = random_time(account_number)
+        reference_id = f"{rng.getrandbits(32):08x}"
+
+        if kind == "Transfer":
+            recipient = rng.choice(account_numbers)
+            if recipient == account_number:
+                continue
+            when = max(when, created[recipient])
+            ledger.append((when, account_number, "Transfer Out", -amount, f"To: {recipient}", reference_id))
+            ledger.append((when, recipient, "Transfer In", amount, f"From: {account_number}", reference_id))
+        elif kind == "Deposit":
+            ledger.append((when, account_number, "Deposit", amount, "Deposit made", reference_id))
+        elif kind == "Withdrawal":
+            momo = f"0{rng.choice('25')}{rng.randint(10**7, 10**8 - 1)}"
+            ledger.append((when, account_number, "Withdrawal", -amount, f"MoMo to {momo}", reference_id))
+        else:
+            verb = "Contribution to" if kind == "Savings Contribution" else "Withdrawal from"
+            ledger.append((when, account_number, kind, amount,
+                           f"{verb} goal ID: {rng.randint(1, max(goals, 1))}", reference_id))
+
+    # Keep every balance non-negative with an opening deposit when needed
+    balances = dict.fromkeys(account_numbers, 0.0)
+    for _, account_number, kind, amount, _, _ in ledger:
+        debit = kind in ("Withdrawal", "Transfer Out", "Savings Contribution")
+        balances[account_number] += -abs(amount) if debit else abs(amount)
+    for account_number, balance in balances.items():
+        if balance < 0:
+            topup = round(-balance + rng.uniform(10, 500), 2)
+            ledger.append((created[account_number], account_number, "Deposit", topup,
+                           "Deposit made", f"{rng.getrandbits(32):08x}"))
+            balances[account_number] += topup
+    for row in account_rows:
+        row[6] = round(balances[row[1]], 2)
+
+    ledger.sort(key=lambda row: row[0])
+    conn.executemany("""
+        INSERT INTO accounts (name, account_number, pin, username, national_id, address,
+                              balance, created_at, is_active, is_admin)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, account_rows)
+    conn.executemany("""
+        INSERT INTO transactions (account_number, type, amount, description, timestamp, reference_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, ((acc, kind, amount, desc, _timestamp(when), ref) for when, acc, kind, amount, desc, ref in ledger))
+    conn.executemany(
+        "INSERT INTO transaction_categories (transaction_id, category) VALUES (?, ?)",
+        ((i, rng.choice(CATEGORIES)) for i in range(1, len(ledger) + 1))
+    )
+
+    # Savings goals with a contribution history
+    goal_rows, history_rows = [], []
+    for goal_id in range(1, goals + 1):
+        account_number = rng.choice(account_numbers)
+        target = round(rng.uniform(500, 20000), 2)
+        goal_created = random_time(account_number)
+        current = 0.0
+        when = goal_created
+        for _ in range(rng.randint(0, 10)):
+            contribution = round(rng.uniform(20, target / 5), 2)
+            current = round(current + contribution, 2)
+            when = when + timedelta(days=rng.uniform(1, 30))
+            history_rows.append((goal_id, contribution, current, _timestamp(when)))
+        target_date = (now + timedelta(days=rng.randint(30, 730))).strftime('%Y-%m-%d')
+        goal_rows.append((account_number, rng.choice(GOAL_NAMES), target, current,
+                          target_date, _timestamp(goal_created)))
+    conn.executemany("""
+        INSERT INTO savings_goals (account_number, goal_name, target_amount, current_amount,
+                                   target_date, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, goal_rows)
+    conn.executemany("""
+        INSERT INTO savings_goals_history (goal_id, contribution_amount, current_amount, timestamp)
+        VALUES (?, ?, ?, ?)
+    """, history_rows)
+
+    # Flags on outgoing transactions, a mix of pending and reviewed
+    outgoing = [row for row in ledger if row[2] in ("Withdrawal", "Transfer Out")]
+    flag_rows = []
+    for when, account_number, _, _, _, reference_id in rng.sample(outgoing, min(flags, len(outgoing))):
+        flagged_at = when + timedelta(seconds=rng.randint(1, 120))
+        status = rng.choices(["pending", "confirmed", "approved"], [0.5, 0.2, 0.3])[0]
+        reviewed_at = None if status == "pending" else _timestamp(flagged_at + timedelta(hours=rng.uniform(1, 72)))
+        flag_rows.append((reference_id, account_number, _timestamp(flagged_at), status,
+                          None if status == "pending" else "admin", reviewed_at))
+    conn.executemany("""
+        INSERT INTO flagged_transactions (transaction_ref, account_number, flagged_at, status,
+                                          reviewed_by, reviewed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, flag_rows)
+
+    conn.commit()
+    conn.close()
+    return {
+        "path": path,
+        "accounts": accounts,
+        "transactions": len(ledger),
+        "goals": len(goal_rows),
+        "goal_contributions": len(history_rows),
+        "flags": len(flag_rows),
+        "seed": seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic bank.db")
+    parser.add_argument("--out", default="bank.db")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--goals", type=int, default=300)
+    parser.add_argument("--flags", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = generate(args.out, args.accounts, args.transactions, args.goals, args.flags, args.seed)
+    print(f"{summary} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
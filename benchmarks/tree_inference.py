@@ -0,0 +1,142 @@
+"""Fraud model scoring: sklearn vs the array-compiled forest of tree_compiler.py.
+
+Loads fraud_model.pkl, builds a validation set of model inputs (random
+amounts, transaction types including ones the model has not seen, hours
+with some missing, account ages), and checks that the compiled model's
+predict, decision_function and score_samples are bit-identical to the
+Pipeline's. Then times, for each engine:
+
+    single  one transaction per call, as is_fraudulent scores a payment
+    batch   ``--batch`` transactions per call, as the proactive scan does
+
+and reports p50/p99 latency per call and transactions per second. The
+``arrays`` column always uses the NumPy evaluator; ``compiled`` is what
+CompiledModel does, which hands batches above SKLEARN_ROWS to sklearn.
+
+    python benchmarks/tree_inference.py --rows 100000 --batch 1 100 1000 10000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import tree_compiler
+
+TYPES = ["ATM Withdrawal", "Bank Transfer", "Bill Payment", "Online Purchase", "POS Payment", "Deposit"]
+
+
+def validation_set(rows, seed):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "Transaction_Amount": np.round(rng.lognormal(6, 2, rows), 2),
+        "Transaction_Type": rng.choice(TYPES, rows),
+        "Time_of_Transaction": rng.integers(0, 24, rows).astype(float),
+        "Account_Age": rng.integers(0, 240, rows),
+    })
+    frame.loc[::97, "Time_of_Transaction"] = np.nan
+    return frame
+
+
+def check_identical(model, compiled, frame):
+    # compiled preprocessing and the NumPy evaluator, whatever the batch size
+    X = compiled.matrix({column: frame[column].tolist() for column in frame.columns})
+    report = {}
+    for method in ("predict", "decision_function", "score_samples"):
+        expected = getattr(model, method)(frame)
+        actual = getattr(compiled.forest, method)(X)
+        mismatches = int((expected != actual).sum())
+        if mismatches:
+            raise AssertionError(f"{method}: {mismatches} of {len(frame)} rows differ from sklearn")
+        report[method] = "identical"
+    report["flagged"] = int((model.predict(frame) == -1).sum())
+    return report
+
+
+def time_calls(score, inputs):
+    timings = []
+    for data in inputs:
+        started = time.perf_counter()
+        score(data)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+    }
+
+
+def run(rows, batches, calls, seed, model_path):
+    model = joblib.load(model_path)
+    started = time.perf_counter()
+    compiled = tree_compiler.compile_model(model)
+    forest = compiled.forest
+    report = {"config": {"rows": rows, "seed": seed, "trees": forest.n_trees, "nodes": forest.n_nodes,
+                         "depth": forest.depth, "preprocessing": compiled.preprocessing,
+                         "compile_ms": round((time.perf_counter() - started) * 1000, 1)}}
+    frame = validation_set(rows, seed)
+    report["validation"] = check_identical(model, compiled, frame)
+
+    report["latency"] = []
+    for batch in batches:
+        starts = [(i * batch) % max(1, rows - batch) for i in range(max(3, calls // batch))]
+        frames = [frame.iloc[s:s + batch] for s in starts]
+        columns = [{column: part[column].tolist() for column in part.columns} for part in frames]
+        sklearn_time = time_calls(model.predict, frames)
+        compiled_time = time_calls(compiled.predict, columns)
+        arrays_time = time_calls(lambda data: compiled.forest.predict(compiled.matrix(data)), columns)
+        report["latency"].append({
+            "batch": batch,
+            "sklearn": sklearn_time,
+            "compiled": compiled_time,
+            "arrays": arrays_time,
+            "sklearn_rows_per_s": round(batch / sklearn_time["p50_ms"] * 1000),
+            "compiled_rows_per_s": round(batch / compiled_time["p50_ms"] * 1000),
+            "speedup": round(sklearn_time["p50_ms"] / compiled_time["p50_ms"], 1),
+        })
+    return report
+
+
+def print_report(report):
+    config = report["config"]
+    print(f"{config['trees']} trees, {config['nodes']:,} nodes, depth {config['depth']}, "
+          f"{config['preprocessing']} preprocessing, compiled in {config['compile_ms']} ms")
+    validation = report["validation"]
+    print(f"{config['rows']:,} validation rows: predict, decision_function and score_samples identical "
+          f"({validation['flagged']:,} flagged)")
+    print(f"{'batch':>7}{'sklearn p50':>13}{'p99':>10}{'compiled p50':>14}{'p99':>10}{'arrays p50':>12}"
+          f"{'rows/s':>10}{'speedup':>9}")
+    for row in report["latency"]:
+        print(f"{row['batch']:>7}{row['sklearn']['p50_ms']:>11.3f}ms{row['sklearn']['p99_ms']:>8.3f}ms"
+              f"{row['compiled']['p50_ms']:>12.3f}ms{row['compiled']['p99_ms']:>8.3f}ms"
+              f"{row['arrays']['p50_ms']:>10.3f}ms{row['compiled_rows_per_s']:>10,}{row['speedup']:>8}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fraud model scoring, sklearn vs compiled forest")
+    parser.add_argument("--rows", type=int, default=100_000, help="validation rows")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--calls", type=int, default=200, help="calls per batch size (fewer for large batches)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model", default=os.path.join(REPO_ROOT, "fraud_model.pkl"))
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.batch, args.calls, args.seed, args.model)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
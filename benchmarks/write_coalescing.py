@@ -0,0 +1,149 @@
+"""Ledger write throughput with and without the write coalescer.
+
+Each of ``--threads`` workers performs ``--ops`` deposit-shaped writes (a
+balance update plus a transactions row) against a synthetic bank.db, in
+three modes:
+
+    direct     every worker on its own connection, one commit per write,
+               retrying on 'database is locked' like execute_with_retry
+    serial     all writes through one WriteCoalescer with batches of one
+    coalesced  WriteCoalescer with the default flush window and batch size
+
+for each ``--synchronous`` level. Reports writes/s, per-write latency and
+the mean number of writes per commit.
+
+    python benchmarks/write_coalescing.py --threads 1 4 16 64 --synchronous NORMAL FULL
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic_db
+import write_coalescer
+
+MODES = ("direct", "serial", "coalesced")
+
+
+def deposit(cur, account_number, amount, reference_id):
+    cur.execute("UPDATE accounts SET balance = balance + ? WHERE account_number=?", (amount, account_number))
+    cur.execute("""
+        INSERT INTO transactions (account_number, type, amount, description, timestamp, reference_id)
+        VALUES (?, 'Deposit', ?, 'Deposit made', '2026-01-01 12:00:00', ?)
+    """, (account_number, amount, reference_id))
+
+
+def _direct_worker(path, synchronous, worker, ops, latencies):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    cur = conn.cursor()
+    for i in range(ops):
+        started = time.perf_counter()
+        for attempt in range(write_coalescer.MAX_RETRIES):
+            try:
+                deposit(cur, f"02{worker % 1000:08d}", 1.0, f"d{worker}-{i}")
+                conn.commit()
+                break
+            except sqlite3.OperationalError as e:
+                conn.rollback()
+                if "database is locked" not in str(e) or attempt == write_coalescer.MAX_RETRIES - 1:
+                    raise
+                time.sleep(write_coalescer.RETRY_DELAY)
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def _coalesced_worker(coalescer, worker, ops, latencies):
+    for i in range(ops):
+        started = time.perf_counter()
+        coalescer.execute(deposit, f"02{worker % 1000:08d}", 1.0, f"c{worker}-{i}")
+        latencies.append(time.perf_counter() - started)
+
+
+def measure(path, mode, threads, ops, synchronous, flush_ms, max_batch):
+    latencies = []
+    coalescer = None
+    if mode == "direct":
+        targets = [(_direct_worker, (path, synchronous, w, ops, latencies)) for w in range(threads)]
+    else:
+        coalescer = write_coalescer.WriteCoalescer(path, flush_ms=flush_ms if mode == "coalesced" else 0,
+                                                   max_batch=max_batch if mode == "coalesced" else 1,
+                                                   synchronous=synchronous)
+        targets = [(_coalesced_worker, (coalescer, w, ops, latencies)) for w in range(threads)]
+
+    workers = [threading.Thread(target=fn, args=args) for fn, args in targets]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - started
+
+    if coalescer:
+        coalescer.close()
+
+    latencies.sort()
+    writes = len(latencies)
+    return {
+        "mode": mode, "threads": threads, "synchronous": synchronous, "writes": writes,
+        "writes_per_s": round(writes / seconds, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[min(writes - 1, int(writes * 0.99))] * 1000, 2),
+        "writes_per_commit": round(coalescer.operations / coalescer.batches, 1) if coalescer else 1.0,
+    }
+
+
+def run(threads_settings, ops, synchronous_levels, flush_ms, max_batch, seed):
+    workdir = tempfile.mkdtemp(prefix="wirebuddy-writes-")
+    path = os.path.join(workdir, "bank.db")
+    try:
+        synthetic_db.generate(path, accounts=1000, transactions=10_000, seed=seed)
+        rows = []
+        for synchronous in synchronous_levels:
+            for threads in threads_settings:
+                for mode in MODES:
+                    rows.append(measure(path, mode, threads, ops, synchronous, flush_ms, max_batch))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"config": {"ops_per_thread": ops, "flush_ms": flush_ms, "max_batch": max_batch, "seed": seed},
+            "results": rows}
+
+
+def print_report(report):
+    print(f"{'sync':<8}{'threads':>8}  {'mode':<10}{'writes/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'per commit':>12}")
+    for row in report["results"]:
+        print(f"{row['synchronous']:<8}{row['threads']:>8}  {row['mode']:<10}{row['writes_per_s']:>10}"
+              f"{row['p50_ms']:>9}{row['p99_ms']:>9}{row['writes_per_commit']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ledger write throughput, direct commits vs the write coalescer")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--ops", type=int, default=200, help="writes per thread")
+    parser.add_argument("--synchronous", nargs="+", default=["NORMAL", "FULL"],
+                        choices=write_coalescer.SYNCHRONOUS_LEVELS)
+    parser.add_argument("--flush-ms", type=float, default=write_coalescer.FLUSH_MS)
+    parser.add_argument("--max-batch", type=int, default=write_coalescer.MAX_BATCH)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.threads, args.ops, args.synchronous, args.flush_ms, args.max_batch, args.seed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
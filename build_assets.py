@@ -0,0 +1,159 @@
+"""Build step for the images served by the app.
+
+Resizes and re-encodes the source images in assets/ into responsive
+variants under static/, named by content hash, and writes
+static/manifest.json describing them. Streamlit serves static/ at
+/app/static/ (``enableStaticServing`` in .streamlit/config.toml); pages
+request the files with ``?v=<hash>``, which makes the static handler send a
+10-year Cache-Control, and a rebuilt image gets a new name.
+
+Every image gets WebP variants plus a JPEG (PNG with transparency)
+fallback. ``--avif`` also writes AVIF variants, but Streamlit's static
+handler serves .avif as text/plain, so the app only uses them when the
+files are served by something else.
+
+    python build_assets.py             # only images whose source changed
+    python build_assets.py --force
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import time
+
+from PIL import Image, features
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(ROOT, "assets")
+STATIC_DIR = os.path.join(ROOT, "static")  # Streamlit serves static/ next to app.py
+MANIFEST = "manifest.json"
+
+# Source image -> widths to build; never upscaled past the source width
+SOURCES = {
+    "5.jpg": (480, 960, 1600),
+    "6.jpg": (480, 960, 1600),
+    "7.png": (480, 960, 1536),
+    "8.png": (480, 960, 1536),
+    "wb.png": (150, 300),
+}
+
+QUALITY = {"webp": 80, "jpg": 82, "avif": 60}
+HASH_LENGTH = 10
+BUILT_NAME = re.compile(r".+-\d+w\.[0-9a-f]{%d}\.(webp|jpg|png|avif)$" % HASH_LENGTH)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=QUALITY["webp"], method=6)
+    elif fmt == "avif":
+        image.save(buffer, "AVIF", quality=QUALITY["avif"])
+    elif fmt == "png":
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.convert("RGB").save(buffer, "JPEG", quality=QUALITY["jpg"], optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def build_image(name, widths, formats, out_dir=STATIC_DIR, src_dir=ASSETS_DIR):
+    """Write the variants of one source image and return its manifest entry"""
+    path = os.path.join(src_dir, name)
+    stem = os.path.splitext(name)[0]
+    with Image.open(path) as source:
+        source.load()
+    has_alpha = source.mode in ("RGBA", "LA") or (source.mode == "P" and "transparency" in source.info)
+    source = source.convert("RGBA" if has_alpha else "RGB")
+    fallback = "png" if has_alpha else "jpg"
+
+    variants = []
+    for width in sorted({min(w, source.width) for w in widths}):
+        height = round(source.height * width / source.width)
+        resized = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+        for fmt in list(formats) + [fallback]:
+            data = _encode(resized, fmt)
+            digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+            filename = f"{stem}-{width}w.{digest}.{fmt}"
+            with open(os.path.join(out_dir, filename), "wb") as f:
+                f.write(data)
+            variants.append({"format": fmt, "width": width, "height": height,
+                             "file": filename, "hash": digest, "bytes": len(data)})
+    return {
+        "source_sha256": _sha256(path),
+        "source_bytes": os.path.getsize(path),
+        "width": source.width,
+        "height": source.height,
+        "fallback": fallback,
+        "variants": variants,
+    }
+
+
+def build(force=False, avif=False, out_dir=STATIC_DIR, src_dir=ASSETS_DIR):
+    """Rebuild changed images, drop files no longer in the manifest and return the manifest"""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {"images": {}}
+
+    formats = ["webp"]
+    if avif:
+        if features.check("avif"):
+            formats.append("avif")
+        else:
+            print("This Pillow build cannot write AVIF; building WebP only")
+
+    images, rebuilt = {}, False
+    for name, widths in SOURCES.items():
+        previous = manifest["images"].get(name)
+        previous_formats = {v["format"] for v in previous["variants"]} if previous else set()
+        unchanged = (previous and previous["source_sha256"] == _sha256(os.path.join(src_dir, name))
+                     and set(formats) <= previous_formats
+                     and all(os.path.exists(os.path.join(out_dir, v["file"])) for v in previous["variants"]))
+        if unchanged and not force:
+            images[name] = previous
+            continue
+        started = time.perf_counter()
+        images[name] = build_image(name, widths, formats, out_dir, src_dir)
+        rebuilt = True
+        print(f"{name}: {len(images[name]['variants'])} variants in {time.perf_counter() - started:.1f}s")
+
+    keep = {v["file"] for entry in images.values() for v in entry["variants"]}
+    for filename in os.listdir(out_dir):
+        if BUILT_NAME.match(filename) and filename not in keep:
+            os.remove(os.path.join(out_dir, filename))
+
+    generated_at = time.strftime('%Y-%m-%d %H:%M:%S') if rebuilt else manifest.get("generated_at")
+    manifest = {"generated_at": generated_at, "images": images}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build optimized image variants into static/")
+    parser.add_argument("--force", action="store_true", help="rebuild every image")
+    parser.add_argument("--avif", action="store_true", help="also write AVIF variants")
+    args = parser.parse_args()
+
+    manifest = build(force=args.force, avif=args.avif)
+    source_bytes = sum(entry["source_bytes"] for entry in manifest["images"].values())
+    built_bytes = sum(v["bytes"] for entry in manifest["images"].values() for v in entry["variants"])
+    print(f"{len(manifest['images'])} images: {source_bytes / 1024:.0f} KiB of sources, "
+          f"{built_bytes / 1024:.0f} KiB of variants in {os.path.relpath(STATIC_DIR)}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""Cold tier for old transactions: month-partitioned Parquet next to bank.db.
+
+A tiering job moves transactions older than ``WIREBUDDY_ARCHIVE_AFTER_DAYS``
+out of bank.db into zstd-compressed Parquet files under
+``WIREBUDDY_ARCHIVE_DIR``, one directory per month
+(``transactions/month=YYYY-MM/part-*.parquet``, rows sorted by account and
+time). A month's file is written first, without locking the database; then
+one short write transaction checks the rows are unchanged, registers the
+file in ``archive_files``, adds the account/month totals to
+``transaction_archive_summary`` and deletes the rows, so a failed run
+leaves both tiers as they were. Transactions with a fraud flag stay in
+bank.db for the review queue and analytics.
+
+Readers find an account's archived months in the summary table (pruned by
+date before any file is opened) and only read files listed in
+``archive_files``. The files are plain Parquet, so archived history can be
+queried offline, e.g. in DuckDB:
+
+    SELECT * FROM read_parquet('archive/transactions/*/*.parquet', hive_partitioning = true)
+
+or with ``python cold_archive.py history ACCOUNT``.
+
+    WIREBUDDY_ARCHIVE_DIR         where the Parquet files go (default archive)
+    WIREBUDDY_ARCHIVE_AFTER_DAYS  age at which transactions are archived (default 365)
+    WIREBUDDY_ARCHIVE_INTERVAL    seconds between archive runs (default 86400, 0 disables)
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+DB_PATH = "bank.db"
+ARCHIVE_DIR = os.environ.get("WIREBUDDY_ARCHIVE_DIR", "archive")
+ARCHIVE_AFTER_DAYS = int(os.environ.get("WIREBUDDY_ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_INTERVAL = float(os.environ.get("WIREBUDDY_ARCHIVE_INTERVAL", "86400"))
+ROW_GROUP_SIZE = 16384
+LOCK_TIMEOUT = 30  # seconds the archive job waits for the write lock
+
+# Withdrawals, transfers out and savings contributions reduce the balance.
+# The ledger does not store their sign consistently, so derive it from the type.
+DEBIT_TYPES = ("Withdrawal", "Transfer Out", "Savings Contribution")
+SIGNED_AMOUNT_SQL = f"""
+    CASE WHEN type IN ({', '.join(f"'{t}'" for t in DEBIT_TYPES)})
+         THEN -ABS(amount) ELSE ABS(amount) END
+"""
+
+COLUMNS = ["id", "account_number", "type", "amount", "description", "timestamp", "reference_id", "category"]
+# Rows handed to readers, in the column order of Account.get_history_page
+ROW_COLUMNS = ["id", "type", "amount", "description", "timestamp", "reference_id"]
+
+# Transactions eligible for archiving: inside one month, older than the
+# cutoff, and not referenced by a fraud flag
+ELIGIBLE_SQL = """
+    t.timestamp >= ? AND t.timestamp < ?
+    AND t.reference_id NOT IN (SELECT transaction_ref FROM flagged_transactions)
+"""
+
+
+def signed_amount(txn_type, amount):
+    return -abs(amount) if txn_type in DEBIT_TYPES else abs(amount)
+
+
+def ensure_schema(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS transaction_archive_summary (
+            account_number TEXT NOT NULL,
+            month TEXT NOT NULL,
+            transactions INTEGER NOT NULL,
+            credits REAL NOT NULL,
+            debits REAL NOT NULL,
+            net_amount REAL NOT NULL,
+            first_timestamp TEXT NOT NULL,
+            last_timestamp TEXT NOT NULL,
+            PRIMARY KEY (account_number, month)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archive_files (
+            path TEXT PRIMARY KEY,
+            month TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            archived_at TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+
+
+def _month_bounds(month):
+    """('YYYY-MM-01 00:00:00', first instant of the next month) for 'YYYY-MM'"""
+    year, month_number = int(month[:4]), int(month[5:7])
+    following = f"{year + 1:04d}-01" if month_number == 12 else f"{year:04d}-{month_number + 1:02d}"
+    return f"{month}-01 00:00:00", f"{following}-01 00:00:00"
+
+
+@lru_cache(maxsize=128)
+def _read_account_rows(paths, account_number):
+    """An account's rows from the given files, oldest first (files never change once registered)"""
+    rows = []
+    for path in paths:
+        table = pq.read_table(path, columns=ROW_COLUMNS, filters=[("account_number", "=", account_number)])
+        rows.extend(zip(*(table.column(name).to_pylist() for name in ROW_COLUMNS)))
+    rows.sort(key=lambda row: (row[4], row[0]))
+    return tuple(rows)
+
+
+def _matches(row, filters):
+    """Apply Account.get_history_page's filters to a cold row"""
+    _, txn_type, amount, _, timestamp, _ = row
+    if filters.get("types") and txn_type not in filters["types"]:
+        return False
+    if filters.get("start_date") and timestamp < f"{filters['start_date']} 00:00:00":
+        return False
+    if filters.get("end_date") and timestamp > f"{filters['end_date']} 23:59:59":
+        return False
+    if filters.get("min_amount") is not None and abs(amount) < filters["min_amount"]:
+        return False
+    if filters.get("max_amount") is not None and abs(amount) > filters["max_amount"]:
+        return False
+    return True
+
+
+class ColdArchive:
+    def __init__(self, db_path=DB_PATH, archive_dir=ARCHIVE_DIR, after_days=ARCHIVE_AFTER_DAYS,
+                 interval=ARCHIVE_INTERVAL):
+        self.db_path = db_path
+        self.archive_dir = archive_dir
+        self.after_days = after_days
+        self.interval = interval
+        self.lock = threading.Lock()   # one archive run at a time
+        self.last_run_at = None
+        self.last_error = None
+        self._thread = None
+
+    # ---------- Tiering job ----------
+    def archive_old(self, after_days=None):
+        """Move transactions older than after_days into Parquet; returns rows archived per month"""
+        if pq is None:
+            raise RuntimeError("pyarrow is needed to archive transactions")
+        after_days = self.after_days if after_days is None else after_days
+        cutoff = (datetime.now() - timedelta(days=after_days)).strftime('%Y-%m-%d %H:%M:%S')
+        archived = {}
+        with self.lock:
+            conn = sqlite3.connect(self.db_path, timeout=LOCK_TIMEOUT, isolation_level=None)
+            try:
+                ensure_schema(conn)
+                self._remove_orphans(conn)
+                months = [row[0] for row in conn.execute(
+                    "SELECT DISTINCT substr(timestamp, 1, 7) FROM transactions WHERE timestamp < ? ORDER BY 1",
+                    (cutoff,))]
+                for month in months:
+                    count = self._archive_month(conn, month, cutoff)
+                    if count:
+                        archived[month] = count
+            finally:
+                conn.close()
+            _read_account_rows.cache_clear()
+            self.last_run_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        total = sum(archived.values())
+        print(f"Archived {total} transactions older than {cutoff} from {len(archived)} months")
+        return archived
+
+    def _archive_month(self, conn, month, cutoff):
+        start, end = _month_bounds(month)
+        end = min(end, cutoff)
+
+        # Read and encode the month outside the write lock, so ledger writes
+        # do not wait on Parquet compression
+        rows = self._eligible_rows(conn, start, end)
+        if not rows:
+            return 0
+        relative = os.path.join("transactions", f"month={month}",
+                                f"part-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{min(r[0] for r in rows)}.parquet")
+        path = os.path.join(self.archive_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.table({name: list(values) for name, values in zip(COLUMNS, zip(*rows))}, schema=pa.schema([
+            ("id", pa.int64()), ("account_number", pa.string()), ("type", pa.string()),
+            ("amount", pa.float64()), ("description", pa.string()), ("timestamp", pa.string()),
+            ("reference_id", pa.string()), ("category", pa.string()),
+        ]))
+        try:
+            pq.write_table(table, f"{path}.tmp", compression="zstd", row_group_size=ROW_GROUP_SIZE)
+
+            # Under the write lock: the rows must be the ones in the file, or
+            # something was flagged or recategorized meanwhile and the month
+            # waits for the next run
+            conn.execute("BEGIN IMMEDIATE")
+            if self._eligible_rows(conn, start, end) != rows:
+                conn.execute("ROLLBACK")
+                os.remove(f"{path}.tmp")
+                print(f"Transactions of {month} changed while archiving; left for the next run")
+                return 0
+            os.replace(f"{path}.tmp", path)
+            conn.execute("INSERT INTO archive_files (path, month, rows, archived_at) VALUES (?, ?, ?, ?)",
+                         (relative, month, len(rows), datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            conn.execute(f"""
+                INSERT INTO transaction_archive_summary
+                    (account_number, month, transactions, credits, debits, net_amount,
+                     first_timestamp, last_timestamp)
+                SELECT t.account_number, ?, COUNT(*),
+                       SUM(MAX({SIGNED_AMOUNT_SQL}, 0)), -SUM(MIN({SIGNED_AMOUNT_SQL}, 0)),
+                       SUM({SIGNED_AMOUNT_SQL}), MIN(t.timestamp), MAX(t.timestamp)
+                FROM transactions t
+                WHERE {ELIGIBLE_SQL}
+                GROUP BY t.account_number
+                ON CONFLICT (account_number, month) DO UPDATE SET
+                    transactions = transactions + excluded.transactions,
+                    credits = credits + excluded.credits,
+                    debits = debits + excluded.debits,
+                    net_amount = net_amount + excluded.net_amount,
+                    first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+                    last_timestamp = MAX(last_timestamp, excluded.last_timestamp)
+            """, (month, start, end))
+            eligible_ids = f"SELECT t.id FROM transactions t WHERE {ELIGIBLE_SQL}"
+            conn.execute(f"DELETE FROM transaction_categories WHERE transaction_id IN ({eligible_ids})", (start, end))
+            conn.execute(f"DELETE FROM transactions WHERE id IN ({eligible_ids})", (start, end))
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for leftover in (path, f"{path}.tmp"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            raise
+        return len(rows)
+
+    def _eligible_rows(self, conn, start, end):
+        return conn.execute(f"""
+            SELECT t.id, t.account_number, t.type, t.amount, t.description, t.timestamp,
+                   t.reference_id, c.category
+            FROM transactions t
+            LEFT JOIN transaction_categories c ON c.transaction_id = t.id
+            WHERE {ELIGIBLE_SQL}
+            ORDER BY t.account_number, t.timestamp, t.id
+        """, (start, end)).fetchall()
+
+    def _remove_orphans(self, conn):
+        """Delete Parquet files a failed run wrote but never registered"""
+        root = os.path.join(self.archive_dir, "transactions")
+        if not os.path.isdir(root):
+            return
+        registered = {row[0] for row in conn.execute("SELECT path FROM archive_files")}
+        for directory in os.listdir(root):
+            for filename in os.listdir(os.path.join(root, directory)):
+                relative = os.path.join("transactions", directory, filename)
+                if relative not in registered:
+                    print(f"Removing unregistered archive file {relative}")
+                    os.remove(os.path.join(self.archive_dir, relative))
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.archive_old()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Archive run failed: {e}")
+
+    def start(self):
+        """Start the scheduled archive runs, unless disabled or already running"""
+        if self.interval <= 0 or pq is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="cold-archive", daemon=True)
+        self._thread.start()
+
+    # ---------- Readers ----------
+    def summaries(self, cur, account_number, start=None, end=None, since=None):
+        """(month, transactions, net_amount, first_timestamp, last_timestamp) of the
+        account's archived months overlapping [start, end], newest first.
+
+        ``since`` further skips months with nothing at or after that timestamp.
+        """
+        query = """
+            SELECT month, transactions, net_amount, first_timestamp, last_timestamp
+            FROM transaction_archive_summary
+            WHERE account_number=?
+        """
+        params = [account_number]
+        if start or since:
+            query += " AND last_timestamp >= ?"
+            params.append(max(start or "", since or ""))
+        if end:
+            query += " AND first_timestamp <= ?"
+            params.append(end)
+        query += " ORDER BY month DESC"
+        try:
+            cur.execute(query, params)
+        except sqlite3.OperationalError as e:
+            if "no such table" in str(e):
+                return []   # nothing has been archived in this database
+            raise
+        return cur.fetchall()
+
+    def _month_paths(self, cur, month):
+        cur.execute("SELECT path FROM archive_files WHERE month=? ORDER BY path", (month,))
+        paths = tuple(os.path.join(self.archive_dir, row[0]) for row in cur.fetchall())
+        if paths and pq is None:
+            raise RuntimeError("pyarrow is needed to read archived transactions")
+        return paths
+
+    def month_rows(self, cur, account_number, month):
+        """The account's archived rows of one month, oldest first, as ROW_COLUMNS tuples"""
+        paths = self._month_paths(cur, month)
+        return _read_account_rows(paths, account_number) if paths else ()
+
+    def find(self, cur, account_number, reference_id):
+        """(ROW_COLUMNS row, category) of the account's archived transaction with this reference, or None"""
+        for month, *_ in self.summaries(cur, account_number):
+            for path in self._month_paths(cur, month):
+                table = pq.read_table(path, columns=ROW_COLUMNS + ["category"], filters=[
+                    ("account_number", "=", account_number), ("reference_id", "=", reference_id)])
+                if table.num_rows:
+                    found = table.slice(0, 1).to_pylist()[0]
+                    return tuple(found[name] for name in ROW_COLUMNS), found["category"]
+        return None
+
+    def history(self, cur, account_number, after=None, limit=None, filters=None, since=None):
+        """Archived rows newest first, with the paging and filters of Account.get_history_page"""
+        filters = filters or {}
+        start = f"{filters['start_date']} 00:00:00" if filters.get("start_date") else None
+        end = f"{filters['end_date']} 23:59:59" if filters.get("end_date") else None
+        if after and (end is None or after[0] < end):
+            end = after[0]
+        rows = []
+        for month, *_ in self.summaries(cur, account_number, start, end, since):
+            for row in reversed(self.month_rows(cur, account_number, month)):
+                if after and (row[4], row[0]) >= tuple(after):
+                    continue
+                if not _matches(row, filters):
+                    continue
+                rows.append(row)
+                if limit and len(rows) >= limit:
+                    return rows
+        return rows
+
+    def period_rows(self, cur, account_number, start=None, end=None):
+        """Archived rows between the start and end timestamps (inclusive), oldest first"""
+        rows = []
+        for month, *_ in reversed(self.summaries(cur, account_number, start, end)):
+            rows.extend(row for row in self.month_rows(cur, account_number, month)
+                        if (start is None or row[4] >= start) and (end is None or row[4] <= end))
+        return rows
+
+    def period_totals(self, cur, account_number, start, end):
+        """(signed total since start, signed total within [start, end], count within) of archived rows.
+
+        Months wholly inside or after the period come from the summary table;
+        only the months the period starts or ends in are read from Parquet.
+        """
+        since_start = in_period = 0.0
+        count = 0
+        for month, transactions, net_amount, first, last in self.summaries(cur, account_number, start):
+            if first > end:
+                since_start += net_amount
+            elif first >= start and last <= end:
+                since_start += net_amount
+                in_period += net_amount
+                count += transactions
+            else:
+                for _, txn_type, amount, _, timestamp, _ in self.month_rows(cur, account_number, month):
+                    if timestamp < start:
+                        continue
+                    since_start += signed_amount(txn_type, amount)
+                    if timestamp <= end:
+                        in_period += signed_amount(txn_type, amount)
+                        count += 1
+        return since_start, in_period, count
+
+
+archive = ColdArchive()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old transactions to Parquet, or read them back")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("archive", help="move old transactions into the archive")
+    run.add_argument("--after-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    history = commands.add_parser("history", help="print an account's archived transactions as CSV")
+    history.add_argument("account_number")
+    history.add_argument("--start", help="YYYY-MM-DD")
+    history.add_argument("--end", help="YYYY-MM-DD")
+    args = parser.parse_args()
+
+    cold = ColdArchive(args.db, args.archive_dir)
+    if args.command == "archive":
+        for month, count in cold.archive_old(args.after_days).items():
+            print(f"{month}: {count}")
+        return
+
+    conn = sqlite3.connect(f"file:{os.path.abspath(args.db)}?mode=ro", uri=True)
+    try:
+        start = f"{args.start} 00:00:00" if args.start else None
+        end = f"{args.end} 23:59:59" if args.end else None
+        writer = csv.writer(sys.stdout)
+        writer.writerow(ROW_COLUMNS)
+        writer.writerows(cold.period_rows(conn.cursor(), args.account_number, start, end))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Online backups and restores of bank.db.
+
+Backups use the SQLite online backup API, ``PAGES_PER_STEP`` pages at a
+time with a short sleep between steps, so the app keeps reading and writing
+while a copy is made; a copy that keeps being restarted by writes is
+finished in one step. Each backup is written to a temporary file and
+renamed into ``WIREBUDDY_BACKUP_DIR`` once complete.
+
+A restore reads from a staging file (an upload, or an earlier backup),
+runs an integrity check on it, backs up the live database, then drains the
+app (``manager.restoring`` is set, which makes new reruns wait) and copies
+the staging file into bank.db in a single backup step. That step is one
+write transaction, so other connections see either the old database or the
+restored one, and their open handles stay valid (renaming a file over
+bank.db would leave them on the old file).
+
+A scheduler thread backs up every ``WIREBUDDY_BACKUP_INTERVAL`` seconds,
+skipping runs where bank.db has not changed since the last backup, and
+keeps the newest ``WIREBUDDY_BACKUP_KEEP`` backups.
+
+    WIREBUDDY_BACKUP_DIR        where backups go (default backups)
+    WIREBUDDY_BACKUP_INTERVAL   seconds between scheduled backups (default 3600, 0 disables)
+    WIREBUDDY_BACKUP_KEEP       backups kept (default 24)
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+DB_PATH = "bank.db"
+BACKUP_DIR = os.environ.get("WIREBUDDY_BACKUP_DIR", "backups")
+BACKUP_INTERVAL = float(os.environ.get("WIREBUDDY_BACKUP_INTERVAL", "3600"))
+BACKUP_KEEP = int(os.environ.get("WIREBUDDY_BACKUP_KEEP", "24"))
+PAGES_PER_STEP = 256
+STEP_SLEEP = 0.005       # seconds between backup steps
+MAX_RESTARTS = 5         # copies restarted by concurrent writes before copying in one step
+LOCK_TIMEOUT = 60        # seconds a restore waits for in-flight transactions
+BACKUP_NAME = re.compile(r"^bank-(\d{8}-\d{6})-(\w+)\.db$")
+
+
+class BackupError(Exception):
+    pass
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def copy_database(source, dest, pages=PAGES_PER_STEP, sleep=STEP_SLEEP, progress=None):
+    """Copy the source connection's database into dest with the backup API.
+
+    ``progress(copied, total)`` is called after every step.
+    """
+    state = {"restarts": 0, "remaining": None}
+
+    def on_step(status, remaining, total):
+        # remaining goes back up when another connection wrote to the source
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > MAX_RESTARTS:
+                raise _TooManyRestarts()
+        state["remaining"] = remaining
+        if progress:
+            progress(total - remaining, total)
+
+    try:
+        source.backup(dest, pages=pages, progress=on_step, sleep=sleep)
+    except _TooManyRestarts:
+        print("Backup kept restarting under writes; copying in one step")
+        source.backup(dest, pages=-1, progress=on_step, sleep=sleep)
+
+
+def file_change_counter(path):
+    """The change counter in the database header, bumped by every committed write"""
+    with open(path, "rb") as f:
+        header = f.read(28)
+    return int.from_bytes(header[24:28], "big") if len(header) == 28 else None
+
+
+def table_names(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def validate(path, required_tables=()):
+    """Raise BackupError unless path is an intact SQLite database with the required tables"""
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+            tables = table_names(conn)
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f"Not a usable SQLite database: {e}")
+    if result != "ok":
+        raise BackupError(f"Integrity check failed: {result}")
+    missing = sorted(set(required_tables) - tables)
+    if missing:
+        raise BackupError(f"Missing tables: {', '.join(missing)}")
+
+
+def backup_file(dest_path, source_path=DB_PATH, pages=PAGES_PER_STEP, sleep=STEP_SLEEP, progress=None):
+    """Back source_path up to dest_path; returns the seconds it took"""
+    started = time.perf_counter()
+    tmp_path = f"{dest_path}.tmp"
+    source = sqlite3.connect(f"file:{os.path.abspath(source_path)}?mode=ro", uri=True, timeout=30)
+    dest = sqlite3.connect(tmp_path)
+    try:
+        copy_database(source, dest, pages, sleep, progress)
+    finally:
+        dest.close()
+        source.close()
+    os.replace(tmp_path, dest_path)
+    return time.perf_counter() - started
+
+
+class BackupManager:
+    def __init__(self, db_path=DB_PATH, backup_dir=BACKUP_DIR, interval=BACKUP_INTERVAL, keep=BACKUP_KEEP):
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval = interval
+        self.keep = keep
+        self.lock = threading.Lock()         # one backup or restore at a time
+        self.restoring = threading.Event()   # set while bank.db is being replaced
+        self.last_backup_at = None
+        self.last_error = None
+        self._last_counter = None
+        self._thread = None
+
+    def backups(self):
+        """Backups on disk, newest first"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        found = []
+        for filename in os.listdir(self.backup_dir):
+            match = BACKUP_NAME.match(filename)
+            if not match:
+                continue
+            path = os.path.join(self.backup_dir, filename)
+            found.append({
+                "name": filename,
+                "path": path,
+                "bytes": os.path.getsize(path),
+                "created_at": datetime.strptime(match.group(1), "%Y%m%d-%H%M%S").strftime('%Y-%m-%d %H:%M:%S'),
+                "reason": match.group(2),
+            })
+        return sorted(found, key=lambda b: b["name"], reverse=True)
+
+    def _backup(self, reason, progress=None):
+        os.makedirs(self.backup_dir, exist_ok=True)
+        counter = file_change_counter(self.db_path)
+        name = f"bank-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{reason}.db"
+        path = os.path.join(self.backup_dir, name)
+        seconds = backup_file(path, self.db_path, progress=progress)
+        self._last_counter = counter
+        self.last_backup_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"Backed up {self.db_path} to {path} in {seconds:.1f}s")
+        return {"name": name, "path": path, "bytes": os.path.getsize(path), "seconds": seconds}
+
+    def backup_now(self, reason="manual", progress=None):
+        """Back up bank.db into the backup directory and return the new backup's info"""
+        with self.lock:
+            backup = self._backup(reason, progress)
+            self.prune()
+            return backup
+
+    def prune(self):
+        """Delete all but the newest ``keep`` backups"""
+        for old in self.backups()[self.keep:]:
+            try:
+                os.remove(old["path"])
+            except OSError as e:
+                print(f"Could not delete old backup {old['path']}: {e}")
+
+    def restore(self, staging_path, progress=None):
+        """Replace the contents of bank.db with the database at staging_path.
+
+        The live database is backed up first; returns that backup's info.
+        """
+        live = sqlite3.connect(f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True)
+        try:
+            required = table_names(live)
+        finally:
+            live.close()
+        validate(staging_path, {"accounts", "transactions"} & required)
+
+        with self.lock:
+            safety = self._backup("prerestore")
+            self.restoring.set()
+            try:
+                source = sqlite3.connect(f"file:{os.path.abspath(staging_path)}?mode=ro", uri=True)
+                live = sqlite3.connect(self.db_path, timeout=LOCK_TIMEOUT)
+                try:
+                    # One step, so readers never see a half-restored database
+                    copy_database(source, live, pages=-1, progress=progress)
+                finally:
+                    live.close()
+                    source.close()
+            finally:
+                self.restoring.clear()
+            self._last_counter = None
+            self.prune()
+        print(f"Restored {self.db_path} from {staging_path}")
+        return safety
+
+    def wait_until_restored(self, timeout=LOCK_TIMEOUT):
+        """Block while a restore is running; returns False if it is still running after timeout"""
+        deadline = time.monotonic() + timeout
+        while self.restoring.is_set():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.1)
+        return True
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                if file_change_counter(self.db_path) == self._last_counter:
+                    continue
+                self.backup_now("scheduled")
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Scheduled backup failed: {e}")
+
+    def start(self):
+        """Start the scheduled backups, unless disabled or already running"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+        self._thread.start()
+
+
+manager = BackupManager()
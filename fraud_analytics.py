@@ -0,0 +1,214 @@
+"""Fraud analytics for the admin panel, computed on the reporting snapshot.
+
+With DuckDB installed, the snapshot (see reporting_snapshot.py) is attached
+read-only through DuckDB's sqlite extension and the aggregations run as
+columnar SQL; results come back as Arrow tables, which ``st.dataframe`` and
+the charts take as they are. Without DuckDB, or when its sqlite extension
+cannot be loaded, the same tables are built with pandas from the flagged
+rows.
+
+The snapshot only changes when it is refreshed, so results are kept per
+snapshot generation: reruns between refreshes do no database work at all.
+
+    WIREBUDDY_ANALYTICS_ENGINE  duckdb (default when installed) or pandas
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+ENGINE = os.environ.get("WIREBUDDY_ANALYTICS_ENGINE", "duckdb" if duckdb else "pandas")
+
+FLAGGED_SQL = """
+    SELECT f.id, f.transaction_ref, a.name, a.account_number,
+           t.amount, t.type, t.timestamp, t.description,
+           f.status, f.flagged_at, f.reviewed_by, f.reviewed_at
+    FROM flagged_transactions f
+    JOIN transactions t ON f.transaction_ref = t.reference_id
+    JOIN accounts a ON t.account_number = a.account_number
+    ORDER BY f.flagged_at DESC
+"""
+FLAGGED_COLUMNS = ["id", "reference", "name", "account", "amount",
+                   "type", "timestamp", "description", "status",
+                   "flagged_at", "reviewed_by", "reviewed_at"]
+
+ACCOUNT_AGE_SQL = """
+    SELECT a.account_number,
+           julianday('now', 'localtime') - julianday(a.created_at) as age_days,
+           COUNT(f.id) as fraud_count
+    FROM accounts a
+    LEFT JOIN flagged_transactions f ON f.account_number = a.account_number
+    GROUP BY a.account_number
+"""
+
+# DuckDB versions of the admin panel's fraud aggregations. The join is read out
+# of the attached snapshot once, into a columnar table the aggregations share.
+DUCKDB_FLAGGED = """
+    CREATE TABLE flagged AS
+    SELECT f.status, t.amount, t.type, CAST(t.timestamp AS TIMESTAMP) AS ts,
+           a.account_number AS account, a.name
+    FROM bank.flagged_transactions f
+    JOIN bank.transactions t ON f.transaction_ref = t.reference_id
+    JOIN bank.accounts a ON t.account_number = a.account_number
+"""
+DUCKDB_QUERIES = {
+    "daily": """
+        SELECT CAST(ts AS DATE) AS date, COUNT(*) AS count
+        FROM flagged GROUP BY 1 ORDER BY 1
+    """,
+    "hourly": """
+        SELECT hour(ts) AS hour, COUNT(*) AS count
+        FROM flagged GROUP BY 1 ORDER BY 1
+    """,
+    "by_type": """
+        SELECT type AS "Type", COUNT(amount) AS "Count", AVG(amount) AS "Avg Amount",
+               SUM(amount) AS "Total Amount",
+               AVG(CASE WHEN status = 'confirmed' THEN 1.0 ELSE 0.0 END) AS "Confirmation Rate"
+        FROM flagged GROUP BY type ORDER BY "Count" DESC
+    """,
+    "amount_by_type": """
+        SELECT type, SUM(amount) AS amount
+        FROM flagged GROUP BY type ORDER BY type
+    """,
+    "by_account": """
+        SELECT account AS "Account", name AS "Name", COUNT(amount) AS "Count",
+               SUM(amount) AS "Total Amount",
+               AVG(CASE WHEN status = 'confirmed' THEN 1.0 ELSE 0.0 END) AS "Confirmation Rate"
+        FROM flagged GROUP BY account, name ORDER BY "Count" DESC
+    """,
+}
+DUCKDB_SUMMARY = """
+    SELECT COUNT(*),
+           COUNT(*) FILTER (WHERE status = 'pending'),
+           COUNT(*) FILTER (WHERE status = 'confirmed'),
+           COUNT(*) FILTER (WHERE status = 'approved')
+    FROM flagged
+"""
+DUCKDB_ACCOUNT_AGE = """
+    SELECT a.account_number AS account,
+           epoch(CAST(? AS TIMESTAMP) - CAST(a.created_at AS TIMESTAMP)) / 86400.0 AS age_days,
+           COUNT(f.id) AS fraud_count
+    FROM bank.accounts a
+    LEFT JOIN bank.flagged_transactions f ON f.account_number = a.account_number
+    GROUP BY a.account_number, a.created_at
+    ORDER BY a.account_number
+"""
+
+
+def _confirmation_rate(status):
+    return (status == 'confirmed').mean()
+
+
+def compute_pandas(path):
+    """The analytics tables built with pandas from the flagged rows of the database at path"""
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        all_flagged = conn.execute(FLAGGED_SQL).fetchall()
+        age_data = conn.execute(ACCOUNT_AGE_SQL).fetchall()
+    finally:
+        conn.close()
+
+    fraud_df = pd.DataFrame(all_flagged, columns=FLAGGED_COLUMNS)
+    results = {
+        "summary": {
+            "total": len(fraud_df),
+            "pending": int((fraud_df['status'] == 'pending').sum()),
+            "confirmed": int((fraud_df['status'] == 'confirmed').sum()),
+            "approved": int((fraud_df['status'] == 'approved').sum()),
+        },
+        "account_age": pd.DataFrame(age_data, columns=['account', 'age_days', 'fraud_count']),
+    }
+    timestamps = pd.to_datetime(fraud_df['timestamp'])
+    fraud_df['date'] = timestamps.dt.date
+    fraud_df['hour'] = timestamps.dt.hour
+    results["daily"] = fraud_df.groupby('date').size().reset_index(name='count')
+    results["hourly"] = fraud_df.groupby('hour').size().reset_index(name='count')
+
+    type_fraud = fraud_df.groupby('type').agg({
+        'amount': ['count', 'mean', 'sum'],
+        'status': _confirmation_rate
+    }).reset_index()
+    type_fraud.columns = ['Type', 'Count', 'Avg Amount', 'Total Amount', 'Confirmation Rate']
+    results["by_type"] = type_fraud.sort_values('Count', ascending=False)
+    results["amount_by_type"] = fraud_df.groupby('type', as_index=False)['amount'].sum()
+
+    account_fraud = fraud_df.groupby(['account', 'name']).agg({
+        'amount': ['count', 'sum'],
+        'status': _confirmation_rate
+    }).reset_index()
+    account_fraud.columns = ['Account', 'Name', 'Count', 'Total Amount', 'Confirmation Rate']
+    results["by_account"] = account_fraud.sort_values('Count', ascending=False)
+    return results
+
+
+def _arrow(result):
+    """A DuckDB result as an Arrow table; newer DuckDB returns a batch reader from arrow()"""
+    table = result.arrow()
+    return table.read_all() if hasattr(table, "read_all") else table
+
+
+def compute_duckdb(path):
+    """The analytics tables as Arrow tables, aggregated by DuckDB over the database at path"""
+    con = duckdb.connect()
+    try:
+        try:
+            con.execute("LOAD sqlite")
+        except duckdb.Error:
+            # only the first use needs the download
+            con.execute("INSTALL sqlite")
+            con.execute("LOAD sqlite")
+        con.execute(f"ATTACH '{os.path.abspath(path).replace(chr(39), chr(39) * 2)}' AS bank (TYPE sqlite, READ_ONLY)")
+        con.execute(DUCKDB_FLAGGED)
+        total, pending, confirmed, approved = con.execute(DUCKDB_SUMMARY).fetchone()
+        results = {"summary": {"total": total, "pending": pending, "confirmed": confirmed, "approved": approved}}
+        for name, sql in DUCKDB_QUERIES.items():
+            results[name] = _arrow(con.execute(sql))
+        # accounts.created_at is local time (datetime.now() in backend)
+        results["account_age"] = _arrow(con.execute(DUCKDB_ACCOUNT_AGE, [datetime.now()]))
+        return results
+    finally:
+        con.close()
+
+
+class FraudAnalytics:
+    def __init__(self, engine=ENGINE):
+        self.engine = engine if engine == "pandas" or duckdb else "pandas"
+        self.lock = threading.Lock()
+        self._cached = (None, None)   # (snapshot generation, results)
+        self.last_seconds = None
+        self.last_engine = None       # what computed the cached results
+
+    def results(self, snapshot):
+        """The analytics of the snapshot's current generation, computed on first use"""
+        with self.lock:
+            generation, results = self._cached
+            if generation == snapshot.generation and results is not None:
+                return results
+            generation = snapshot.generation
+            started = time.perf_counter()
+            engine = self.engine
+            if engine == "duckdb":
+                try:
+                    results = compute_duckdb(snapshot.path)
+                except Exception as e:
+                    # pandas for this snapshot only; the next one tries DuckDB again
+                    print(f"DuckDB analytics unavailable, using pandas: {e}")
+                    engine = "pandas"
+            if engine == "pandas":
+                results = compute_pandas(snapshot.path)
+            self.last_engine = engine
+            self.last_seconds = time.perf_counter() - started
+            self._cached = (generation, results)
+            return results
+
+
+analytics = FraudAnalytics()
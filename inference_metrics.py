@@ -0,0 +1,221 @@
+"""Per-stage latency metrics for the ML models in backend.
+
+Wrap a model call in ``timed(model)`` and its stages in ``stage(name)``:
+
+    with inference_metrics.timed("fraud"):
+        with inference_metrics.stage("extract_features"):
+            ...
+
+Only a sampled fraction of calls (``sample_rate``) is timed; the rest pay
+for one random() call and a thread-local lookup per stage. Timings land in
+rolling histograms with fixed millisecond buckets, one per model and stage,
+covering the last ``WINDOW_SECONDS``.
+"""
+import bisect
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+import metrics_exporter
+
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+BUCKETS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf")]
+WINDOW_SECONDS = 600
+SLOT_SECONDS = 30
+DEFAULT_SAMPLE_RATE = float(os.environ.get("WIREBUDDY_INFERENCE_SAMPLE_RATE", "0.1"))
+
+
+class RollingHistogram:
+    """Bucketed latencies over a sliding window made of fixed-width time slots"""
+
+    def __init__(self, window_seconds=WINDOW_SECONDS, slot_seconds=SLOT_SECONDS):
+        self.slot_seconds = slot_seconds
+        self.n_slots = max(1, window_seconds // slot_seconds)
+        self.slot_ids = [None] * self.n_slots
+        self.counts = [[0] * len(BUCKETS_MS) for _ in range(self.n_slots)]
+        self.sums = [0.0] * self.n_slots
+        self.maxes = [0.0] * self.n_slots
+
+    def add(self, ms, now):
+        slot_id = int(now // self.slot_seconds)
+        i = slot_id % self.n_slots
+        if self.slot_ids[i] != slot_id:
+            self.slot_ids[i] = slot_id
+            self.counts[i] = [0] * len(BUCKETS_MS)
+            self.sums[i] = 0.0
+            self.maxes[i] = 0.0
+        self.counts[i][bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.sums[i] += ms
+        if ms > self.maxes[i]:
+            self.maxes[i] = ms
+
+    def merged(self, now):
+        """(bucket counts, total ms, max ms) over the slots still in the window"""
+        oldest = int(now // self.slot_seconds) - self.n_slots + 1
+        counts = [0] * len(BUCKETS_MS)
+        total = peak = 0.0
+        for i, slot_id in enumerate(self.slot_ids):
+            if slot_id is not None and slot_id >= oldest:
+                for b, c in enumerate(self.counts[i]):
+                    counts[b] += c
+                total += self.sums[i]
+                peak = max(peak, self.maxes[i])
+        return counts, total, peak
+
+
+def _bucket_percentile(counts, q, peak):
+    """Estimate a percentile by interpolating inside the bucket that holds it"""
+    n = sum(counts)
+    if not n:
+        return 0.0
+    rank = q * n
+    seen = 0
+    for b, c in enumerate(counts):
+        if c and seen + c >= rank:
+            lower = BUCKETS_MS[b - 1] if b else 0.0
+            upper = min(BUCKETS_MS[b], peak)
+            return lower + (upper - lower) * (rank - seen) / c if upper > lower else upper
+        seen += c
+    return peak
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullContext()
+
+
+class _Stage:
+    __slots__ = ("call", "name", "started")
+
+    def __init__(self, call, name):
+        self.call = call
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.call.stages.append((self.name, time.perf_counter() - self.started))
+        return False
+
+
+class _Call:
+    __slots__ = ("metrics", "model", "started", "stages", "previous")
+
+    def __init__(self, metrics, model):
+        self.metrics = metrics
+        self.model = model
+        self.stages = []
+
+    def __enter__(self):
+        self.previous = getattr(self.metrics._local, "call", None)
+        self.metrics._local.call = self
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        total = time.perf_counter() - self.started
+        self.metrics._local.call = self.previous
+        self.stages.append(("total", total))
+        self.metrics._record(self.model, self.stages, exc_type is not None)
+        return False
+
+
+class InferenceMetrics:
+    def __init__(self, sample_rate=DEFAULT_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.histograms = {}   # (model, stage) -> RollingHistogram
+        self.calls = {}        # model -> calls seen, sampled or not
+        self.sampled = {}      # model -> calls timed
+        self.errors = {}       # model -> sampled calls that raised
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def set_sample_rate(self, rate):
+        self.sample_rate = min(1.0, max(0.0, float(rate)))
+
+    def timed(self, model):
+        """Context manager for one model call; a no-op unless the call is sampled"""
+        self.calls[model] = self.calls.get(model, 0) + 1
+        metrics_exporter.INFERENCE_CALLS.inc(model)
+        if self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            return _Call(self, model)
+        return _NULL
+
+    def stage(self, name):
+        """Time a stage of the model call in progress on this thread, if any"""
+        call = getattr(self._local, "call", None)
+        if call is None:
+            return _NULL
+        return _Stage(call, name)
+
+    def _record(self, model, stages, failed):
+        now = time.time()
+        with self.lock:
+            self.sampled[model] = self.sampled.get(model, 0) + 1
+            if failed:
+                self.errors[model] = self.errors.get(model, 0) + 1
+            for name, seconds in stages:
+                if name == "total":
+                    metrics_exporter.INFERENCE_SECONDS.observe(seconds, model)
+                histogram = self.histograms.get((model, name))
+                if histogram is None:
+                    histogram = self.histograms[(model, name)] = RollingHistogram()
+                histogram.add(seconds * 1000, now)
+
+    def snapshot(self):
+        """Nested dict of per-model, per-stage latency summaries for the window"""
+        now = time.time()
+        models = {}
+        with self.lock:
+            for (model, name), histogram in self.histograms.items():
+                counts, total, peak = histogram.merged(now)
+                n = sum(counts)
+                entry = models.setdefault(model, {
+                    "calls": self.calls.get(model, 0),
+                    "sampled": self.sampled.get(model, 0),
+                    "errors": self.errors.get(model, 0),
+                    "stages": {},
+                })
+                entry["stages"][name] = {
+                    "count": n,
+                    "mean_ms": round(total / n, 4) if n else 0.0,
+                    "p50_ms": round(_bucket_percentile(counts, 0.50, peak), 4),
+                    "p95_ms": round(_bucket_percentile(counts, 0.95, peak), 4),
+                    "p99_ms": round(_bucket_percentile(counts, 0.99, peak), 4),
+                    "max_ms": round(peak, 4),
+                    "buckets": counts,
+                }
+        return {
+            "since": self.started_at,
+            "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "window_seconds": WINDOW_SECONDS,
+            "sample_rate": self.sample_rate,
+            "bucket_bounds_ms": [b if b != float("inf") else None for b in BUCKETS_MS],
+            "models": models,
+        }
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.calls.clear()
+            self.sampled.clear()
+            self.errors.clear()
+            self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+metrics = InferenceMetrics()
+timed = metrics.timed
+stage = metrics.stage
+snapshot = metrics.snapshot
@@ -0,0 +1,278 @@
+"""Prometheus text-format metrics served from a local HTTP endpoint.
+
+Counters and histograms are sharded per thread: each thread updates its own
+dict without taking a lock, and a scrape sums the shards. That keeps
+instrumenting hot paths such as ``Account._record_transaction`` down to a
+dict update. When a thread ends (Streamlit starts one per rerun) its shard
+is folded into the metric's totals, so the shards are only those of live
+threads. ``start()`` launches the ``/metrics`` server once per process.
+
+    WIREBUDDY_METRICS=0             disable the exporter
+    WIREBUDDY_METRICS_HOST          bind address (default 127.0.0.1)
+    WIREBUDDY_METRICS_PORT          port (default 9464)
+"""
+import bisect
+import os
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+ENABLED = os.environ.get("WIREBUDDY_METRICS", "1") != "0"
+HOST = os.environ.get("WIREBUDDY_METRICS_HOST", "127.0.0.1")
+PORT = int(os.environ.get("WIREBUDDY_METRICS_PORT", "9464"))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _ThreadToken:
+    """Kept in a thread's local storage, so it is collected when the thread ends"""
+    __slots__ = ("__weakref__",)
+
+
+class _Sharded:
+    """Base for metrics whose state lives in one dict per writing thread"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = {}    # id -> shard of a live thread
+        self._retired = {}   # what ended threads counted
+        self._next_id = 0
+        self._shards_lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            token = _ThreadToken()
+            with self._shards_lock:
+                shard_id = self._next_id
+                self._next_id += 1
+                self._shards[shard_id] = shard
+            weakref.finalize(token, self._retire, shard_id)
+            self._local.token = token
+            self._local.shard = shard
+            return shard
+
+    def _retire(self, shard_id):
+        # runs once the thread is gone, so nothing writes to the shard any more
+        with self._shards_lock:
+            shard = self._shards.pop(shard_id, None)
+            for labelvalues, value in (shard or {}).items():
+                previous = self._retired.get(labelvalues)
+                self._retired[labelvalues] = value if previous is None else self._combine(previous, value)
+
+    def _combine(self, a, b):
+        """New value holding both a and b; values in _retired are never changed in place"""
+        raise NotImplementedError
+
+    def _all_shards(self):
+        with self._shards_lock:
+            shards = list(self._shards.values())
+            retired = list(self._retired.items())
+        # list() of a dict is a single C call, so it cannot see a half-applied update
+        return [retired] + [list(shard.items()) for shard in shards]
+
+
+class Counter(_Sharded):
+    type_name = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def _combine(self, a, b):
+        return a + b
+
+    def values(self):
+        totals = {}
+        for items in self._all_shards():
+            for labelvalues, value in items:
+                totals[labelvalues] = totals.get(labelvalues, 0) + value
+        return totals
+
+    def render(self):
+        values = self.values()
+        if not values and not self.labelnames:
+            values = {(): 0}
+        return [f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+                for labelvalues, value in sorted(values.items())]
+
+
+class Histogram(_Sharded):
+    type_name = "histogram"
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value, *labelvalues):
+        shard = self._shard()
+        state = shard.get(labelvalues)
+        if state is None:
+            state = shard[labelvalues] = [[0] * len(self.buckets), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def _combine(self, a, b):
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1], a[2] + b[2]]
+
+    def render(self):
+        merged = {}
+        for items in self._all_shards():
+            for labelvalues, (counts, total, count) in items:
+                entry = merged.setdefault(labelvalues, [[0] * len(self.buckets), 0.0, 0])
+                for i, c in enumerate(list(counts)):
+                    entry[0][i] += c
+                entry[1] += total
+                entry[2] += count
+
+        lines = []
+        for labelvalues, (counts, total, count) in sorted(merged.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = _labels(self.labelnames, labelvalues, [("le", _number(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {count}")
+        return lines
+
+
+class GaugeFunction:
+    """Gauge read from a callback at scrape time; the callback may return a
+    number or a dict of label-value tuples to numbers"""
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, function, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def render(self):
+        try:
+            value = self.function()
+        except Exception as e:
+            print(f"Metric {self.name} failed: {e}")
+            return []
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(v)}"
+                for labelvalues, v in sorted(value.items())]
+
+
+def render():
+    """All registered metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type_name}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _active_sessions():
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return None
+    return Runtime.instance()._session_mgr.num_active_sessions()
+
+
+# ---------- Application metrics ----------
+TRANSACTIONS = Counter("wirebuddy_transactions_total", "Ledger entries recorded", ["type"])
+TRANSACTION_AMOUNT = Counter("wirebuddy_transaction_amount_ghs_total",
+                             "Absolute amount of ledger entries recorded, in GHS", ["type"])
+FRAUD_FLAGS = Counter("wirebuddy_fraud_flags_total", "Transactions flagged for review", ["source"])
+FRAUD_CASCADE_DECISIONS = Counter("wirebuddy_fraud_cascade_total",
+                                  "Fraud checks by the stage that decided them", ["stage"])
+PAYMENT_VERIFICATIONS = Counter("wirebuddy_payment_verifications_total",
+                                "Paystack verification results", ["kind", "outcome"])
+DB_LOCK_RETRIES = Counter("wirebuddy_db_lock_retries_total",
+                          "Statements (execute_with_retry) and write batches (the write coalescer's "
+                          "BEGIN IMMEDIATE) retried after 'database is locked'")
+DB_LOCK_FAILURES = Counter("wirebuddy_db_lock_failures_total",
+                           "Statements and write batches that were still locked after the last retry")
+CACHE_REQUESTS = Counter("wirebuddy_cache_requests_total", "Cache lookups", ["cache", "result"])
+INFERENCE_CALLS = Counter("wirebuddy_inference_calls_total", "Model calls, sampled or not", ["model"])
+INFERENCE_SECONDS = Histogram("wirebuddy_inference_seconds",
+                              "Model call latency of sampled calls, see WIREBUDDY_INFERENCE_SAMPLE_RATE",
+                              ["model"])
+FRAGMENT_SECONDS = Histogram("wirebuddy_fragment_render_seconds",
+                             "Render time of dashboard and admin panel fragments", ["fragment"])
+WRITE_BATCH_SIZE = Histogram("wirebuddy_write_batch_operations",
+                             "Write operations committed together by the write coalescer",
+                             buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+WRITE_COMMIT_SECONDS = Histogram("wirebuddy_write_commit_seconds",
+                                 "Time to run and commit one write coalescer batch")
+ONLINE_ANOMALY_SCORE = Histogram("wirebuddy_online_anomaly_score",
+                                 "Online detector scores of withdrawals and transfers",
+                                 buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9))
+ACTIVE_SESSIONS = GaugeFunction("wirebuddy_active_sessions", "Connected Streamlit sessions", _active_sessions)
+
+
+# ---------- HTTP endpoint ----------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the app log
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start(host=HOST, port=PORT):
+    """Serve /metrics on a daemon thread; later calls in the same process are no-ops"""
+    global _server
+    with _server_lock:
+        if _server is not None or not ENABLED:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            print(f"Metrics exporter not started on {host}:{port}: {e}")
+            return None
+        _server.daemon_threads = True
+        thread = threading.Thread(target=_server.serve_forever, name="metrics-exporter", daemon=True)
+        thread.start()
+        print(f"Metrics exporter listening on http://{host}:{_server.server_port}/metrics")
+        return _server
@@ -0,0 +1,485 @@
+"""Offline evaluation of fraud detectors against the review queue's verdicts.
+
+The only labels the bank has are admin reviews: a flagged transaction that
+was ``confirmed`` is fraud, one that was ``approved`` is not. ``evaluate``
+replays every withdrawal and transfer of a period of bank.db in time order
+through a candidate detector, keeping velocity counters and known
+counterparties up to date as the app does, and reports:
+
+    quality   precision, recall and F1 of the candidate's alerts and ROC AUC
+              of its scores, on the reviewed transactions (with
+              ``--unflagged-as-legit``, also on every transaction never
+              flagged, counted as legitimate)
+    volume    alerts per day over all replayed transactions
+    speed     p50/p99 latency of a scoring call and rows per second, one
+              transaction per call and ``--batch`` per call
+
+Reviewed flags only cover what production flagged, so recall is measured
+against the fraud the current detectors found. ``baseline_precision`` is
+the share of reviewed flags that were confirmed, i.e. the precision of
+what is flagging today.
+
+Candidates:
+
+    model[:PATH]          a pickled Pipeline ending in an IsolationForest or
+                          RandomForestClassifier (default fraud_model.pkl),
+                          compiled as the app does
+    sklearn[:PATH]        the same Pipeline, scored by sklearn
+    cascade[:PATH]        the rules in PATH (default fraud_rules.json) in
+                          front of fraud_model.pkl
+    online[:PATH]         online_detector, learning as it goes, starting
+                          from the checkpoint in PATH if given
+    package.module:Name   any Candidate subclass, built with no arguments
+
+Limits given on the command line, and a previous report passed as
+``--baseline``, are checked under "gate" in the JSON report; the command
+exits with status 1 when a check fails, so promotion can wait on it.
+
+    python model_evaluation.py model:candidate.pkl --since 2026-01-01 \\
+        --baseline current.json --max-p99-ms 5 --json candidate.json
+"""
+import argparse
+import importlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+import fraud_rules
+import online_detector
+import tree_compiler
+from velocity_features import VelocityStore
+
+
+DB_PATH = "bank.db"
+MODEL_PATH = "fraud_model.pkl"
+BATCH = 256
+TOLERANCE = 0.01  # how far precision, recall or AUC may fall below the baseline report's
+# Ledger types under the names fraud_model.pkl was trained on, as FraudDetector.model_input maps them
+MODEL_TRANSACTION_TYPES = {"Withdrawal": "ATM Withdrawal", "Transfer Out": "Bank Transfer"}
+DAYS_PER_MONTH = 30.4375
+
+STREAM_SQL = """
+    SELECT t.account_number, t.type, ABS(t.amount), t.description, t.timestamp, t.reference_id, a.created_at
+    FROM transactions t JOIN accounts a ON a.account_number = t.account_number
+    WHERE t.type IN ('Withdrawal', 'Transfer Out') AND t.timestamp >= ? AND t.timestamp < ?
+    ORDER BY t.timestamp, t.id
+"""
+REVIEWED_STATUSES = {"confirmed": 1, "approved": 0}
+
+
+def _parse(timestamp):
+    return datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+
+
+# ---------- Candidates ----------
+class Candidate:
+    """A detector under evaluation.
+
+    ``prepare`` turns a transaction into what ``score`` needs; it is called
+    in time order, before the transaction is counted in the context's
+    velocity counters and counterparties. ``score`` takes a list of
+    prepared rows and returns (scores, alerts): scores, higher meaning more
+    suspicious, and whether each row would be flagged. ``learn`` gets the
+    rows after they are scored.
+    """
+    name = "candidate"
+
+    def reset(self, context):
+        """Start a replay from scratch"""
+
+    def prepare(self, transaction, context):
+        return transaction
+
+    def score(self, rows):
+        raise NotImplementedError
+
+    def learn(self, rows):
+        pass
+
+    def details(self):
+        """Anything worth adding to the report about the last replay"""
+        return {}
+
+
+class ModelCandidate(Candidate):
+    """A fraud model Pipeline, fed the same four columns as FraudDetector feeds fraud_model.pkl"""
+
+    def __init__(self, path=MODEL_PATH, engine="compiled"):
+        from sklearn.base import is_classifier
+        self.name = f"{'model' if engine == 'compiled' else engine}:{path}"
+        self.model = joblib.load(path)
+        if not hasattr(self.model, "steps"):
+            raise ValueError(f"{path} is not a Pipeline with its own preprocessing")
+        self.classifier = is_classifier(self.model.steps[-1][1])
+        self.scorer = tree_compiler.compile_model(self.model) if engine == "compiled" else self.model
+
+    def prepare(self, transaction, context):
+        return {
+            'Transaction_Amount': abs(transaction['amount']),
+            'Transaction_Type': MODEL_TRANSACTION_TYPES.get(transaction['type'], transaction['type']),
+            'Time_of_Transaction': int(transaction['timestamp'][11:13]),
+            'Account_Age': transaction['account_age_days'] / DAYS_PER_MONTH,
+        }
+
+    def score(self, rows):
+        X = {column: [row[column] for row in rows] for column in rows[0]}
+        if self.scorer is self.model:
+            X = pd.DataFrame(X)
+        if self.classifier:
+            scores = self.scorer.predict_proba(X)[:, 1]
+            return scores, scores >= 0.5
+        decision = self.scorer.decision_function(X)
+        return -decision, decision < 0
+
+
+class CascadeCandidate(Candidate):
+    """The fraud rules, with fraud_model.pkl for what they leave undecided.
+
+    A rule flag scores +inf and a rule accept -inf, so they rank above and
+    below every model score.
+    """
+
+    def __init__(self, path=fraud_rules.RULES_PATH, model_path=MODEL_PATH):
+        self.name = f"cascade:{path}"
+        self.model = ModelCandidate(model_path)
+        self._row = None
+        # the facts are looked up when the row is prepared, so the rules read them from the row
+        self.cascade = fraud_rules.FraudCascade(None, lambda account: self._row["age"], self,
+                                                lambda account, counterparty: self._row["prior"],
+                                                path=path, check_seconds=float("inf"))
+        self.decisions = {}
+
+    def features(self, account_number, timestamp, pending_amount=None):
+        return self._row["velocity"]
+
+    def reset(self, context):
+        self.decisions = {"accept": 0, "flag": 0, "model": 0}
+
+    def prepare(self, transaction, context):
+        counterparty = transaction.get("counterparty")
+        return {
+            "transaction": transaction,
+            "age": transaction["account_age_days"],
+            "velocity": context.velocity.features(transaction["account_number"], transaction["timestamp"],
+                                                  transaction["amount"]),
+            "prior": context.counterparties.count(transaction["account_number"], counterparty) if counterparty else 0,
+            "model": self.model.prepare(transaction, context),
+        }
+
+    def score(self, rows):
+        scores = np.empty(len(rows))
+        alerts = np.zeros(len(rows), dtype=bool)
+        undecided = []
+        for i, row in enumerate(rows):
+            self._row = row
+            action, _ = self.cascade.decide(row["transaction"])
+            if action is None:
+                undecided.append(i)
+            else:
+                scores[i] = np.inf if action == "flag" else -np.inf
+                alerts[i] = action == "flag"
+            self.decisions[action or "model"] += 1
+        if undecided:
+            scores[undecided], alerts[undecided] = self.model.score([rows[i]["model"] for i in undecided])
+        return scores, alerts
+
+    def details(self):
+        return {"decisions": dict(self.decisions), "rules": len(self.cascade.rules)}
+
+
+class OnlineCandidate(Candidate):
+    """online_detector's Half-Space Trees, learning from each batch after scoring it"""
+
+    def __init__(self, path=None, threshold=online_detector.ALERT_SCORE):
+        self.name = f"online:{path}" if path else "online"
+        self.path = path
+        self.threshold = threshold
+        self.detector = None
+
+    def reset(self, context):
+        self.detector = online_detector.OnlineDetector(context.velocity, self.path or "", checkpoint_interval=0)
+        if self.path:
+            self.detector.load()
+
+    def prepare(self, transaction, context):
+        return {"vector": self.detector.vector(transaction)}
+
+    def score(self, rows):
+        model = self.detector.model
+        for row in rows:
+            row["path"] = model.path(row["vector"])
+        scores = np.array([model.score_path(row["path"]) for row in rows])
+        return scores, scores >= self.threshold
+
+    def learn(self, rows):
+        for row in rows:
+            self.detector.model.learn_path(row["path"])
+
+    def details(self):
+        return {"windows": self.detector.model.windows, "threshold": self.threshold}
+
+
+CANDIDATES = {
+    "model": ModelCandidate,
+    "sklearn": lambda path=MODEL_PATH: ModelCandidate(path, engine="sklearn"),
+    "cascade": CascadeCandidate,
+    "online": OnlineCandidate,
+}
+
+
+def load_candidate(spec):
+    """Candidate for a spec such as ``model:candidate.pkl`` or ``package.module:Name``"""
+    name, _, argument = spec.partition(":")
+    if name in CANDIDATES:
+        return CANDIDATES[name](argument) if argument else CANDIDATES[name]()
+    module, _, attribute = spec.rpartition(":")
+    if not module:
+        raise ValueError(f"Unknown candidate {spec!r}; use one of {', '.join(CANDIDATES)} or package.module:Name")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+# ---------- Replay ----------
+class ReplayContext:
+    """What the app keeps in memory while transactions come in: velocity counters and known recipients"""
+
+    def __init__(self):
+        self.velocity = VelocityStore()
+        self.counterparties = fraud_rules.KnownCounterparties()
+
+    def record(self, transaction):
+        self.velocity.record(transaction["account_number"], transaction["type"], transaction["amount"],
+                             transaction["timestamp"])
+        if transaction.get("counterparty"):
+            self.counterparties.record(transaction["account_number"], transaction["counterparty"])
+
+
+def load_stream(conn, since=None, until=None):
+    """Withdrawals and transfers of the period in time order, each with its review label (1, 0 or None)"""
+    labels = {}
+    for reference_id, account_number, status in conn.execute(
+            "SELECT transaction_ref, account_number, status FROM flagged_transactions"):
+        key = (reference_id, account_number)
+        # a reviewed flag wins over a pending one on the same transaction
+        if status in REVIEWED_STATUSES or key not in labels:
+            labels[key] = status
+    stream = []
+    for account_number, txn_type, amount, description, timestamp, reference_id, created_at in conn.execute(
+            STREAM_SQL, (since or "0000", until or "9999")):
+        status = labels.get((reference_id, account_number))
+        stream.append({
+            "account_number": account_number, "type": txn_type, "amount": amount,
+            "description": description, "timestamp": timestamp, "reference_id": reference_id,
+            "counterparty": description[4:] if description and description.startswith("To: ") else None,
+            "account_age_days": (_parse(timestamp) - _parse(created_at)).days,
+            "flagged": status is not None,
+            "label": REVIEWED_STATUSES.get(status),
+        })
+    return stream
+
+
+def replay(candidate, stream, batch=1):
+    """Scores and alerts of the stream, scored ``batch`` transactions per call, and the call timings"""
+    context = ReplayContext()
+    candidate.reset(context)
+    scores = np.empty(len(stream))
+    alerts = np.zeros(len(stream), dtype=bool)
+    calls = []
+    prepare_seconds = 0.0
+    for start in range(0, len(stream), batch):
+        chunk = stream[start:start + batch]
+        started = time.perf_counter()
+        rows = []
+        for transaction in chunk:
+            rows.append(candidate.prepare(transaction, context))
+            context.record(transaction)
+        prepare_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        chunk_scores, chunk_alerts = candidate.score(rows)
+        calls.append(time.perf_counter() - started)
+        scores[start:start + len(chunk)] = chunk_scores
+        alerts[start:start + len(chunk)] = chunk_alerts
+        candidate.learn(rows)
+    return scores, alerts, _latency(calls, len(stream), prepare_seconds)
+
+
+def _latency(calls, rows, prepare_seconds):
+    if not calls:
+        return {"calls": 0}
+    ordered = sorted(calls)
+    return {
+        "calls": len(calls),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 4),
+        "rows_per_s": round(rows / sum(calls)) if sum(calls) else None,
+        "prepare_us_per_row": round(prepare_seconds / rows * 1e6, 2),
+    }
+
+
+# ---------- Metrics ----------
+def _auc(labels, scores):
+    """ROC AUC from score ranks (ties count half); None without both classes"""
+    positives = int(labels.sum())
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return None
+    ranks = rankdata(scores)
+    return float((ranks[labels == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+def quality(labels, scores, alerts):
+    """Confusion counts, precision, recall, F1 and AUC over the labelled rows"""
+    y = labels.astype(bool)
+    tp = int((alerts & y).sum())
+    fp = int((alerts & ~y).sum())
+    fn = int((~alerts & y).sum())
+    tn = int((~alerts & ~y).sum())
+    precision = tp / (tp + fp) if tp + fp else None
+    recall = tp / (tp + fn) if tp + fn else None
+    f1 = 2 * precision * recall / (precision + recall) if precision and recall else None
+    auc = _auc(labels, scores)
+    return {
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": None if precision is None else round(precision, 4),
+        "recall": None if recall is None else round(recall, 4),
+        "f1": None if f1 is None else round(f1, 4),
+        "auc": None if auc is None else round(auc, 4),
+    }
+
+
+def evaluate(conn, candidate, since=None, until=None, batch=BATCH, unflagged_as_legit=False):
+    """Replay the period through the candidate, one row per call and ``batch`` per call; returns the report"""
+    stream = load_stream(conn, since, until)
+    if not stream:
+        raise ValueError("No withdrawals or transfers in the period")
+    labels = np.array([-1 if txn["label"] is None else txn["label"] for txn in stream])
+    if unflagged_as_legit:
+        labels[[not txn["flagged"] for txn in stream]] = 0
+    labelled = labels >= 0
+    confirmed = int((labels == 1).sum())
+    reviewed = sum(txn["label"] is not None for txn in stream)
+
+    scores, alerts, single = replay(candidate, stream, 1)
+    details = candidate.details()
+    batch_scores, batch_alerts, batched = replay(candidate, stream, batch)
+    same = (batch_scores == scores) | (np.isnan(batch_scores) & np.isnan(scores))
+    days = max(1.0, (_parse(stream[-1]["timestamp"]) - _parse(stream[0]["timestamp"])).total_seconds() / 86400)
+
+    return {
+        "candidate": candidate.name,
+        "evaluated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "period": {"from": stream[0]["timestamp"], "to": stream[-1]["timestamp"], "days": round(days, 2)},
+        "data": {
+            "replayed": len(stream), "reviewed": reviewed, "confirmed": confirmed,
+            "approved": int(reviewed - confirmed), "labelled": int(labelled.sum()),
+            "unflagged_as_legit": unflagged_as_legit,
+        },
+        "baseline_precision": round(confirmed / reviewed, 4) if reviewed else None,
+        "metrics": dict(quality(labels[labelled], scores[labelled], alerts[labelled]),
+                        alerts=int(alerts.sum()), alerts_per_day=round(float(alerts.sum()) / days, 2)),
+        "latency": {"single": single, "batch": dict(batched, batch=batch)},
+        "batch": {
+            "scores_differing": int((~same).sum()),
+            "max_score_difference": float(np.abs(np.where(same, 0, batch_scores - scores)).max()),
+            "alerts_differing": int((batch_alerts != alerts).sum()),
+        },
+        "details": details,
+    }
+
+
+# ---------- Promotion gate ----------
+# (option, report value, comparison)
+LIMITS = (
+    ("min_precision", lambda r: r["metrics"]["precision"], ">="),
+    ("min_recall", lambda r: r["metrics"]["recall"], ">="),
+    ("min_auc", lambda r: r["metrics"]["auc"], ">="),
+    ("max_alerts_per_day", lambda r: r["metrics"]["alerts_per_day"], "<="),
+    ("max_p99_ms", lambda r: r["latency"]["single"]["p99_ms"], "<="),
+)
+
+
+def gate(report, limits, baseline=None, tolerance=TOLERANCE):
+    """Checks of the report against the limits and a baseline report; a missing value fails its check"""
+    checks = []
+
+    def check(name, value, comparison, limit):
+        passed = value is not None and (value >= limit if comparison == ">=" else value <= limit)
+        checks.append({"check": name, "value": value, "limit": limit, "passed": passed})
+
+    for option, value, comparison in LIMITS:
+        if limits.get(option) is not None:
+            check(option, value(report), comparison, limits[option])
+    if baseline:
+        for metric in ("precision", "recall", "auc"):
+            if baseline["metrics"].get(metric) is not None:
+                check(f"{metric} vs {baseline['candidate']}", report["metrics"][metric], ">=",
+                      round(baseline["metrics"][metric] - tolerance, 4))
+    return {"passed": all(c["passed"] for c in checks), "checks": checks}
+
+
+def print_report(report):
+    data, metrics = report["data"], report["metrics"]
+    print(f"{report['candidate']}: {data['replayed']} transactions over {report['period']['days']} days, "
+          f"{data['reviewed']} reviewed ({data['confirmed']} confirmed)")
+    print(f"precision {metrics['precision']}  recall {metrics['recall']}  f1 {metrics['f1']}  auc {metrics['auc']}  "
+          f"(flags today: precision {report['baseline_precision']})")
+    print(f"{metrics['alerts']} alerts, {metrics['alerts_per_day']} per day")
+    for mode, latency in report["latency"].items():
+        print(f"{mode:>6}: p50 {latency.get('p50_ms')} ms  p99 {latency.get('p99_ms')} ms  "
+              f"{latency.get('rows_per_s')} rows/s  ({latency.get('prepare_us_per_row')} us/row preparing)")
+    if report["batch"]["scores_differing"]:
+        print(f"batched scores differ on {report['batch']['scores_differing']} rows "
+              f"(max {report['batch']['max_score_difference']:.3g}), alerts on {report['batch']['alerts_differing']}")
+    for check in report.get("gate", {}).get("checks", []):
+        print(f"{'PASS' if check['passed'] else 'FAIL'} {check['check']}: {check['value']} (limit {check['limit']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay reviewed fraud flags through a candidate detector")
+    parser.add_argument("candidate", nargs="?", default="model",
+                        help="model[:PATH], sklearn[:PATH], cascade[:RULES], online[:CHECKPOINT] "
+                             "or package.module:Name")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--since", help="YYYY-MM-DD")
+    parser.add_argument("--until", help="YYYY-MM-DD, exclusive")
+    parser.add_argument("--batch", type=int, default=BATCH, help="rows per call in the batched replay")
+    parser.add_argument("--unflagged-as-legit", action="store_true",
+                        help="count transactions that were never flagged as legitimate")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="report of the model in production, to compare against")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="how far precision, recall and AUC may fall below the baseline's")
+    for option, _, comparison in LIMITS:
+        parser.add_argument(f"--{option.replace('_', '-')}", type=float)
+    args = parser.parse_args()
+
+    try:
+        candidate = load_candidate(args.candidate)
+        conn = sqlite3.connect(f"file:{os.path.abspath(args.db)}?mode=ro", uri=True)
+        try:
+            report = evaluate(conn, candidate, args.since, args.until, args.batch, args.unflagged_as_legit)
+        finally:
+            conn.close()
+    except (ValueError, ImportError, AttributeError, OSError, sqlite3.Error) as e:
+        parser.error(str(e))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report["gate"] = gate(report, vars(args), baseline, args.tolerance)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if report["gate"]["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
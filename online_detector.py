@@ -0,0 +1,301 @@
+"""Streaming anomaly detector for withdrawals and transfers (Half-Space Trees).
+
+fraud_model.pkl is fitted once, offline. This detector learns from every
+committed withdrawal and transfer instead, so what counts as unusual
+follows the day's traffic. It is a Half-Space Trees ensemble (Tan, Ting and
+Liu, 2011):
+
+    trees   ``TREES`` complete binary trees of height ``HEIGHT``, built once
+            from random splits of the unit feature cube; the data only
+            changes the per-node counts
+    masses  per node, how many transactions of the last full window went
+            through it (reference) and how many of the current window have
+            (latest)
+    window  every ``WIREBUDDY_ONLINE_WINDOW`` transactions the latest
+            counts become the reference and counting starts again
+
+A transaction is scored against the reference counts: in each tree it goes
+down until a node that fewer than SIZE_LIMIT of the window's transactions
+reached, and takes that node's count times 2^depth. Averaged over the trees
+and divided by the window this is a mass between 0 and 2^HEIGHT, high where
+the last window was dense; ``score`` maps it to
+
+    1 - log2(1 + mass) / log2(1 + 2^HEIGHT)
+
+so typical transactions score around 0.2 and ones in regions the last
+window rarely visited 0.5 and above. Learning and scoring take a fixed
+TREES x HEIGHT steps and the memory is fixed by TREES and HEIGHT, however
+many transactions go by.
+
+The features are the ones that cost no query: amount, hour, withdrawal or
+transfer, and the account's velocity counters (velocity_features.py),
+scaled into [0, 1] by FEATURES. Scores are 0 until the first window has
+been filled.
+
+The trees and counts are checkpointed to ``WIREBUDDY_ONLINE_CHECKPOINT``
+every ``WIREBUDDY_ONLINE_CHECKPOINT_INTERVAL`` seconds when they have
+changed (0 disables), and loaded from there at startup.
+"""
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from velocity_features import VelocityStore, velocity_store
+
+
+CHECKPOINT_PATH = os.environ.get("WIREBUDDY_ONLINE_CHECKPOINT", "online_detector.npz")
+CHECKPOINT_INTERVAL = float(os.environ.get("WIREBUDDY_ONLINE_CHECKPOINT_INTERVAL", "300"))
+WINDOW = int(os.environ.get("WIREBUDDY_ONLINE_WINDOW", "256"))
+TREES = 25
+HEIGHT = 10
+SIZE_LIMIT = 0.1  # share of the window below which a node counts as sparse
+ALERT_SCORE = 0.5  # scores from here up count as alerts when the detector is evaluated
+ONLINE_TYPES = ("Withdrawal", "Transfer Out")
+REBUILD_DAYS = 7  # ledger relearned by rebuild()
+
+# (name, value of a feature dict, value scaled to 1)
+FEATURES = (
+    ("amount", lambda f: math.log1p(abs(f["amount"])), math.log1p(100_000)),
+    ("hour", lambda f: f["hour"], 24),
+    ("transfer", lambda f: f["type"] == "Transfer Out", 1),
+    ("count_1h", lambda f: math.log1p(f["velocity_count_1h"]), math.log1p(50)),
+    ("sum_24h", lambda f: math.log1p(f["velocity_sum_24h"]), math.log1p(100_000)),
+    ("count_7d", lambda f: math.log1p(f["velocity_count_7d"]), math.log1p(500)),
+)
+
+
+class HalfSpaceTrees:
+    def __init__(self, n_features, trees=TREES, height=HEIGHT, window=WINDOW, seed=None):
+        self.n_features = n_features
+        self.trees = trees
+        self.height = height
+        self.window = window
+        self.size_limit = SIZE_LIMIT * window
+        rng = np.random.default_rng(seed)
+        internal = 2 ** height - 1
+        self.feature = np.empty((trees, internal), dtype=np.intp)
+        self.split = np.empty((trees, internal))
+        for t in range(trees):
+            # a random workspace around the unit cube, halved at every node
+            s = rng.random(n_features)
+            reach = 2 * np.maximum(s, 1 - s)
+            low = np.empty((internal, n_features))
+            high = np.empty((internal, n_features))
+            low[0], high[0] = s - reach, s + reach
+            for node in range(internal):
+                q = rng.integers(n_features)
+                middle = (low[node, q] + high[node, q]) / 2
+                self.feature[t, node] = q
+                self.split[t, node] = middle
+                for child, bound in ((2 * node + 1, high), (2 * node + 2, low)):
+                    if child < internal:
+                        low[child], high[child] = low[node], high[node]
+                        bound[child, q] = middle
+        nodes = 2 ** (height + 1) - 1
+        self.reference = np.zeros((trees, nodes), dtype=np.int64)
+        self.latest = np.zeros((trees, nodes), dtype=np.int64)
+        self.seen = 0        # transactions in the current window
+        self.windows = 0     # windows completed
+        self.updates = 0
+        self._rows = np.arange(trees)[:, None]
+        self._weights = 2.0 ** np.arange(height + 1)
+        self._scale = math.log2(1.0 + 2.0 ** height)
+        self._flatten()
+
+    def _flatten(self):
+        # the splits of all trees in one array, for one lookup per level
+        self._offsets = np.arange(self.trees) * self.feature.shape[1]
+        self._feature = self.feature.ravel()
+        self._split = self.split.ravel()
+
+    def path(self, x):
+        """Node ids from root to leaf of x in every tree, shape (trees, height + 1)"""
+        x = np.asarray(x, dtype=np.float64)
+        path = np.empty((self.height + 1, self.trees), dtype=np.intp)
+        nodes = np.zeros(self.trees, dtype=np.intp)
+        for depth in range(self.height):
+            path[depth] = nodes
+            flat = self._offsets + nodes
+            nodes = 2 * nodes + 1 + (x[self._feature[flat]] > self._split[flat])
+        path[self.height] = nodes
+        return path.T
+
+    def score_path(self, path):
+        """Anomaly score 0-1 of the point with this path, against the reference window"""
+        if not self.windows:
+            return 0.0
+        masses = self.reference[self._rows, path]
+        sparse = masses < self.size_limit
+        # the first sparse node, or the leaf
+        depth = np.where(sparse.any(axis=1), sparse.argmax(axis=1), self.height)
+        mass = (masses[self._rows[:, 0], depth] * self._weights[depth]).mean() / self.window
+        return float(1.0 - math.log2(1.0 + mass) / self._scale)
+
+    def learn_path(self, path):
+        self.latest[self._rows, path] += 1
+        self.seen += 1
+        self.updates += 1
+        if self.seen >= self.window:
+            self.reference, self.latest = self.latest, self.reference
+            self.latest[:] = 0
+            self.seen = 0
+            self.windows += 1
+
+    def state(self):
+        return {
+            "feature": self.feature, "split": self.split,
+            "reference": self.reference, "latest": self.latest,
+            "counters": np.array([self.seen, self.windows, self.updates]),
+            "shape": np.array([self.n_features, self.trees, self.height, self.window]),
+        }
+
+    def load_state(self, state):
+        shape = [int(v) for v in state["shape"]]
+        if shape != [self.n_features, self.trees, self.height, self.window]:
+            raise ValueError(f"checkpoint is for (features, trees, height, window) {tuple(shape)}")
+        self.feature = state["feature"].astype(np.intp)
+        self.split = state["split"].astype(np.float64)
+        self.reference = state["reference"].astype(np.int64)
+        self.latest = state["latest"].astype(np.int64)
+        self.seen, self.windows, self.updates = (int(v) for v in state["counters"])
+        self._flatten()
+
+
+class OnlineDetector:
+    def __init__(self, velocity=velocity_store, checkpoint_path=CHECKPOINT_PATH,
+                 checkpoint_interval=CHECKPOINT_INTERVAL, window=WINDOW, seed=42):
+        self.velocity = velocity
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.model = HalfSpaceTrees(len(FEATURES), window=window, seed=seed)
+        self.saved_updates = 0
+        self.last_checkpoint = None
+        self.last_error = None
+        self._thread = None
+
+    def vector(self, transaction, recorded=False):
+        """Scaled feature vector of a withdrawal or transfer.
+
+        ``recorded`` is True when the transaction is already in the velocity
+        counters; otherwise its amount is counted as pending.
+        """
+        features = self.velocity.features(transaction["account_number"], transaction["timestamp"],
+                                          None if recorded else transaction["amount"])
+        features.update(amount=transaction["amount"], type=transaction["type"],
+                        hour=int(transaction["timestamp"][11:13]))
+        return np.clip([value(features) / scale for _, value, scale in FEATURES], 0.0, 1.0)
+
+    def score(self, transaction):
+        """Anomaly score 0-1 of a pending withdrawal or transfer"""
+        x = self.vector(transaction)
+        # under the lock, so a checkpoint load cannot swap the trees mid-traversal
+        with self.lock:
+            return self.model.score_path(self.model.path(x))
+
+    def learn(self, transaction):
+        """Count a committed withdrawal or transfer; other types are ignored"""
+        if transaction["type"] not in ONLINE_TYPES:
+            return
+        x = self.vector(transaction, recorded=True)
+        with self.lock:
+            self.model.learn_path(self.model.path(x))
+
+    def rebuild(self, conn, now=None, days=REBUILD_DAYS):
+        """Replace the model with a fresh one that learned the last ``days`` of the ledger.
+
+        For when bank.db was replaced (a restore): the checkpoint and the
+        counts learned since describe the old ledger. Returns rows learned.
+        """
+        started = time.perf_counter()
+        since = ((now or datetime.now()) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+        rows = conn.execute(f"""
+            SELECT account_number, type, ABS(amount), timestamp
+            FROM transactions
+            WHERE timestamp >= ? AND type IN ({','.join('?' * len(ONLINE_TYPES))})
+            ORDER BY timestamp, id
+        """, (since, *ONLINE_TYPES)).fetchall()
+        # velocity counters as of each transaction, as they were when it came in
+        velocity = VelocityStore()
+        fresh = OnlineDetector(velocity, self.checkpoint_path, 0, self.model.window, self.seed)
+        for account_number, txn_type, amount, timestamp in rows:
+            velocity.record(account_number, txn_type, amount, timestamp)
+            fresh.learn({"account_number": account_number, "type": txn_type,
+                         "amount": amount, "timestamp": timestamp})
+        with self.lock:
+            self.model = fresh.model
+            self.saved_updates = -1   # the checkpoint on disk is of the old model
+        if self.checkpoint_interval > 0:
+            self.save()
+        print(f"Rebuilt online detector from {len(rows)} transactions in {time.perf_counter() - started:.2f}s")
+        return len(rows)
+
+    # ---------- Checkpoints ----------
+    def save(self, path=None):
+        """Write the model to the checkpoint file (atomically); returns False if unchanged"""
+        path = path or self.checkpoint_path
+        with self.lock:
+            if self.model.updates == self.saved_updates and os.path.exists(path):
+                return False
+            state = {name: array.copy() for name, array in self.model.state().items()}
+            updates = self.model.updates
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **state)
+        os.replace(tmp_path, path)
+        self.saved_updates = updates
+        self.last_checkpoint = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return True
+
+    def load(self, path=None):
+        """Replace the model with the checkpoint, if there is a usable one"""
+        path = path or self.checkpoint_path
+        if not os.path.exists(path):
+            return False
+        try:
+            with np.load(path) as state:
+                with self.lock:
+                    self.model.load_state(state)
+                    self.saved_updates = self.model.updates
+        except Exception as e:
+            print(f"Online detector checkpoint {path} not loaded: {e}")
+            return False
+        print(f"Loaded online detector checkpoint: {self.model.updates} transactions learned, "
+              f"{self.model.windows} windows")
+        return True
+
+    def report(self):
+        with self.lock:
+            model = self.model
+            return {
+                "updates": model.updates, "windows": model.windows, "window": model.window,
+                "in_window": model.seen, "trees": model.trees, "height": model.height,
+                "memory_kb": round((model.reference.nbytes + model.latest.nbytes
+                                    + model.feature.nbytes + model.split.nbytes) / 1024, 1),
+                "last_checkpoint": self.last_checkpoint, "unsaved": model.updates - self.saved_updates,
+            }
+
+    def _run(self):
+        while True:
+            time.sleep(self.checkpoint_interval)
+            try:
+                self.save()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Online detector checkpoint failed: {e}")
+
+    def start(self):
+        """Start the checkpoint schedule, unless disabled or already running"""
+        if self.checkpoint_interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="online-detector", daemon=True)
+        self._thread.start()
+
+
+detector = OnlineDetector()
@@ -0,0 +1,269 @@
+"""SQL query tracing for the app's SQLite connections.
+
+Connections opened with ``connect()`` time every statement (execute plus the
+fetches that drain it), group them by a normalized SQL fingerprint and keep
+count, total time, p50/p95/max and rows returned per fingerprint. Statements
+slower than ``SLOW_QUERY_MS`` get an ``EXPLAIN QUERY PLAN`` sampled, at most
+once per fingerprint every ``PLAN_SAMPLE_INTERVAL`` seconds.
+
+Set ``WIREBUDDY_QUERY_TRACING=0`` to get plain sqlite3 connections.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+
+ENABLED = os.environ.get("WIREBUDDY_QUERY_TRACING", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("WIREBUDDY_SLOW_QUERY_MS", "50"))
+PLAN_SAMPLE_INTERVAL = 60.0  # seconds between EXPLAIN samples per fingerprint
+SAMPLES_PER_QUERY = 1024     # durations kept per fingerprint for percentiles
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """Normalize SQL so calls differing only in literals or spacing group together"""
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?, ...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip().rstrip(";")
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class QueryStats:
+    __slots__ = ("count", "total", "max", "rows", "durations", "slow_count",
+                 "plan", "plan_sql", "plan_sampled_at", "last_seen")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.durations = deque(maxlen=SAMPLES_PER_QUERY)
+        self.slow_count = 0
+        self.plan = None
+        self.plan_sql = None
+        self.plan_sampled_at = 0.0
+        self.last_seen = None
+
+
+class QueryTracer:
+    """Thread-safe per-fingerprint statistics shared by all traced connections"""
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def record(self, sql, seconds, rows, connection=None, params=()):
+        key = fingerprint(sql)
+        slow = seconds * 1000 >= self.slow_query_ms
+        sample_plan = False
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = QueryStats()
+            stats.count += 1
+            stats.total += seconds
+            stats.rows += rows
+            stats.durations.append(seconds)
+            if seconds > stats.max:
+                stats.max = seconds
+            stats.last_seen = time.time()
+            if slow:
+                stats.slow_count += 1
+                now = time.monotonic()
+                if connection is not None and now - stats.plan_sampled_at >= PLAN_SAMPLE_INTERVAL:
+                    stats.plan_sampled_at = now
+                    sample_plan = True
+        if sample_plan:
+            plan = self.explain(connection, sql, params)
+            with self.lock:
+                stats.plan = plan
+                stats.plan_sql = sql
+
+    @staticmethod
+    def explain(connection, sql, params=()):
+        """Return EXPLAIN QUERY PLAN output as indented lines, or the error"""
+        try:
+            # A plain cursor, so the plan lookup is not traced itself
+            plan_cursor = sqlite3.Cursor(connection)
+            try:
+                rows = plan_cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            finally:
+                plan_cursor.close()
+            depth = {0: 0}
+            lines = []
+            for node_id, parent_id, _, detail in rows:
+                depth[node_id] = depth.get(parent_id, 0) + 1
+                lines.append("  " * (depth[node_id] - 1) + detail)
+            return lines
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+
+    def snapshot(self):
+        """Per-fingerprint summary dicts, slowest total time first"""
+        with self.lock:
+            items = [(key, stats, sorted(stats.durations)) for key, stats in self.stats.items()]
+            result = []
+            for key, stats, durations in items:
+                result.append({
+                    "query": key,
+                    "count": stats.count,
+                    "total_ms": round(stats.total * 1000, 3),
+                    "mean_ms": round(stats.total * 1000 / stats.count, 3),
+                    "p50_ms": round(_percentile(durations, 0.50) * 1000, 3),
+                    "p95_ms": round(_percentile(durations, 0.95) * 1000, 3),
+                    "max_ms": round(stats.max * 1000, 3),
+                    "rows": stats.rows,
+                    "slow": stats.slow_count,
+                    "plan": list(stats.plan) if stats.plan else None,
+                    "last_seen": datetime.fromtimestamp(stats.last_seen).strftime('%Y-%m-%d %H:%M:%S'),
+                })
+        result.sort(key=lambda row: row["total_ms"], reverse=True)
+        return result
+
+    def top(self, n=20, by="total_ms"):
+        return sorted(self.snapshot(), key=lambda row: row[by], reverse=True)[:n]
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+            self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def to_dict(self):
+        return {
+            "since": self.started_at,
+            "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "slow_query_ms": self.slow_query_ms,
+            "queries": self.snapshot(),
+        }
+
+
+tracer = QueryTracer()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement to the tracer once it is drained.
+
+    SQLite does most of a SELECT's work while rows are fetched, so the time
+    spent in fetch calls is added to the statement that produced the rows.
+    The statement is recorded when its rows run out, when the cursor runs
+    another statement, or when it is closed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = None  # [sql, params, seconds, rows]
+
+    def _flush(self):
+        pending, self._pending = self._pending, None
+        if pending:
+            tracer.record(pending[0], pending[2], pending[3], self.connection, pending[1])
+
+    def _traced(self, method, sql, params):
+        self._flush()
+        started = time.perf_counter()
+        try:
+            return method(sql, params)
+        finally:
+            self._pending = [sql, params, time.perf_counter() - started, 0]
+            if self.description is None:  # no result set to fetch
+                self._flush()
+
+    def execute(self, sql, params=()):
+        return self._traced(super().execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        # Parameters are consumed by then, so executemany is never EXPLAINed
+        self._flush()
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            tracer.record(sql, time.perf_counter() - started, 0)
+
+    def _fetched(self, started, rows, exhausted):
+        if self._pending:
+            self._pending[2] += time.perf_counter() - started
+            self._pending[3] += rows
+            if exhausted:
+                self._flush()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        size = self.arraysize if size is None else size
+        rows = super().fetchmany(size)
+        self._fetched(started, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._flush()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._flush()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are traced"""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts bypass Cursor.execute, so route them through a traced cursor
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+def connect(database, **kwargs):
+    """sqlite3.connect() returning a traced connection unless tracing is disabled"""
+    if ENABLED:
+        kwargs.setdefault("factory", TracedConnection)
+    return sqlite3.connect(database, **kwargs)
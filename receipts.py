@@ -0,0 +1,48 @@
+"""Receipt and statement text formatting.
+
+Kept free of database and Streamlit imports so batch workers can use it.
+"""
+
+
+def format_currency(amount, currency="GHS"):
+    return f"{currency} {amount:,.2f}"
+
+class ReceiptGenerator:
+    @staticmethod
+    def generate_receipt(transaction_data, account):
+        receipt = f"""
+        ╔══════════════════════════════════╗
+        ║        SMARTBANK RECEIPT         ║
+        ╠══════════════════════════════════╣
+        ║ Date: {transaction_data[3]:<25}║
+        ║ Transaction: {transaction_data[0]:<16}║
+        ║ Account: {account.account_number:<20}║
+        ║ Name: {account.name:<23}║
+        ╠══════════════════════════════════╣
+        ║ Amount: {format_currency(abs(transaction_data[1])):<21}║
+        ║ Reference: {transaction_data[4]:<17}║
+        ╠══════════════════════════════════╣
+        ║ Description:                     ║
+        ║ {transaction_data[2]:<30}║
+        ╚══════════════════════════════════╝
+        """
+        return receipt
+
+    @staticmethod
+    def generate_statement_header(account, start_date, end_date, opening_balance,
+                                  closing_balance, transaction_count):
+        header = f"""
+        ╔══════════════════════════════════╗
+        ║       SMARTBANK STATEMENT        ║
+        ╠══════════════════════════════════╣
+        ║ Account: {account.account_number:<24}║
+        ║ Name: {account.name[:27]:<27}║
+        ║ From: {start_date:<27}║
+        ║ To: {end_date:<29}║
+        ╠══════════════════════════════════╣
+        ║ Opening: {format_currency(opening_balance):<24}║
+        ║ Closing: {format_currency(closing_balance):<24}║
+        ║ Transactions: {transaction_count:<19}║
+        ╚══════════════════════════════════╝
+        """
+        return header
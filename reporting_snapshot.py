@@ -0,0 +1,133 @@
+"""Read-only reporting copy of bank.db for the admin analytics.
+
+A daemon thread copies bank.db with the SQLite online backup API every
+``REFRESH_SECONDS``, ``PAGES_PER_STEP`` pages at a time with a short sleep
+between steps, so a customer's write waits for at most one step instead of
+for a whole analytics query. The copy goes to a temporary file that is then
+renamed over the snapshot: connections opened before the rename keep
+reading the old snapshot, new ones see the new one. The time the copy was
+taken is stored in the snapshot's ``snapshot_info`` table.
+
+    WIREBUDDY_REPORT_DB         snapshot path (default bank_report.db)
+    WIREBUDDY_REPORT_REFRESH    seconds between refreshes (default 300)
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import metrics_exporter
+import query_tracing
+from db_backup import PAGES_PER_STEP, STEP_SLEEP, copy_database
+
+
+SOURCE_DB = "bank.db"
+SNAPSHOT_DB = os.environ.get("WIREBUDDY_REPORT_DB", "bank_report.db")
+REFRESH_SECONDS = float(os.environ.get("WIREBUDDY_REPORT_REFRESH", "300"))
+
+
+class ReportingSnapshot:
+    def __init__(self, source=SOURCE_DB, path=SNAPSHOT_DB, refresh_seconds=REFRESH_SECONDS,
+                 pages=PAGES_PER_STEP, step_sleep=STEP_SLEEP):
+        self.source = source
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.pages = pages
+        self.step_sleep = step_sleep
+        self.taken_at = None      # '%Y-%m-%d %H:%M:%S' of the current snapshot
+        self.taken = None         # time.time() of the current snapshot
+        self.generation = 0       # bumped on every refresh, so readers know to reconnect
+        self.last_duration = None
+        self.last_error = None
+        self.lock = threading.Lock()
+        self._thread = None
+        self._wake = threading.Event()
+        self._requested = False
+        self._load_existing()
+
+    def _load_existing(self):
+        """Pick up a snapshot left by a previous process"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            try:
+                taken_at = conn.execute("SELECT taken_at FROM snapshot_info").fetchone()[0]
+            finally:
+                conn.close()
+            self.taken_at = taken_at
+            self.taken = datetime.strptime(taken_at, '%Y-%m-%d %H:%M:%S').timestamp()
+        except Exception as e:
+            print(f"Ignoring unreadable reporting snapshot {self.path}: {e}")
+
+    def refresh(self):
+        """Copy the live database into a new snapshot; returns the seconds it took"""
+        with self.lock:
+            started = time.perf_counter()
+            taken_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            tmp_path = f"{self.path}.tmp"
+            source = sqlite3.connect(f"file:{self.source}?mode=ro", uri=True, timeout=30)
+            dest = sqlite3.connect(tmp_path)
+            try:
+                copy_database(source, dest, self.pages, self.step_sleep)
+                dest.execute("CREATE TABLE IF NOT EXISTS snapshot_info (taken_at TEXT)")
+                dest.execute("DELETE FROM snapshot_info")
+                dest.execute("INSERT INTO snapshot_info VALUES (?)", (taken_at,))
+                dest.commit()
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            finally:
+                dest.close()
+                source.close()
+            os.replace(tmp_path, self.path)
+            self.taken_at = taken_at
+            self.taken = time.time()
+            self.generation += 1
+            self.last_duration = time.perf_counter() - started
+            self.last_error = None
+            return self.last_duration
+
+    def age_seconds(self):
+        return None if self.taken is None else time.time() - self.taken
+
+    def _run(self):
+        while True:
+            age = self.age_seconds()
+            if self._requested or age is None or age >= self.refresh_seconds:
+                self._requested = False
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Reporting snapshot refresh failed: {e}")
+            self._wake.wait(max(1.0, self.refresh_seconds - (self.age_seconds() or 0)))
+            self._wake.clear()
+
+    def start(self):
+        """Take a snapshot now if there is none, then keep refreshing on a daemon thread"""
+        if self._thread is not None:
+            return
+        with self.lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="reporting-snapshot", daemon=True)
+        if self.taken is None:
+            self.refresh()
+        self._thread.start()
+
+    def request_refresh(self):
+        """Ask the refresh thread for a new snapshot without waiting for it"""
+        self._requested = True
+        self._wake.set()
+
+    def connect(self):
+        """Read-only connection to the current snapshot"""
+        return query_tracing.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+
+snapshot = ReportingSnapshot()
+
+metrics_exporter.GaugeFunction("wirebuddy_report_snapshot_age_seconds",
+                               "Age of the reporting snapshot read by the admin analytics",
+                               snapshot.age_seconds)
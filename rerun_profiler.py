@@ -0,0 +1,243 @@
+"""Opt-in sampling profiler for app.py reruns.
+
+When an admin switches profiling on, ``begin()`` at the top of app.py starts
+a sampler thread that reads the script thread's stack every
+``SAMPLE_INTERVAL`` seconds with ``sys._current_frames()``. ``mark(name)``
+labels the page section the script is in, so samples can be attributed to
+sections as well as to the backend and Streamlit calls under them. The
+profile ends at ``end()`` or, if the script stopped early (``st.rerun()``,
+``st.stop()``, an exception), as soon as the sampler sees that app.py's
+module frame has left the stack.
+
+The sampler competes with the script for the GIL, so samples arrive less
+regularly than the interval asks for; each one is weighted by the time
+since the previous sample rather than assumed to be one interval long.
+
+The last ``MAX_PROFILES`` profiles are kept in memory and can be exported
+as ``.pstats`` (loadable by pstats/snakeviz) or as collapsed stacks for
+flamegraph.pl and speedscope, weighted in microseconds.
+"""
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+SAMPLE_INTERVAL = 0.002   # seconds
+MAX_PROFILES = 20
+MAX_STACKS = 5000         # distinct stacks kept per profile; the rest are counted as "(truncated)"
+MAX_DEPTH = 64
+APP_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "app.py"))
+# Page scripts run from app.py and count as app code, not as calls out of it
+APP_FILES = (APP_FILE, os.path.join(os.path.dirname(APP_FILE), "views", ""))
+# Decorator frames that would otherwise hide which st.* call was running
+WRAPPER_FILES = (os.path.join("streamlit", "runtime", "metrics_util.py"),)
+
+
+def _frame_key(code):
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _frame_label(key):
+    filename, lineno, name = key
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+class RerunProfile:
+    """Samples and section timings for one script run"""
+
+    def __init__(self, thread_id, module_frame, page, user, session_id):
+        self.thread_id = thread_id
+        self.module_frame = module_frame
+        self.page = page
+        self.user = user
+        self.session_id = session_id
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.started = time.perf_counter()
+        self.finished = None
+        self.section = "startup"
+        self.sections = [("startup", self.started)]
+        self.stacks = {}          # (section, frame key, ...) root first -> [samples, seconds]
+        self.samples = 0
+        self.truncated = 0       # samples folded into a "(truncated)" stack
+        self.done = threading.Event()
+
+    @property
+    def wall_ms(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def mark(self, name):
+        self.section = name
+        self.sections.append((name, time.perf_counter()))
+
+    def sample(self, frame, seconds):
+        """Record the stack below app.py's module frame; False once the script has finished"""
+        keys = []
+        while frame is not None and frame is not self.module_frame:
+            keys.append(_frame_key(frame.f_code))
+            frame = frame.f_back
+        if frame is None:
+            return False
+        keys.append(("<app>", 0, "app.py"))
+        keys.reverse()
+        stack = (self.section,) + tuple(keys[:MAX_DEPTH])
+        entry = self.stacks.get(stack)
+        if entry is None and len(self.stacks) >= MAX_STACKS:
+            stack = (self.section, keys[0], ("(truncated)", 0, "(truncated)"))
+            entry = self.stacks.get(stack)
+            self.truncated += 1
+        if entry is None:
+            entry = self.stacks[stack] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+        self.samples += 1
+        return True
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+            self.module_frame = None  # do not keep the script's globals alive
+            self.done.set()
+
+    def section_times(self):
+        """[(section, wall ms, sampled ms, samples)] in the order the sections ran"""
+        sampled = {}
+        for stack, (count, seconds) in self.stacks.items():
+            total = sampled.setdefault(stack[0], [0, 0.0])
+            total[0] += count
+            total[1] += seconds
+        end = self.finished or time.perf_counter()
+        rows = []
+        for i, (name, started) in enumerate(self.sections):
+            stopped = self.sections[i + 1][1] if i + 1 < len(self.sections) else end
+            count, seconds = sampled.get(name, (0, 0.0))
+            rows.append((name, round((stopped - started) * 1000, 2), round(seconds * 1000, 2), count))
+        return rows
+
+    def outside_calls(self, limit=15):
+        """[(call, sampled ms, samples)] per outermost call from app.py or a page into other modules"""
+        totals = {}
+        for stack, (count, seconds) in self.stacks.items():
+            for key in stack[2:]:
+                if not key[0].startswith(APP_FILES) and not key[0].endswith(WRAPPER_FILES):
+                    total = totals.setdefault(_frame_label(key), [0.0, 0])
+                    total[0] += seconds
+                    total[1] += count
+                    break
+        rows = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        return [(label, round(seconds * 1000, 2), count) for label, (seconds, count) in rows]
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack format, 'frame;frame;... microseconds' per line"""
+        lines = []
+        for stack, (_, seconds) in sorted(self.stacks.items(), key=lambda item: item[1][1], reverse=True):
+            section, keys = stack[0], stack[1:]
+            frames = [f"app.py [{section}]"] + [_frame_label(key) for key in keys[1:]]
+            lines.append(";".join(frame.replace(";", ",") for frame in frames) + f" {max(1, round(seconds * 1e6))}")
+        return "\n".join(lines) + "\n"
+
+    def pstats_bytes(self):
+        """Samples converted into the marshalled dict that pstats.Stats loads.
+
+        A sample's time counts as own time for its leaf frame and, once per
+        stack, as cumulative time for every frame on it; call counts are the
+        number of samples a frame appeared in.
+        """
+        stats = {}
+        for stack, (count, seconds) in self.stacks.items():
+            keys = [("<app>", 0, f"app.py [{stack[0]}]")] + list(stack[2:])
+            seen = set()
+            for depth, key in enumerate(keys):
+                cc, nc, tt, ct, callers = stats.get(key, (0, 0, 0.0, 0.0, {}))
+                if key not in seen:
+                    ct += seconds
+                    nc += count
+                    cc += count
+                    seen.add(key)
+                if depth == len(keys) - 1:
+                    tt += seconds
+                if depth:
+                    caller = keys[depth - 1]
+                    c_cc, c_nc, c_tt, c_ct = callers.get(caller, (0, 0, 0.0, 0.0))
+                    callers[caller] = (c_cc + count, c_nc + count,
+                                       c_tt + (seconds if depth == len(keys) - 1 else 0.0),
+                                       c_ct + seconds)
+                stats[key] = (cc, nc, tt, ct, callers)
+        return marshal.dumps(stats)
+
+    def summary(self):
+        return {
+            "started_at": self.started_at,
+            "page": self.page,
+            "user": self.user,
+            "wall_ms": round(self.wall_ms, 1),
+            "samples": self.samples,
+            "sections": len(self.sections),
+        }
+
+
+class RerunProfiler:
+    def __init__(self, max_profiles=MAX_PROFILES, interval=SAMPLE_INTERVAL):
+        self.enabled = False
+        self.session_ids = None   # None profiles every session
+        self.interval = interval
+        self.profiles = deque(maxlen=max_profiles)
+        self.lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, session_ids=None):
+        self.session_ids = set(session_ids) if session_ids else None
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def current(self):
+        return getattr(self._local, "profile", None)
+
+    def begin(self, page=None, user=None, session_id=None):
+        """Start profiling the calling script run if profiling is on for this session"""
+        self.end()
+        if not self.enabled or (self.session_ids is not None and session_id not in self.session_ids):
+            return None
+        profile = RerunProfile(threading.get_ident(), sys._getframe(1), page, user, session_id)
+        self._local.profile = profile
+        threading.Thread(target=self._sample, args=(profile,), name="rerun-profiler", daemon=True).start()
+        with self.lock:
+            self.profiles.append(profile)
+        return profile
+
+    def mark(self, name):
+        profile = getattr(self._local, "profile", None)
+        if profile is not None:
+            profile.mark(name)
+
+    def end(self):
+        profile = getattr(self._local, "profile", None)
+        if profile is not None:
+            self._local.profile = None
+            profile.finish()
+
+    def _sample(self, profile):
+        last = profile.started
+        while not profile.done.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(profile.thread_id)
+            if frame is None or not profile.sample(frame, now - last):
+                profile.finish()
+            last = now
+
+    def recent(self):
+        with self.lock:
+            return list(reversed(self.profiles))
+
+    def clear(self):
+        with self.lock:
+            self.profiles.clear()
+
+
+profiler = RerunProfiler()
@@ -0,0 +1,205 @@
+"""Month-end statement batch job for every customer account.
+
+Accounts are split into shards and rendered in a process pool; each worker
+holds its own read-only SQLite connection. Completed statements are
+journalled to manifest.jsonl as shards finish, so a crashed run picks up
+where it stopped when started again with the same arguments.
+
+    python statement_batch.py --month 2026-09 --workers 8
+"""
+import argparse
+import calendar
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from cold_archive import ARCHIVE_DIR, ColdArchive
+from statements import Statement, write_statement_csv, write_statement_pdf, write_statement_text
+
+
+WRITERS = {
+    "txt": write_statement_text,
+    "csv": write_statement_csv,
+    "pdf": write_statement_pdf,
+}
+
+# Per-process read-only connection and archive reader, set up by _init_worker
+worker_conn = None
+worker_archive = None
+
+
+class _HashingWriter:
+    """File wrapper that hashes bytes as they are written"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.sha256.update(data)
+        return self.fileobj.write(data)
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+def _init_worker(db_path, archive_dir):
+    global worker_conn, worker_archive
+    worker_conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    worker_archive = ColdArchive(db_path, archive_dir)
+
+
+def _render_shard(account_numbers, start_date, end_date, out_dir, fmt):
+    """Render one shard of statements; returns a manifest entry per account"""
+    writer = WRITERS[fmt]
+    entries = []
+    for account_number in account_numbers:
+        statement = Statement(worker_conn, account_number, start_date, end_date, archive=worker_archive)
+        file_name = f"{account_number}.{fmt}"
+        final_path = os.path.join(out_dir, file_name)
+        tmp_path = final_path + ".tmp"
+
+        # Write under a temporary name so a crash never leaves a partial statement
+        with open(tmp_path, "wb") as f:
+            out = _HashingWriter(f)
+            size = writer(statement, out)
+        os.replace(tmp_path, final_path)
+
+        entries.append({
+            "account_number": account_number,
+            "file": file_name,
+            "bytes": size,
+            "sha256": out.hexdigest(),
+            "opening_balance": round(statement.opening_balance, 2),
+            "closing_balance": round(statement.closing_balance, 2),
+            "transactions": statement.transaction_count,
+        })
+    return entries
+
+
+def month_range(month):
+    year, month_number = (int(part) for part in month.split("-"))
+    last_day = calendar.monthrange(year, month_number)[1]
+    return f"{year:04d}-{month_number:02d}-01", f"{year:04d}-{month_number:02d}-{last_day:02d}"
+
+
+def load_journal(journal_path):
+    """Return {account_number: entry} for statements finished by earlier runs"""
+    done = {}
+    if os.path.exists(journal_path):
+        with open(journal_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from a crash
+                done[entry["account_number"]] = entry
+    return done
+
+
+def run_batch(db_path, month, out_root="statements", workers=None, shard_size=200, fmt="txt",
+              archive_dir=ARCHIVE_DIR):
+    start_date, end_date = month_range(month)
+    out_dir = os.path.join(out_root, month)
+    os.makedirs(out_dir, exist_ok=True)
+    journal_path = os.path.join(out_dir, "manifest.jsonl")
+
+    # Partial files from a crashed run are never in the journal; drop them
+    for name in os.listdir(out_dir):
+        if name.endswith(".tmp"):
+            os.remove(os.path.join(out_dir, name))
+
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    account_numbers = [row[0] for row in conn.execute(
+        "SELECT account_number FROM accounts WHERE is_admin = 0 ORDER BY account_number"
+    )]
+    conn.close()
+
+    done = load_journal(journal_path)
+    pending = [acc for acc in account_numbers
+               if acc not in done or not os.path.exists(os.path.join(out_dir, done[acc]["file"]))]
+    shards = [pending[i:i + shard_size] for i in range(0, len(pending), shard_size)]
+    print(f"{len(account_numbers)} accounts, {len(done)} already done, "
+          f"{len(pending)} pending in {len(shards)} shards")
+
+    started = time.perf_counter()
+    completed = 0
+    with open(journal_path, "a") as journal, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(db_path, archive_dir)) as pool:
+        futures = [pool.submit(_render_shard, shard, start_date, end_date, out_dir, fmt)
+                   for shard in shards]
+        failed = 0
+        for shard_number, future in enumerate(as_completed(futures), start=1):
+            try:
+                entries = future.result()
+            except Exception as e:
+                # Leave the shard out of the journal; the next run retries it
+                failed += 1
+                print(f"[{shard_number}/{len(shards)} shards] shard failed: {e}", flush=True)
+                continue
+            for entry in entries:
+                journal.write(json.dumps(entry) + "\n")
+                done[entry["account_number"]] = entry
+            journal.flush()
+            os.fsync(journal.fileno())
+
+            completed += len(entries)
+            elapsed = time.perf_counter() - started
+            rate = completed / elapsed * 60 if elapsed else 0
+            remaining = (len(pending) - completed) / (completed / elapsed) if completed else 0
+            print(f"[{shard_number}/{len(shards)} shards] {completed}/{len(pending)} statements, "
+                  f"{rate:,.0f}/min, ETA {remaining:.0f}s", flush=True)
+
+    elapsed = time.perf_counter() - started
+    manifest = {
+        "month": month,
+        "period": {"start": start_date, "end": end_date},
+        "format": fmt,
+        "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "database": os.path.abspath(db_path),
+        "statement_count": len(done),
+        "complete": len(done) == len(account_numbers),
+        "run_seconds": round(elapsed, 2),
+        "statements_per_minute": round(completed / elapsed * 60) if elapsed and completed else None,
+        "statements": [done[acc] for acc in account_numbers if acc in done],
+    }
+    with open(os.path.join(out_dir, "manifest.json.tmp"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(os.path.join(out_dir, "manifest.json.tmp"), os.path.join(out_dir, "manifest.json"))
+    print(f"Wrote {len(done)} statements to {out_dir} in {elapsed:.1f}s")
+    if failed:
+        print(f"{failed} shards failed; run again with the same arguments to resume")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate month-end statements for all accounts")
+    parser.add_argument("--month", help="statement month as YYYY-MM (default: last month)")
+    parser.add_argument("--db", default="bank.db")
+    parser.add_argument("--out", default="statements", help="root output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=200, help="accounts per shard")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="txt")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR, help="Parquet archive of old transactions")
+    args = parser.parse_args()
+
+    month = args.month
+    if not month:
+        today = datetime.now()
+        year, month_number = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+        month = f"{year:04d}-{month_number:02d}"
+
+    try:
+        month_range(month)
+    except ValueError:
+        sys.exit(f"Invalid --month {month!r}, expected YYYY-MM")
+    run_batch(args.db, month, args.out, args.workers, args.shard_size, args.format, args.archive_dir)
+
+
+if __name__ == "__main__":
+    main()
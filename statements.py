@@ -0,0 +1,277 @@
+"""Account statements for arbitrary date ranges, exported as CSV, PDF or text.
+
+Rows are streamed from SQLite with ``fetchmany`` and written out as they
+arrive, so memory use stays flat however long the statement is. Periods
+reaching into the Parquet archive (cold_archive.py) merge the archived
+rows of those months in by time.
+"""
+import csv
+import heapq
+import io
+from datetime import datetime
+from types import SimpleNamespace
+
+import cold_archive
+from cold_archive import SIGNED_AMOUNT_SQL, signed_amount
+from receipts import ReceiptGenerator
+
+
+CHUNK_SIZE = 5000
+
+COLUMNS = ["Date", "Type", "Description", "Reference", "Amount", "Balance"]
+
+
+class Statement:
+    """Opening/closing balances plus a row stream for one account and period"""
+
+    def __init__(self, conn, account_number, start_date, end_date, chunk_size=CHUNK_SIZE, archive=None):
+        self.conn = conn
+        self.archive = archive or cold_archive.archive
+        self.account_number = account_number
+        self.start_date = start_date
+        self.end_date = end_date
+        self.start = f"{start_date} 00:00:00"
+        self.end = f"{end_date} 23:59:59"
+        self.chunk_size = chunk_size
+
+        row = conn.execute(
+            "SELECT name, balance FROM accounts WHERE account_number=?",
+            (account_number,)
+        ).fetchone()
+        if not row:
+            raise ValueError(f"Account {account_number} not found")
+        self.account_name, current_balance = row
+
+        # Work back from the current balance: everything since the start of
+        # the period has already been applied to it.
+        since_start, in_period, count = conn.execute(f"""
+            SELECT COALESCE(SUM({SIGNED_AMOUNT_SQL}), 0),
+                   COALESCE(SUM(CASE WHEN timestamp <= ? THEN {SIGNED_AMOUNT_SQL} END), 0),
+                   COUNT(CASE WHEN timestamp <= ? THEN 1 END)
+            FROM transactions
+            WHERE account_number=? AND timestamp >= ?
+        """, (self.end, self.end, account_number, self.start)).fetchone()
+        archived = self.archive.period_totals(conn.cursor(), account_number, self.start, self.end)
+        since_start += archived[0]
+        in_period += archived[1]
+        count += archived[2]
+
+        self.opening_balance = current_balance - since_start
+        self.closing_balance = self.opening_balance + in_period
+        self.transaction_count = count
+
+    def _hot_rows(self):
+        cur = self.conn.cursor()
+        cur.execute(f"""
+            SELECT timestamp, id, type, description, reference_id, {SIGNED_AMOUNT_SQL}
+            FROM transactions
+            WHERE account_number=? AND timestamp BETWEEN ? AND ?
+            ORDER BY timestamp, id
+        """, (self.account_number, self.start, self.end))
+        try:
+            while True:
+                chunk = cur.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                yield from chunk
+        finally:
+            cur.close()
+
+    def _archived_rows(self):
+        for txn_id, txn_type, amount, description, timestamp, reference_id in self.archive.period_rows(
+                self.conn.cursor(), self.account_number, self.start, self.end):
+            yield timestamp, txn_id, txn_type, description, reference_id, signed_amount(txn_type, amount)
+
+    def rows(self):
+        """Yield (timestamp, type, description, reference, amount, balance) oldest first"""
+        balance = self.opening_balance
+        for timestamp, _, txn_type, description, reference_id, amount in heapq.merge(
+                self._archived_rows(), self._hot_rows()):
+            balance += amount
+            yield timestamp, txn_type, description or "", reference_id or "", amount, balance
+
+    def summary_lines(self):
+        return [
+            f"Account: {self.account_number} ({self.account_name})",
+            f"Period: {self.start_date} to {self.end_date}",
+            f"Opening balance: GHS {self.opening_balance:,.2f}",
+            f"Closing balance: GHS {self.closing_balance:,.2f}",
+            f"Transactions: {self.transaction_count}",
+        ]
+
+
+def _format_row(timestamp, txn_type, description, reference_id, amount, balance):
+    """Fixed-width statement line shared by the text and PDF writers"""
+    amount = f"{amount:,.2f}" if isinstance(amount, (int, float)) else (amount or "")
+    balance = f"{balance:,.2f}" if isinstance(balance, (int, float)) else (balance or "")
+    return (f"{timestamp:<19}  {txn_type[:20]:<20}  {description[:32]:<32}  "
+            f"{reference_id[:10]:<10}  {amount:>14}  {balance:>14}")
+
+
+def iter_statement_csv(statement, flush_rows=1000):
+    """Yield the statement as UTF-8 CSV in chunks of ``flush_rows`` rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data.encode("utf-8")
+
+    writer.writerow(["WireBuddy Account Statement"])
+    for line in statement.summary_lines():
+        writer.writerow([line])
+    writer.writerow([])
+    writer.writerow(COLUMNS)
+    writer.writerow([statement.start, "Opening Balance", "", "", "", f"{statement.opening_balance:.2f}"])
+
+    pending = 0
+    for timestamp, txn_type, description, reference_id, amount, balance in statement.rows():
+        writer.writerow([timestamp, txn_type, description, reference_id,
+                         f"{amount:.2f}", f"{balance:.2f}"])
+        pending += 1
+        if pending >= flush_rows:
+            yield drain()
+            pending = 0
+
+    writer.writerow([statement.end, "Closing Balance", "", "", "", f"{statement.closing_balance:.2f}"])
+    yield drain()
+
+
+def write_statement_csv(statement, fileobj):
+    """Write the CSV statement to a binary file object; returns bytes written"""
+    written = 0
+    for chunk in iter_statement_csv(statement):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def write_statement_text(statement, fileobj, flush_rows=1000):
+    """Write a plain-text statement with the receipt-style header box"""
+    account = SimpleNamespace(account_number=statement.account_number, name=statement.account_name)
+    header = ReceiptGenerator.generate_statement_header(
+        account, statement.start_date, statement.end_date,
+        statement.opening_balance, statement.closing_balance, statement.transaction_count
+    )
+    lines = [header, "", _format_row(*COLUMNS)]
+    written = 0
+    for row in statement.rows():
+        lines.append(_format_row(*row))
+        if len(lines) >= flush_rows:
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            fileobj.write(data)
+            written += len(data)
+            lines = []
+    data = ("\n".join(lines) + "\n").encode("utf-8")
+    fileobj.write(data)
+    return written + len(data)
+
+
+class PdfStreamWriter:
+    """Minimal text-only PDF writer that emits each page as soon as it is full.
+
+    Only object offsets and page ids are kept in memory until the page tree,
+    cross-reference table and trailer are written by close().
+    """
+    PAGE_WIDTH = 842     # A4 landscape, in points
+    PAGE_HEIGHT = 595
+    MARGIN = 36
+    FONT_SIZE = 8
+    LEADING = 10
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 4  # 1: catalog, 2: page tree, 3: font
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier "
+                              b"/Encoding /WinAnsiEncoding >>")
+
+    @property
+    def lines_per_page(self):
+        return (self.PAGE_HEIGHT - 2 * self.MARGIN) // self.LEADING
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self.position += len(data)
+
+    def _write_object(self, object_id, body):
+        self.offsets[object_id] = self.position
+        self._write(f"{object_id} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+
+    def _allocate(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    @staticmethod
+    def _escape(text):
+        text = text.encode("cp1252", "replace").decode("cp1252")
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    def add_page(self, lines):
+        top = self.PAGE_HEIGHT - self.MARGIN
+        parts = [f"BT /F1 {self.FONT_SIZE} Tf {self.LEADING} TL {self.MARGIN} {top} Td"]
+        for line in lines:
+            parts.append(f"({self._escape(line)}) Tj T*")
+        parts.append("ET")
+        content = "\n".join(parts).encode("cp1252")
+
+        content_id = self._allocate()
+        page_id = self._allocate()
+        self._write_object(content_id, b"<< /Length %d >>\nstream\n" % len(content)
+                           + content + b"\nendstream")
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.PAGE_WIDTH} {self.PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii"))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode("ascii"))
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_position = self.position
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        for object_id in range(1, self.next_id):
+            lines.append(f"{self.offsets[object_id]:010d} 00000 n \n")
+        self._write("".join(lines).encode("ascii"))
+        self._write((
+            f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\n"
+            f"startxref\n{xref_position}\n%%EOF\n"
+        ).encode("ascii"))
+        return self.position
+
+
+def write_statement_pdf(statement, fileobj):
+    """Write the PDF statement to a binary file object; returns bytes written"""
+    pdf = PdfStreamWriter(fileobj)
+    per_page = pdf.lines_per_page
+    header = _format_row(*COLUMNS)
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def page_heading(page_number):
+        return [f"WireBuddy Account Statement - {statement.account_number} - "
+                f"page {page_number} - generated {generated}", "", header, "-" * len(header)]
+
+    lines = ["WireBuddy Account Statement", ""] + statement.summary_lines() + ["", header, "-" * len(header)]
+    lines.append(_format_row(statement.start, "Opening Balance", "", "", None, statement.opening_balance))
+    for row in statement.rows():
+        if len(lines) >= per_page:
+            pdf.add_page(lines)
+            lines = page_heading(len(pdf.page_ids) + 1)
+        lines.append(_format_row(*row))
+
+    closing = ["-" * len(header),
+               _format_row(statement.end, "Closing Balance", "", "", None, statement.closing_balance)]
+    if len(lines) + len(closing) > per_page:
+        pdf.add_page(lines)
+        lines = page_heading(len(pdf.page_ids) + 1)
+    pdf.add_page(lines + closing)
+    return pdf.close()
@@ -0,0 +1,404 @@
+"""Money-flow graph between accounts, for mule and ring detection.
+
+Every transfer is an edge from the sender to the recipient. The edges of the
+last ``WIREBUDDY_GRAPH_WINDOW_DAYS`` days are kept in NumPy arrays, and two
+sparse (scipy CSR) account x account matrices hold, per pair of accounts,
+the number of transfers and the amount sent in pesewas. ``record`` appends a
+transfer as send_money commits it; ``refresh`` adds the new edges to the
+matrices and subtracts those that have left the window, so the matrices are
+never rebuilt from scratch. Amounts are whole pesewas so that subtracting
+an expired edge leaves exactly zero.
+
+``analyze`` works out per account:
+
+    fan_in / fan_out   distinct senders / recipients in the window
+    scc_size           size of its strongly connected component; money can
+                       go round in circles only inside one
+    pass_through       money sent on within
+                       ``WIREBUDDY_GRAPH_PASS_THROUGH_HOURS`` of arriving, as
+                       a share of the larger of its inflow and outflow (an
+                       account spending an older balance scores low)
+    cycles             2- and 3-account cycles through it, inside its
+                       component; only counted for accounts whose
+                       pass-through could reach the flag score
+
+and combines them into a 0-1 risk score: money passing straight through an
+account that either gathers from or spreads to many accounts (a mule) or
+is part of a ring (on a short cycle, or in a component of at most
+RING_SIZE accounts),
+
+    pass_through * max(min(1, max(fan_in, fan_out) / FAN_THRESHOLD),
+                       1 if ring else 0)
+
+Accounts scoring at least ``WIREBUDDY_GRAPH_FLAG_SCORE`` with at least
+``WIREBUDDY_GRAPH_MIN_FLOW`` GHS received are flagged for review: their
+latest transfer out in the window goes into flagged_transactions, unless
+the account already has a pending flag. The scan runs every
+``WIREBUDDY_GRAPH_INTERVAL`` seconds (0 disables), or with
+``python transfer_graph.py scan``.
+"""
+import argparse
+import calendar
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+import metrics_exporter
+
+DB_PATH = "bank.db"
+WINDOW_DAYS = float(os.environ.get("WIREBUDDY_GRAPH_WINDOW_DAYS", "7"))
+GRAPH_INTERVAL = float(os.environ.get("WIREBUDDY_GRAPH_INTERVAL", "900"))
+PASS_THROUGH_HOURS = float(os.environ.get("WIREBUDDY_GRAPH_PASS_THROUGH_HOURS", "24"))
+FLAG_SCORE = float(os.environ.get("WIREBUDDY_GRAPH_FLAG_SCORE", "0.7"))
+MIN_FLOW = float(os.environ.get("WIREBUDDY_GRAPH_MIN_FLOW", "1000"))
+FAN_THRESHOLD = 10  # distinct counterparties at which the fan term is full
+RING_SIZE = 6       # strongly connected components up to this size count as rings
+HUB_DEGREE = 100    # counterparties above which an account is not followed when counting cycles
+LOCK_TIMEOUT = 30   # seconds the flag writer waits for the write lock
+
+EDGES_SQL = """
+    SELECT account_number, substr(description, 5), ABS(amount), timestamp
+    FROM transactions
+    WHERE type = 'Transfer Out' AND description LIKE 'To: %' AND timestamp >= ?
+    ORDER BY timestamp
+"""
+
+
+def _epoch(timestamp):
+    """Seconds of a ledger timestamp, read as UTC; only differences are used"""
+    return calendar.timegm(time.strptime(timestamp, '%Y-%m-%d %H:%M:%S'))
+
+
+def _epochs(timestamps):
+    return np.array(timestamps, dtype="datetime64[s]").astype(np.int64)
+
+
+class TransferGraph:
+    def __init__(self, db_path=DB_PATH, window_days=WINDOW_DAYS, interval=GRAPH_INTERVAL):
+        self.db_path = db_path
+        self.window_days = window_days
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.last_report = None
+        self.last_error = None
+        self._thread = None
+        self._reset()
+
+    def _reset(self):
+        self.accounts = []          # node id -> account number
+        self.ids = {}               # account number -> node id
+        self.src = np.empty(0, dtype=np.int64)
+        self.dst = np.empty(0, dtype=np.int64)
+        self.pesewas = np.empty(0, dtype=np.int64)
+        self.times = np.empty(0, dtype=np.int64)
+        self._pending = []          # (src, dst, pesewas, time) recorded since the last refresh
+        self.transfers = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.amounts = sparse.csr_matrix((0, 0), dtype=np.int64)
+
+    def _id(self, account_number):
+        node = self.ids.get(account_number)
+        if node is None:
+            node = self.ids[account_number] = len(self.accounts)
+            self.accounts.append(account_number)
+        return node
+
+    # ---------- Updates ----------
+    def record(self, account_number, counterparty, amount, timestamp):
+        """Add a committed transfer; it reaches the matrices at the next refresh"""
+        with self.lock:
+            self._pending.append((self._id(account_number), self._id(counterparty),
+                                  int(round(abs(amount) * 100)), _epoch(timestamp)))
+
+    def load(self, senders, recipients, amounts, timestamps):
+        """Replace the graph with these transfers (sequences of equal length)"""
+        with self.lock:
+            self._reset()
+            accounts, nodes = np.unique(np.concatenate([np.asarray(senders, dtype=object),
+                                                        np.asarray(recipients, dtype=object)]).astype(str),
+                                        return_inverse=True)
+            self.accounts = accounts.tolist()
+            self.ids = {account: i for i, account in enumerate(self.accounts)}
+            n_edges = len(senders)
+            self.src, self.dst = nodes[:n_edges].astype(np.int64), nodes[n_edges:].astype(np.int64)
+            self.pesewas = np.round(np.abs(np.asarray(amounts, dtype=np.float64)) * 100).astype(np.int64)
+            self.times = timestamps if isinstance(timestamps, np.ndarray) else _epochs(timestamps)
+            n = len(self.accounts)
+            self.transfers = self._matrix(self.src, self.dst, np.ones(n_edges, dtype=np.int64), n)
+            self.amounts = self._matrix(self.src, self.dst, self.pesewas, n)
+
+    def rebuild(self, conn, now=None):
+        """Reload the transfers of the window from the ledger; returns the number of edges"""
+        started = time.perf_counter()
+        now = now or datetime.now()
+        since = (now - timedelta(days=self.window_days)).strftime('%Y-%m-%d %H:%M:%S')
+        rows = conn.execute(EDGES_SQL, (since,)).fetchall()
+        senders, recipients, amounts, timestamps = zip(*rows) if rows else ((), (), (), ())
+        self.load(senders, recipients, amounts, timestamps)
+        print(f"Loaded {len(rows)} transfers between {len(self.accounts)} accounts "
+              f"into the transfer graph in {time.perf_counter() - started:.2f}s")
+        return len(rows)
+
+    @staticmethod
+    def _matrix(src, dst, values, n):
+        return sparse.coo_matrix((values, (src, dst)), shape=(n, n)).tocsr()
+
+    def _resize(self, matrix, n):
+        if matrix.shape[0] < n:
+            matrix.resize((n, n))
+        return matrix
+
+    def refresh(self, now=None):
+        """Add recorded transfers and drop those older than the window; returns (added, expired)"""
+        cutoff = calendar.timegm((now or datetime.now()).timetuple()) - int(self.window_days * 86400)
+        with self.lock:
+            pending, self._pending = self._pending, []
+            n = len(self.accounts)
+            if pending:
+                src, dst, pesewas, times = (np.array(column, dtype=np.int64) for column in zip(*pending))
+            else:
+                src = dst = pesewas = times = np.empty(0, dtype=np.int64)
+            expired = self.times < cutoff
+            fresh = times >= cutoff
+            src, dst, pesewas, times = src[fresh], dst[fresh], pesewas[fresh], times[fresh]
+
+            # one signed delta per matrix: +new transfers, -transfers that left the window
+            delta_src = np.concatenate([src, self.src[expired]])
+            delta_dst = np.concatenate([dst, self.dst[expired]])
+            sign = np.concatenate([np.ones(len(src), dtype=np.int64), -np.ones(int(expired.sum()), dtype=np.int64)])
+            self.transfers = self._resize(self.transfers, n) + self._matrix(delta_src, delta_dst, sign, n)
+            self.amounts = self._resize(self.amounts, n) + self._matrix(
+                delta_src, delta_dst, sign * np.concatenate([pesewas, self.pesewas[expired]]), n)
+            self.transfers.eliminate_zeros()
+            self.amounts.eliminate_zeros()
+
+            keep = ~expired
+            self.src = np.concatenate([self.src[keep], src])
+            self.dst = np.concatenate([self.dst[keep], dst])
+            self.pesewas = np.concatenate([self.pesewas[keep], pesewas])
+            self.times = np.concatenate([self.times[keep], times])
+            return len(src), int(expired.sum())
+
+    # ---------- Analysis ----------
+    def analyze(self, now=None, flag_score=FLAG_SCORE, min_flow=MIN_FLOW):
+        """Per-account graph features and risk scores, as a dict of arrays indexed by node id"""
+        timings = {}
+        started = time.perf_counter()
+        self.refresh(now)
+        with self.lock:
+            transfers, amounts = self.transfers, self.amounts
+            src, dst, pesewas, times = self.src, self.dst, self.pesewas, self.times
+            accounts = list(self.accounts)
+        n = len(accounts)
+        timings["refresh"] = time.perf_counter() - started
+
+        mark = time.perf_counter()
+        linked = transfers.copy()
+        linked.setdiag(0)
+        linked.eliminate_zeros()
+        linked.data = np.ones(len(linked.data), dtype=np.int64)
+        fan_out = np.diff(linked.indptr)
+        fan_in = np.bincount(linked.indices, minlength=n)
+        sent = np.asarray(amounts.sum(axis=1)).ravel() / 100
+        received = np.bincount(amounts.indices, weights=amounts.data, minlength=n) / 100
+        timings["degrees"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        n_components, labels = csgraph.connected_components(linked, directed=True, connection="strong")
+        scc_size = np.bincount(labels, minlength=n_components)[labels] if n else np.zeros(0, dtype=np.int64)
+        timings["components"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        pass_through = self._pass_through(src, dst, pesewas, times, np.maximum(sent, received) * 100, n)
+        timings["pass_through"] = time.perf_counter() - mark
+
+        # only accounts that pass enough money through can reach the flag score
+        mark = time.perf_counter()
+        candidates = np.flatnonzero((pass_through >= flag_score) & (received >= min_flow))
+        cycles = np.zeros(n, dtype=np.int64)
+        cycles[candidates] = self._short_cycles(linked, labels, scc_size, fan_in + fan_out, candidates)
+        timings["cycles"] = time.perf_counter() - mark
+
+        fan = np.minimum(1.0, np.maximum(fan_in, fan_out) / FAN_THRESHOLD)
+        ring = (cycles > 0) | ((scc_size > 1) & (scc_size <= RING_SIZE))
+        score = pass_through * np.maximum(fan, ring.astype(np.float64))
+        timings["total"] = time.perf_counter() - started
+        return {
+            "accounts": accounts, "fan_in": fan_in, "fan_out": fan_out, "sent": sent, "received": received,
+            "scc_size": scc_size, "components": n_components, "cycles": cycles,
+            "pass_through": pass_through, "score": score, "edges": len(src), "timings": timings,
+        }
+
+    @staticmethod
+    def _short_cycles(linked, labels, scc_size, degree, nodes):
+        """2- and 3-account cycles through each of nodes, inside its strongly connected component.
+
+        Cycles through a hub (more than HUB_DEGREE counterparties) are not counted:
+        following one would touch every account the hub deals with.
+        """
+        n = linked.shape[0]
+        rows = np.repeat(np.arange(n), np.diff(linked.indptr))
+        cols = linked.indices
+        inside = (labels[rows] == labels[cols]) & (scc_size[rows] > 1)
+        within = sparse.csr_matrix((linked.data[inside], (rows[inside], cols[inside])), shape=(n, n))
+        hubs = degree > HUB_DEGREE
+        via = within.copy()
+        via.data[hubs[np.repeat(np.arange(n), np.diff(via.indptr))]] = 0
+        via.eliminate_zeros()
+        start = within[nodes]
+        back = within.T.tocsr()[nodes]
+        two = np.asarray(start.multiply(back).sum(axis=1)).ravel()
+        start.data[hubs[start.indices]] = 0
+        start.eliminate_zeros()
+        three = np.asarray((start @ via).multiply(back).sum(axis=1)).ravel()
+        return two + three
+
+    @staticmethod
+    def _pass_through(src, dst, pesewas, times, flow, n):
+        """Money each account sent on within PASS_THROUGH_HOURS of arriving, as a share of flow (in pesewas)
+
+        A transfer out counts as passed through up to the money the account
+        received in the PASS_THROUGH_HOURS before it, so steady spending out of
+        an older balance does not.
+        """
+        if not len(src):
+            return np.zeros(n)
+        base = times.min()
+        window = int(PASS_THROUGH_HOURS * 3600)
+        span = int(times.max() - base) + window + 1
+        # transfers in, sorted by (recipient, time), with running totals per recipient
+        in_keys = dst * span + (times - base)
+        order = np.argsort(in_keys, kind="stable")
+        in_keys = in_keys[order]
+        running = np.concatenate([[0.0], np.cumsum(pesewas[order], dtype=np.float64)])
+        # money received by the sender in the window before each transfer out
+        out_keys = src * span + (times - base)
+        recent = (running[np.searchsorted(in_keys, out_keys, side="right")]
+                  - running[np.searchsorted(in_keys, out_keys - window, side="left")])
+        forwarded = np.bincount(src, weights=np.minimum(pesewas, recent), minlength=n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(flow > 0, np.minimum(forwarded, flow) / flow, 0.0)
+
+    def high_risk(self, results, flag_score=FLAG_SCORE, min_flow=MIN_FLOW):
+        """Node ids of accounts to flag, riskiest first"""
+        candidates = np.flatnonzero((results["score"] >= flag_score) & (results["received"] >= min_flow))
+        return candidates[np.argsort(-results["score"][candidates], kind="stable")]
+
+    # ---------- Flagging ----------
+    def scan(self, now=None, dry_run=False):
+        """Analyze the graph and flag high-risk accounts; returns a report of the run"""
+        now = now or datetime.now()
+        results = self.analyze(now)
+        risky = self.high_risk(results)
+        since = (now - timedelta(days=self.window_days)).strftime('%Y-%m-%d %H:%M:%S')
+        flagged = []
+        if not dry_run and len(risky):
+            conn = sqlite3.connect(self.db_path, timeout=LOCK_TIMEOUT)
+            try:
+                for node in risky:
+                    account_number = results["accounts"][node]
+                    if conn.execute("SELECT 1 FROM flagged_transactions WHERE account_number=? AND status='pending'",
+                                    (account_number,)).fetchone():
+                        continue
+                    latest = conn.execute("""
+                        SELECT reference_id FROM transactions
+                        WHERE account_number=? AND type='Transfer Out' AND timestamp >= ?
+                        ORDER BY timestamp DESC LIMIT 1
+                    """, (account_number, since)).fetchone()
+                    if latest is None or conn.execute("SELECT 1 FROM flagged_transactions WHERE transaction_ref=?",
+                                                      (latest[0],)).fetchone():
+                        continue
+                    conn.execute("""
+                        INSERT INTO flagged_transactions
+                        (transaction_ref, account_number, flagged_at, status)
+                        VALUES (?, ?, ?, 'pending')
+                    """, (latest[0], account_number, now.strftime('%Y-%m-%d %H:%M:%S')))
+                    flagged.append(account_number)
+                conn.commit()
+                if flagged:
+                    metrics_exporter.FRAUD_FLAGS.inc("transfer_graph", amount=len(flagged))
+            finally:
+                conn.close()
+        report = {
+            "at": now.strftime('%Y-%m-%d %H:%M:%S'),
+            "accounts": len(results["accounts"]),
+            "edges": results["edges"],
+            "components": results["components"],
+            "high_risk": [self._describe(results, node) for node in risky],
+            "flagged": flagged,
+            "seconds": {stage: round(seconds, 4) for stage, seconds in results["timings"].items()},
+        }
+        self.last_report = report
+        if flagged:
+            print(f"Transfer graph flagged {len(flagged)} accounts: {', '.join(flagged)}")
+        return report
+
+    @staticmethod
+    def _describe(results, node):
+        return {
+            "account": results["accounts"][node],
+            "score": round(float(results["score"][node]), 3),
+            "fan_in": int(results["fan_in"][node]),
+            "fan_out": int(results["fan_out"][node]),
+            "received": round(float(results["received"][node]), 2),
+            "sent": round(float(results["sent"][node]), 2),
+            "pass_through": round(float(results["pass_through"][node]), 3),
+            "scc_size": int(results["scc_size"][node]),
+            "cycles": int(results["cycles"][node]),
+        }
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.scan()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Transfer graph scan failed: {e}")
+
+    def start(self):
+        """Start the scheduled scans, unless disabled or already running"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="transfer-graph", daemon=True)
+        self._thread.start()
+
+
+graph = TransferGraph()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score accounts on the transfer graph and flag mules and rings")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--window-days", type=float, default=WINDOW_DAYS)
+    commands = parser.add_subparsers(dest="command", required=True)
+    scan = commands.add_parser("scan", help="build the graph from the ledger, score it and flag high-risk accounts")
+    scan.add_argument("--dry-run", action="store_true", help="report without writing flags")
+    scan.add_argument("--top", type=int, default=20, help="high-risk accounts to print")
+    args = parser.parse_args()
+
+    transfer_graph = TransferGraph(args.db, args.window_days)
+    conn = sqlite3.connect(f"file:{os.path.abspath(args.db)}?mode=ro", uri=True)
+    try:
+        transfer_graph.rebuild(conn)
+    finally:
+        conn.close()
+    report = transfer_graph.scan(dry_run=args.dry_run)
+    print(f"{report['edges']} transfers, {report['accounts']} accounts, {report['components']} components; "
+          f"analyzed in {report['seconds']['total']}s")
+    for row in report["high_risk"][:args.top]:
+        print(f"{row['account']}  score {row['score']}  in {row['fan_in']} out {row['fan_out']}  "
+              f"received {row['received']:,.2f}  pass-through {row['pass_through']}  "
+              f"component {row['scc_size']}  cycles {row['cycles']}")
+    if not args.dry_run:
+        print(f"Flagged {len(report['flagged'])} accounts")
+
+
+if __name__ == "__main__":
+    main()
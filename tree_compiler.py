@@ -0,0 +1,304 @@
+"""Fitted tree ensembles compiled into flat NumPy arrays.
+
+sklearn scores a forest one tree at a time, validating the input on every
+call and walking each tree in its own ``apply``; for one transaction that
+overhead is most of the cost. ``compile_model`` copies the nodes of every
+tree of an IsolationForest or RandomForestClassifier into one set of
+contiguous arrays:
+
+    feature    input column tested at each node (leaves: 0)
+    threshold  split value (leaves: +inf)
+    left       left child index; the right child is left + 1, as each
+               tree's nodes are laid out breadth-first (leaves point at
+               themselves)
+    value      what a sample ending at the node adds to the forest's sum:
+               path length for isolation trees, class probabilities for
+               classification trees
+
+A batch is scored by moving a (samples x trees) matrix of node indices one
+level down per step, for as many steps as the deepest tree; samples that
+reach a leaf early stay there. Inputs are cast to float32 like sklearn's
+trees do, and each float64 threshold is stored as the largest float32 not
+above it, which sends every float32 input the same way. Per-tree values are
+summed in tree order and the final scores use sklearn's formulas, so
+results are bit-identical to the fitted estimator's.
+
+A Pipeline whose preprocessing is a ColumnTransformer of StandardScaler and
+OneHotEncoder steps is compiled too, so scoring one transaction does not go
+through a DataFrame; other preprocessing runs through sklearn as it is.
+
+    python benchmarks/tree_inference.py   # checks identical results, times both
+"""
+import numpy as np
+
+CHUNK_ROWS = 256  # samples scored per step, keeps the CHUNK_ROWS x trees node matrix in cache
+# Above this many rows sklearn's compiled tree walk is faster than stepping the
+# node matrix with NumPy, so CompiledModel hands such batches to the estimator
+SKLEARN_ROWS = 4096
+
+
+def _node_depths(tree):
+    """Depth of each node with the root at 1, as Tree.compute_node_depths returns"""
+    depths = np.zeros(tree.node_count, dtype=np.int64)
+    depths[0] = 1
+    for node in range(tree.node_count):
+        if tree.children_left[node] != -1:
+            depths[tree.children_left[node]] = depths[node] + 1
+            depths[tree.children_right[node]] = depths[node] + 1
+    return depths
+
+
+def _isolation_values(forest):
+    """Per-node path length of each isolation tree, as IsolationForest adds it up"""
+    from sklearn.ensemble._iforest import _average_path_length
+    path_lengths = getattr(forest, "_decision_path_lengths", None)
+    average_lengths = getattr(forest, "_average_path_length_per_tree", None)
+    values = []
+    for i, estimator in enumerate(forest.estimators_):
+        tree = estimator.tree_
+        depths = path_lengths[i] if path_lengths is not None else _node_depths(tree)
+        averages = average_lengths[i] if average_lengths is not None else _average_path_length(tree.n_node_samples)
+        values.append((depths + averages - 1.0)[:, None])
+    return values
+
+
+def _class_values(forest):
+    """Per-node class probabilities of each classification tree, as predict_proba returns them"""
+    values = []
+    for estimator in forest.estimators_:
+        proba = estimator.tree_.value[:, 0, :forest.n_classes_].astype(np.float64)
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        values.append(proba / normalizer)
+    return values
+
+
+def _sibling_order(tree):
+    """Node ids in breadth-first order, so that every right child directly follows its left sibling"""
+    order = [0]
+    for node in order:
+        if tree.children_left[node] != -1:
+            order.append(tree.children_left[node])
+            order.append(tree.children_right[node])
+    return np.array(order, dtype=np.intp)
+
+
+def _round_down_float32(threshold):
+    """float32 thresholds t32 with x <= t32 exactly when x <= t, for any float32 x"""
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+class CompiledForest:
+    def __init__(self, forest):
+        from sklearn.ensemble import IsolationForest, RandomForestClassifier
+        if isinstance(forest, IsolationForest):
+            self.kind = "isolation"
+            from sklearn.ensemble._iforest import _average_path_length
+            values = _isolation_values(forest)
+            self.denominator = len(forest.estimators_) * _average_path_length([forest._max_samples])
+            self.offset = forest.offset_
+        elif isinstance(forest, RandomForestClassifier) and forest.n_outputs_ == 1:
+            self.kind = "classifier"
+            values = _class_values(forest)
+            self.classes = forest.classes_
+        else:
+            raise TypeError(f"Cannot compile {type(forest).__name__}")
+
+        self.n_trees = len(forest.estimators_)
+        self.n_features = forest.n_features_in_
+        tree_features = getattr(forest, "estimators_features_", None)
+        feature, threshold, left, missing_right, tree_values, roots = [], [], [], [], [], []
+        offset = 0
+        self.depth = 0
+        for i, estimator in enumerate(forest.estimators_):
+            tree = estimator.tree_
+            order = _sibling_order(tree)
+            position = np.empty(tree.node_count, dtype=np.intp)
+            position[order] = np.arange(tree.node_count)
+            is_leaf = tree.children_left[order] == -1
+            local = np.where(is_leaf, 0, tree.feature[order])
+            # bagged trees test a column of their feature subset
+            feature.append(np.asarray(tree_features[i])[local] if tree_features is not None else local)
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+            # the right child sits next to the left one; leaves point at themselves
+            left.append(np.where(is_leaf, np.arange(tree.node_count), position[tree.children_left[order]]) + offset)
+            missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+            missing_right.append(~is_leaf & ~np.asarray(missing_left, dtype=bool)[order])
+            tree_values.append(values[i][order])
+            roots.append(offset)
+            offset += tree.node_count
+            self.depth = max(self.depth, tree.max_depth)
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = _round_down_float32(np.concatenate(threshold).astype(np.float64))
+        self.left = np.concatenate(left).astype(np.intp)
+        self.missing_right = np.concatenate(missing_right)
+        self.value = np.concatenate(tree_values)
+        self.roots = np.array(roots, dtype=np.intp)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def apply(self, X):
+        """Leaf node index (into the flat arrays) of every sample in every tree, shape (samples, trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0], dtype=np.intp)[:, None] * X.shape[1]
+        flat = X.ravel()
+        has_missing = np.isnan(flat).any()
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.depth):
+            x = flat[rows + self.feature[nodes]]
+            go_right = x > self.threshold[nodes]
+            if has_missing:
+                go_right |= np.isnan(x) & self.missing_right[nodes]
+            nodes = self.left[nodes] + go_right
+        return nodes
+
+    def _forest_sum(self, X):
+        """Per-sample sum of the trees' leaf values, added in tree order"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {X.shape}")
+        total = np.zeros((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            values = self.value[self.apply(X[start:start + CHUNK_ROWS])]
+            # cumsum adds the trees one after another, like sklearn's accumulation
+            total[start:start + CHUNK_ROWS] = np.cumsum(values, axis=1)[:, -1]
+        return total
+
+    def score_samples(self, X):
+        depths = self._forest_sum(X)[:, 0]
+        denominator = self.denominator
+        scores = 2 ** (-np.divide(depths, denominator, out=np.ones_like(depths), where=denominator != 0))
+        return -scores
+
+    def decision_function(self, X):
+        return self.score_samples(X) - self.offset
+
+    def predict_proba(self, X):
+        return self._forest_sum(X) / self.n_trees
+
+    def predict(self, X):
+        if self.kind == "isolation":
+            decision = self.decision_function(X)
+            is_inlier = np.ones_like(decision, dtype=int)
+            is_inlier[decision < 0] = -1
+            return is_inlier
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+class CompiledPreprocessor:
+    """A ColumnTransformer of StandardScaler and OneHotEncoder steps, applied to columns of plain values"""
+
+    def __init__(self, transformer):
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+        if getattr(transformer, "remainder", "drop") != "drop":
+            raise TypeError("Cannot compile a ColumnTransformer that passes columns through")
+        self.steps = []
+        for name, step, columns in transformer.transformers_:
+            if step == "drop" or name == "remainder":
+                continue
+            columns = list(columns)
+            if isinstance(step, StandardScaler):
+                mean = step.mean_ if step.with_mean else None
+                scale = step.scale_ if step.with_std else None
+                self.steps.append(("scale", columns, (mean, scale)))
+            elif isinstance(step, OneHotEncoder) and step.handle_unknown in ("ignore", "infrequent_if_exist") \
+                    and step.drop_idx_ is None and not getattr(step, "_infrequent_enabled", False):
+                lookups = [{category: i for i, category in enumerate(categories)} for categories in step.categories_]
+                self.steps.append(("onehot", columns, lookups))
+            else:
+                raise TypeError(f"Cannot compile {type(step).__name__} step {name!r}")
+        self.columns = sorted({column for _, columns, _ in self.steps for column in columns})
+
+    def transform(self, data):
+        """Model matrix of data, a DataFrame or a mapping of column name -> sequence of values"""
+        blocks = []
+        for kind, columns, params in self.steps:
+            if kind == "scale":
+                X = np.column_stack([np.asarray(data[column], dtype=np.float64) for column in columns])
+                mean, scale = params
+                if mean is not None:
+                    X -= mean
+                if scale is not None:
+                    X /= scale
+                blocks.append(X)
+            else:
+                for column, lookup in zip(columns, params):
+                    values = list(data[column])
+                    onehot = np.zeros((len(values), len(lookup)))
+                    for row, value in enumerate(values):
+                        index = lookup.get(value)
+                        if index is not None:
+                            onehot[row, index] = 1.0
+                    blocks.append(onehot)
+        return np.hstack(blocks)
+
+
+class CompiledModel:
+    """A compiled forest, with the compiled (or sklearn) preprocessing of its Pipeline in front.
+
+    Takes a DataFrame, or for a Pipeline a mapping of column name -> values.
+    Batches of more than SKLEARN_ROWS rows are scored by the model itself.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.preprocess = None
+        if hasattr(model, "steps"):
+            *preprocessing, (_, forest) = model.steps
+            prefix = model[:-1]
+            try:
+                if len(preprocessing) != 1:
+                    raise TypeError("more than one preprocessing step")
+                self.preprocess = CompiledPreprocessor(preprocessing[0][1]).transform
+                self.preprocessing = "compiled"
+            except (TypeError, AttributeError) as e:
+                print(f"Pipeline preprocessing not compiled, using sklearn: {e}")
+                self.preprocess = lambda data: prefix.transform(_frame(data))
+                self.preprocessing = "sklearn"
+        else:
+            forest = model
+            self.preprocessing = None
+        self.forest = CompiledForest(forest)
+
+    def matrix(self, data):
+        X = self.preprocess(data) if self.preprocess else data
+        return X.toarray() if hasattr(X, "toarray") else X
+
+    def _score(self, method, data):
+        if _rows(data) > SKLEARN_ROWS:
+            return getattr(self.model, method)(_frame(data) if self.preprocess else data)
+        return getattr(self.forest, method)(self.matrix(data))
+
+    def predict(self, data):
+        return self._score("predict", data)
+
+    def decision_function(self, data):
+        return self._score("decision_function", data)
+
+    def score_samples(self, data):
+        return self._score("score_samples", data)
+
+    def predict_proba(self, data):
+        return self._score("predict_proba", data)
+
+
+def _rows(data):
+    if isinstance(data, dict):
+        return len(next(iter(data.values()), ()))
+    return data.shape[0] if hasattr(data, "shape") else len(data)
+
+
+def _frame(data):
+    import pandas as pd
+    return data if hasattr(data, "columns") else pd.DataFrame(data)
+
+
+def compile_model(model):
+    """CompiledModel of a fitted IsolationForest, RandomForestClassifier or Pipeline ending in one"""
+    return CompiledModel(model)
@@ -0,0 +1,537 @@
+"""Helpers, styles and per-session state shared by app.py and the pages in views/.
+
+Imported once per process, so the CSS and footer markup below are built
+once rather than on every rerun.
+"""
+import functools
+import json
+import os
+import time
+from datetime import datetime
+
+import streamlit as st
+
+import metrics_exporter
+import query_tracing
+from background_tasks import task_runner
+
+
+def validate_phone(phone):
+    """Validates Ghanaian phone numbers (10 digits starting with 0)"""
+    phone = str(phone).strip()
+    return len(phone) == 10 and phone.startswith('0') and phone.isdigit()
+
+def validate_pin(pin):
+    """Validates 4-digit numeric PIN"""
+    return str(pin).isdigit() and len(str(pin)) == 4
+
+
+# ─── STYLES ──────────────────────────────────────────────────────────────────
+# Custom CSS for professional banking UI
+THEME_CSS = """
+    <style>
+        /* Main Theme */
+        :root {
+            --primary: #005f73;
+            --primary-dark: #0a9396;
+            --secondary: #94d2bd;
+            --accent: #ee9b00;
+            --danger: #ae2012;
+            --light: #e9d8a6;
+            --dark: #001219;
+            --card-bg: #ffffff;
+            --app-bg: #f8f9fa;
+        }
+        
+        /* Stronger App Container */
+        .stApp {
+            background: var(--app-bg);
+            font-family: 'Segoe UI', system-ui, sans-serif;
+        }
+        
+        /* Professional Headers */
+        h1 {
+            color: var(--primary) !important;
+            font-weight: 700 !important;
+            border-bottom: 2px solid var(--secondary);
+            padding-bottom: 8px;
+        }
+        
+        h2 {
+            color: var(--primary-dark) !important;
+            font-weight: 600 !important;
+        }
+        
+        /* Enhanced Cards */
+        .card {
+            background: var(--card-bg);
+            border-radius: 12px;
+            padding: 20px;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.05);
+            border: 1px solid rgba(0,0,0,0.08);
+            margin-bottom: 20px;
+            transition: all 0.3s ease;
+        }
+        
+        .card:hover {
+            box-shadow: 0 6px 12px rgba(0,0,0,0.1);
+            transform: translateY(-2px);
+        }
+        
+        /* Strong Buttons */
+        .stButton>button {
+            border-radius: 8px !important;
+            padding: 10px 24px !important;
+            font-weight: 600 !important;
+            transition: all 0.2s !important;
+            border: none !important;
+        }
+        
+        .stButton>button.primary {
+            background: var(--primary) !important;
+            color: white !important;
+        }
+        
+        .stButton>button.primary:hover {
+            background: var(--primary-dark) !important;
+            transform: translateY(-1px);
+            box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+        }
+        
+        /* Improved Sidebar */
+        .sidebar .sidebar-content {
+            background: linear-gradient(180deg, var(--primary) 0%, var(--primary-dark) 100%);
+            color: white;
+        }
+        
+        .sidebar .stButton>button {
+            width: 100%;
+            margin: 8px 0;
+            text-align: left;
+            padding-left: 20px;
+            background: rgba(255,255,255,0.1);
+            color: white;
+        }
+        
+        .sidebar .stButton>button:hover {
+            background: rgba(255,255,255,0.2);
+        }
+        
+        /* Transaction Items */
+        .transaction-item {
+            display: flex;
+            align-items: center;
+            padding: 12px 16px;
+            margin: 8px 0;
+            background: white;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+            transition: all 0.2s;
+        }
+        
+        .transaction-item:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+        }
+        
+        /* Form Styling */
+        .stTextInput>div>div>input, 
+        .stNumberInput>div>div>input,
+        .stTextArea>div>div>textarea,
+        .stSelectbox>div>div>select {
+            border-radius: 18px !important;
+            padding: 10px 12px !important;
+            border: 2px solid #ddd !important;
+        }
+        
+        /* Metrics Cards */
+        .metric-card {
+            background: white;
+            border-radius: 10px;
+            padding: 15px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+            border-left: 4px solid var(--primary);
+        }
+    </style>
+"""
+
+# Custom CSS for better styling
+WIDGET_CSS = """
+    <style>
+        /* Make all Streamlit buttons a bit smaller */
+        .stButton>button {
+            width: 100%;
+            border-radius: 5px;
+            font-weight: bold;
+            font-size: 13px !important;    /* <-- added */
+            padding: 4px 8px !important;    /* optional: tighten spacing */
+        }
+        .stTextInput>div>div>input, .stNumberInput>div>div>input {
+            border-radius: 5px;
+        }
+        .stTextArea>div>div>textarea {
+            border-radius: 5px;
+        }
+        .stSelectbox>div>div>select {
+            border-radius: 5px;
+        }
+        .stDateInput>div>div>input {
+            border-radius: 5px;
+        }
+        .stProgress>div>div>div>div {
+            background-color: #4CAF50;
+        }
+    </style>
+"""
+
+FOOTER_HTML = """
+<style>
+@import url("https://fonts.googleapis.com/css?family=IBM%20Plex%20Sans:500|IBM%20Plex%20Sans:300");
+
+:root {
+  --m: 4rem;
+}
+* {
+  box-sizing: border-box;
+  scroll-behavior: smooth;
+}
+body {
+  background-color: black;
+  color: white;
+  font-family: "IBM Plex Sans";
+  font-weight: 300;
+  display: flex;
+  flex-direction: column;
+  align-items: center;
+  height: 190vh;
+  margin: 0;
+  color: #d5d5d5;
+  font-size: calc(0.3 * var(--m));
+}
+h2 {
+  font-weight: 500;
+  text-align: center;
+  font-size: var(--m);
+  margin: 0;
+}
+h3 {
+  font-weight: 500;
+  font-size: calc(0.6 * var(--m));
+  margin: 0;
+}
+.card {
+  height: calc(8 * var(--m));
+  width: calc(12 * var(--m));
+  background: linear-gradient(120deg, #ff8064, #725bdc);
+  color: black;
+  border-radius: calc(0.5 * var(--m));
+  display: flex;
+  flex-direction: column;
+  justify-content: center;
+  align-items: center;
+  gap: var(--m);
+  position: fixed;
+  margin: calc(2 * var(--m)) calc(5 * var(--m)) calc(5 * var(--m)) calc(5 * var(--m));
+  z-index: 100;
+}
+button {
+  background-color: #000;
+  font-size: calc(0.4 * var(--m));
+  border: none;
+  color: #e5e5e5;
+  font-family: "IBM Plex Sans";
+  font-weight: 400;
+  padding: calc(0.35 * var(--m)) calc(0.8 * var(--m));
+  border-radius: calc(0.3 * var(--m));
+}
+footer {
+  margin-top: 90vh;
+  z-index: 1;
+  width: 100%;
+  height: 50vh;
+  display: flex;
+  flex-direction: row;
+  justify-content: space-evenly;
+  align-items: flex-end;
+  padding: 5rem 2vw;
+  position: relative;
+}
+footer::before {
+  content: "";
+  position: absolute;
+  inset: 0;
+  background: #000000;
+  z-index: -7;
+}
+.backdrop {
+  z-index: -5;
+  position: absolute;
+  inset: 0;
+  backdrop-filter: blur(40px);
+  -webkit-backdrop-filter: blur(40px);
+  mask-image: linear-gradient(
+    rgba(0, 0, 0, 0),
+    rgba(0, 0, 0, 0.5) 10%,
+    rgba(0, 0, 0, 0.8) 20%,
+    rgba(0, 0, 0, 1) 30%,
+    rgb(0, 0, 0)
+  );
+  -webkit-mask-image: linear-gradient(
+    rgba(0, 0, 0, 0),
+    rgba(0, 0, 0, 0.5) 10%,
+    rgba(0, 0, 0, 0.8) 20%,
+    rgba(0, 0, 0, 1) 30%,
+    rgb(0, 0, 0)
+  );
+}
+.col {
+  flex-direction: column;
+  align-items: flex-start;
+  justify-content: flex-start;
+  padding: calc(0.3 * var(--m)) calc(0.8 * var(--m));
+  width: 28%;
+}
+.col2,
+.col3 {
+  background-color: #121212;
+  border-radius: calc(0.5 * var(--m));
+}
+img {
+  height: calc(0.3 * var(--m));
+  object-fit: cover;
+}
+.social {
+  display: flex;
+  flex-direction: row;
+  justify-content: flex-start;
+  gap: 1rem;
+}
+a {
+  text-decoration: none;
+  color: inherit;
+}
+.link {
+  width: calc(0.8 * var(--m));
+  height: calc(0.8 * var(--m));
+  background-color: rgba(255, 255, 255, 0.1);
+  border-radius: calc(0.1 * var(--m));
+  display: flex;
+  justify-content: center;
+  align-items: center;
+}
+@media screen and (max-width: 1000px) {
+  :root {
+    --m: 3rem;
+  }
+}
+@media screen and (max-width: 700px) {
+  footer {
+    flex-direction: column;
+    padding: 5rem 20vw;
+  }
+  .col {
+    width: 100%;
+  }
+}
+</style>
+
+<footer id="footer">
+  <div class="col col1">
+    <h3>Wirebuddy</h3>
+    <p>Made with <span style="color: #BA6573;">❤</span> by Group3</p>
+    <div class="social">
+      <a href="https://codepen.io/Juxtopposed" target="_blank" class="link"><img src="https://assets.codepen.io/9051928/codepen_1.png" alt="" /></a>
+      <a href="https://twitter.com/juxtopposed" target="_blank" class="link"><img src="https://assets.codepen.io/9051928/x.png" alt="" /></a>
+      <a href="https://youtube.com/@juxtopposed" target="_blank" class="link"><img src="https://assets.codepen.io/9051928/youtube_1.png" alt="" /></a>
+    </div>
+    <p style="color: #818181; font-size: smaller">2025 © All Rights Reserved</p>
+  </div>
+  <div class="col col2">
+    <p>About</p>
+    <p>Our mission</p>
+    <p>Privacy Policy</p>
+    <p>Terms of service</p>
+  </div>
+  <div class="col col3">
+    <p>Services</p>
+    <p>Products</p>
+    <p>Join our team</p>
+    <p>Partner with us</p>
+  </div>
+  <div class="backdrop"></div>
+
+<style>
+  /* Footer text → pure white */
+  footer, footer * {
+    color: #ffffff !important;
+  }
+
+  /* No gap above footer */
+  footer {
+    margin-top: 0 !important;
+    padding-top: 0 !important;   /* if you have any padding on the footer itself */
+  }
+
+  /* body or main container adds bottom margin/padding, zero it out */
+  .stApp > div:first-child {
+    margin-bottom: 0 !important;
+    padding-bottom: 0 !important;
+  }
+</style>
+
+  
+</footer>
+"""
+
+def inject_styles():
+    """Emit the shared CSS; called once per rerun from app.py only"""
+    st.markdown(THEME_CSS + WIDGET_CSS, unsafe_allow_html=True)
+
+def render_footer():
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+
+
+# ─── STATIC ASSETS ───────────────────────────────────────────────────────────
+# Variants built from assets/ by build_assets.py and served from static/
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static/"
+
+@functools.lru_cache(maxsize=1)
+def asset_manifest():
+    try:
+        with open(os.path.join(STATIC_DIR, "manifest.json")) as f:
+            return json.load(f)["images"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"No asset manifest, run build_assets.py: {e}")
+        return {}
+
+def asset_url(variant):
+    """URL of a built variant; ?v= makes the static handler send a long Cache-Control"""
+    return f"{STATIC_URL}{variant['file']}?v={variant['hash']}"
+
+def asset_srcset(name, fmt):
+    variants = [v for v in asset_manifest().get(name, {}).get("variants", []) if v["format"] == fmt]
+    return ", ".join(f"{asset_url(v)} {v['width']}w" for v in variants)
+
+def asset_file(name, width):
+    """Local path of the smallest WebP variant at least width pixels wide, or the source image"""
+    variants = sorted((v for v in asset_manifest().get(name, {}).get("variants", []) if v["format"] == "webp"),
+                      key=lambda v: v["width"])
+    for variant in variants:
+        if variant["width"] >= width:
+            return os.path.join(STATIC_DIR, variant["file"])
+    if variants:
+        return os.path.join(STATIC_DIR, variants[-1]["file"])
+    return os.path.join(os.path.dirname(STATIC_DIR), "assets", name)
+
+def picture_html(name, sizes="100vw", alt=""):
+    """<picture> choosing a WebP variant by width, with the JPEG/PNG variants as fallback"""
+    entry = asset_manifest().get(name)
+    if not entry:
+        return ""
+    fallback = [v for v in entry["variants"] if v["format"] == entry["fallback"]]
+    return (f"<picture><source type='image/webp' srcset='{asset_srcset(name, 'webp')}' sizes='{sizes}'>"
+            f"<img src='{asset_url(fallback[0])}' srcset='{asset_srcset(name, entry['fallback'])}' "
+            f"sizes='{sizes}' width='{fallback[0]['width']}' height='{fallback[0]['height']}' "
+            f"alt='{alt}' loading='lazy' decoding='async'></picture>")
+
+
+# ─── SESSION STATE ───────────────────────────────────────────────────────────
+def init_session_state():
+    if 'logged_in_user' not in st.session_state:
+        st.session_state.logged_in_user = None
+        st.session_state.page = "login"
+        st.session_state.last_activity = datetime.now()
+        st.session_state.receipt_data = None
+
+    if 'force_page' not in st.session_state:
+        st.session_state.force_page = None
+
+    if 'tasks' not in st.session_state:
+        st.session_state.tasks = {}  # purpose -> background task id
+
+def db():
+    """(conn, cursor) for this session, opened on first use instead of on every rerun"""
+    if 'db' not in st.session_state:
+        try:
+            conn = query_tracing.connect("bank.db", check_same_thread=False)
+        except Exception as e:
+            st.error(f"Database connection error: {str(e)}")
+            st.stop()
+        st.session_state.db = (conn, conn.cursor())
+    return st.session_state.db
+
+
+# ─── BACKGROUND TASKS ────────────────────────────────────────────────────────
+def start_task(key, name, fn, *args, **kwargs):
+    """Run fn on the background pool, remembering the task under key for this session"""
+    user = st.session_state.logged_in_user
+    st.session_state.tasks[key] = task_runner.submit(
+        name, fn, *args, owner=user.username if user else None, **kwargs)
+
+@st.fragment(run_every=0.5)
+def task_progress(task_id, label):
+    """Poll a running task and rerun the page as soon as it finishes"""
+    task = task_runner.get(task_id)
+    if task is None or task.done:
+        st.rerun()
+    st.progress(task.progress or 0.0, text=f"{task.message or label} ({task.elapsed:.1f}s)")
+
+def poll_task(key, label):
+    """Return the finished task stored under key and forget it; while it runs, show its progress"""
+    task_id = st.session_state.tasks.get(key)
+    task = task_runner.get(task_id)
+    if task is None:
+        st.session_state.tasks.pop(key, None)
+        return None
+    if not task.done:
+        task_progress(task_id, label)
+        return None
+    del st.session_state.tasks[key]
+    task_runner.forget(task_id)
+    return task
+
+
+# ─── FRAGMENTS ───────────────────────────────────────────────────────────────
+# Dashboard and admin sections are st.fragment functions with their own data
+# loader: a widget inside one reruns only that function, not the whole page.
+def timed_fragment(name):
+    """st.fragment that records how long each run took and shows it to admins"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            started = time.perf_counter()
+            fn(*args, **kwargs)
+            seconds = time.perf_counter() - started
+            metrics_exporter.FRAGMENT_SECONDS.observe(seconds, name)
+            user = st.session_state.logged_in_user
+            if user and user.is_admin:
+                st.caption(f"⏱️ {name} rendered in {seconds * 1000:.0f} ms")
+        return st.fragment(run)
+    return decorator
+
+
+# ─── FORMATTING ──────────────────────────────────────────────────────────────
+def get_time_of_day():
+    hour = datetime.now().hour
+    if 5 <= hour < 12:
+        return "morning"
+    elif 12 <= hour < 17:
+        return "afternoon"
+    elif 17 <= hour < 21:
+        return "evening"
+    else:
+        return "night"
+
+def get_transaction_icon(txn_type):
+    icons = {
+        "Deposit": "💰",
+        "Withdrawal": "🏧",
+        "Transfer": "↔️",
+        "Savings Contribution": "🎯",
+        "Payment": "💳"
+    }
+    return icons.get(txn_type, "📝")
+
+def format_currency(amount):
+    return f"₵{abs(amount):,.2f}" if amount >= 0 else f"-₵{abs(amount):,.2f}"
@@ -0,0 +1,586 @@
+"""Admin panel: accounts, system statistics and fraud monitoring.
+
+Only added to the navigation for admins, so none of this is imported or
+queried for customers.
+"""
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import db_backup
+import inference_metrics
+import online_detector
+import query_tracing
+import transfer_graph
+from backend import Account, fraud_cascade, rebuild_ledger_state, scan_recent_transactions
+from fraud_analytics import FLAGGED_COLUMNS, FLAGGED_SQL, analytics
+from reporting_snapshot import snapshot
+from rerun_profiler import profiler
+from ui import db, format_currency, poll_task, start_task, timed_fragment
+
+conn, cursor = db()
+snapshot.start()
+
+def report_db():
+    """Cursor on the reporting snapshot, reopened after each refresh"""
+    generation, report_conn = st.session_state.get("report_db", (None, None))
+    if generation != snapshot.generation:
+        if report_conn is not None:
+            report_conn.close()
+        report_conn = snapshot.connect()
+        st.session_state.report_db = (snapshot.generation, report_conn)
+    return report_conn.cursor()
+
+def snapshot_status(key):
+    """Caption with the age of the snapshot data and a button to refresh it"""
+    col1, col2 = st.columns([4, 1])
+    if col2.button("Refresh now", key=key):
+        with st.spinner("Copying the database..."):
+            snapshot.refresh()
+    age = snapshot.age_seconds() or 0
+    col1.caption(f"📸 Data as of {snapshot.taken_at} ({age / 60:.0f} min ago) · "
+                 f"refreshed every {snapshot.refresh_seconds / 60:g} min")
+
+def run_backup(task):
+    return db_backup.manager.backup_now(
+        "manual", progress=lambda copied, total: task.report(copied / total if total else 1.0))
+
+def run_restore(task, staging_path, remove_staging):
+    """Restore bank.db from staging_path, then refresh what is derived from it"""
+    try:
+        safety = db_backup.manager.restore(
+            staging_path, progress=lambda copied, total: task.report(copied / total if total else 1.0))
+    finally:
+        if remove_staging and os.path.exists(staging_path):
+            os.remove(staging_path)
+    snapshot.request_refresh()
+    rebuild_ledger_state()
+    return safety
+
+def load_accounts():
+    return Account.get_all_accounts()
+
+def load_account_totals(cur):
+    """(accounts, active accounts, total balance)"""
+    cur.execute("SELECT COUNT(*), COALESCE(SUM(is_active), 0), COALESCE(SUM(balance), 0) FROM accounts")
+    return cur.fetchone()
+
+def load_system_transactions(cur):
+    """The 5 latest transactions of every account"""
+    cur.execute("""
+        SELECT type, amount, description, timestamp, reference_id
+        FROM (SELECT type, amount, description, timestamp, reference_id,
+                     ROW_NUMBER() OVER (PARTITION BY account_number ORDER BY timestamp DESC) AS n
+              FROM transactions)
+        WHERE n <= 5
+    """)
+    return cur.fetchall()
+
+def load_flagged_transactions(cur=cursor):
+    """Flagged transactions with account info, in FLAGGED_COLUMNS order"""
+    cur.execute(FLAGGED_SQL)
+    return cur.fetchall()
+
+@timed_fragment("Accounts")
+def admin_accounts_tab():
+    st.subheader("All Accounts")
+    accounts = load_accounts()
+
+    search_term = st.text_input("Search accounts")
+    if search_term:
+        accounts = [acc for acc in accounts 
+                   if search_term.lower() in acc.name.lower() or 
+                   search_term in acc.account_number]
+
+    if accounts:
+        for account in accounts:
+            with st.expander(f"{account.name} ({account.account_number})"):
+                st.write(f"**Username:** {account.username}")
+                st.write(f"**Balance:** {format_currency(account.balance)}")
+                st.write(f"**Status:** {'Active' if account.is_active else 'Frozen'}")
+                st.write(f"**Created:** {account.created_at}")
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button(f"{'Freeze' if account.is_active else 'Unfreeze'} Account", 
+                               key=f"status_{account.account_number}"):
+                        new_status = account.toggle_account_status()
+                        st.success(f"Account {'frozen' if not new_status else 'unfrozen'}")
+                        snapshot.request_refresh()  # the System tab counts frozen accounts too
+                        st.rerun()
+
+                with col2:
+                    if st.button("Reset PIN", key=f"reset_{account.account_number}"):
+                        new_pin = "0000"  # Default reset PIN
+                        account.pin = new_pin
+                        account.update_profile_in_db()
+                        st.success(f"PIN reset to 0000 for {account.name}")
+                        st.rerun(scope="fragment")
+
+    else:
+        st.info("No accounts found")
+
+@timed_fragment("System")
+def admin_system_tab():
+    st.subheader("System Statistics")
+    snapshot_status("refresh_snapshot_system")
+    report_cursor = report_db()
+    total_accounts, active_accounts, total_balance = load_account_totals(report_cursor)
+    if total_accounts:
+        frozen_accounts = total_accounts - active_accounts
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total Accounts", total_accounts)
+        col2.metric("Active Accounts", active_accounts)
+        col3.metric("Frozen Accounts", frozen_accounts)
+
+        st.metric("Total System Balance", format_currency(total_balance))
+
+        # Transaction statistics
+        st.subheader("Recent Transactions")
+        all_transactions = load_system_transactions(report_cursor)
+
+        if all_transactions:
+            df = pd.DataFrame(all_transactions, 
+                            columns=["Type", "Amount", "Description", "Timestamp", "Reference"])
+            st.dataframe(df.sort_values("Timestamp", ascending=False))
+        else:
+            st.info("No transactions in system")
+    else:
+        st.warning("No accounts in system")
+
+    # Query tracing
+    st.markdown("---")
+    st.subheader("🐢 Top queries")
+    query_report = query_tracing.tracer.to_dict()
+    st.caption(f"Since {query_report['since']} · slow threshold {query_report['slow_query_ms']:.0f} ms")
+
+    if query_report["queries"]:
+        sort_by = st.selectbox("Sort by", ["total_ms", "p95_ms", "max_ms", "count", "rows"],
+                               key="top_queries_sort")
+        top_queries = sorted(query_report["queries"], key=lambda q: q[sort_by], reverse=True)[:25]
+        df = pd.DataFrame(top_queries, columns=["query", "count", "total_ms", "p50_ms",
+                                                "p95_ms", "max_ms", "rows", "slow"])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+        planned = [q for q in top_queries if q["plan"]]
+        for q in planned:
+            with st.expander(f"Plan: {q['query'][:80]}"):
+                st.code("\n".join(q["plan"]))
+    else:
+        st.info("No queries recorded yet")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        show_json = st.toggle("Show as JSON", key="top_queries_json")
+    with col2:
+        if st.button("Reset query stats", key="reset_query_stats"):
+            query_tracing.tracer.reset()
+            st.rerun(scope="fragment")
+    if show_json:
+        st.json(query_report, expanded=False)
+        st.download_button("Download JSON", json.dumps(query_report, indent=2),
+                           file_name=f"query_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                           mime="application/json")
+
+    # Model inference latency
+    st.markdown("---")
+    st.subheader("🧠 Model performance")
+    sample_rate = st.slider("Sampling rate", 0.0, 1.0, float(inference_metrics.metrics.sample_rate), 0.01,
+                            help="Fraction of model calls that are timed", key="inference_sample_rate")
+    if sample_rate != inference_metrics.metrics.sample_rate:
+        inference_metrics.metrics.set_sample_rate(sample_rate)
+
+    model_report = inference_metrics.snapshot()
+    st.caption(f"Last {model_report['window_seconds'] // 60} minutes · since {model_report['since']}")
+    stage_rows = []
+    for model_name, model_stats in sorted(model_report["models"].items()):
+        for stage_name, stage_stats in model_stats["stages"].items():
+            stage_rows.append({
+                "model": model_name, "stage": stage_name,
+                "calls": model_stats["calls"], "sampled": stage_stats["count"],
+                "mean_ms": stage_stats["mean_ms"], "p50_ms": stage_stats["p50_ms"],
+                "p95_ms": stage_stats["p95_ms"], "p99_ms": stage_stats["p99_ms"],
+                "max_ms": stage_stats["max_ms"],
+            })
+
+    if stage_rows:
+        st.dataframe(pd.DataFrame(stage_rows), use_container_width=True, hide_index=True)
+        choice = st.selectbox("Latency histogram", [f"{r['model']} / {r['stage']}" for r in stage_rows],
+                              key="inference_histogram")
+        model_name, stage_name = choice.split(" / ")
+        bounds = model_report["bucket_bounds_ms"]
+        # Numbered labels keep the buckets in order on the chart axis
+        labels = [f"{i:02d} ≤{b:g} ms" if b is not None else f"{i:02d} >{bounds[-2]:g} ms"
+                  for i, b in enumerate(bounds)]
+        counts = model_report["models"][model_name]["stages"][stage_name]["buckets"]
+        st.bar_chart(pd.DataFrame({"calls": counts}, index=pd.Index(labels, name="latency")))
+    else:
+        st.info("No model calls sampled yet")
+
+    if st.button("Reset model metrics", key="reset_inference_metrics"):
+        inference_metrics.metrics.reset()
+        st.rerun(scope="fragment")
+
+    # Fraud rule prefilter
+    st.markdown("---")
+    st.subheader("🪜 Fraud rules")
+    cascade_report = fraud_cascade.report()
+    st.caption(f"{len(cascade_report['rules'])} rules from {cascade_report['path']}, "
+               f"loaded {cascade_report['loaded_at'] or 'never'} · counts since {cascade_report['since']}")
+    if cascade_report["error"]:
+        st.warning(f"The rules file was not loaded, the previous rules are in use: {cascade_report['error']}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Checks", cascade_report["checks"])
+    col2.metric("Rules ms / check", f"{cascade_report['rule_ms_mean']:.3f}" if cascade_report["rule_ms_mean"] is not None else "–")
+    col3.metric("Model time saved", f"{cascade_report['time_saved_s']:.2f} s" if cascade_report["time_saved_s"] is not None else "–",
+                help="Model calls the rules replaced, at the model's average latency, less the rules' own time")
+    st.dataframe(pd.DataFrame(cascade_report["stages"]), use_container_width=True, hide_index=True,
+                 column_config={"share": st.column_config.ProgressColumn("share", min_value=0.0, max_value=1.0)})
+    if cascade_report["rules"]:
+        st.dataframe(pd.DataFrame(cascade_report["rules"]), use_container_width=True, hide_index=True)
+    col1, col2 = st.columns(2)
+    if col1.button("Reload rules", key="reload_fraud_rules"):
+        fraud_cascade.reload(force=True)
+        st.rerun(scope="fragment")
+    if col2.button("Reset rule counts", key="reset_fraud_rules"):
+        fraud_cascade.reset()
+        st.rerun(scope="fragment")
+
+    # Transfer graph
+    st.markdown("---")
+    st.subheader("🕸️ Transfer graph")
+    graph = transfer_graph.graph
+    graph_report = graph.last_report
+    st.caption(f"Transfers of the last {graph.window_days:g} days · "
+               + (f"scanned every {graph.interval / 60:g} minutes" if graph.interval > 0 else "scheduled scans off")
+               + (f" · last scan {graph_report['at']}, {len(graph_report['flagged'])} flagged" if graph_report
+                  else " · not scanned yet"))
+    if graph.last_error:
+        st.error(f"Last scan failed: {graph.last_error}")
+    if graph_report:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Accounts", graph_report["accounts"])
+        col2.metric("Transfers", graph_report["edges"])
+        col3.metric("High risk", len(graph_report["high_risk"]))
+        col4.metric("Analyzed in", f"{graph_report['seconds']['total'] * 1000:.0f} ms")
+        if graph_report["high_risk"]:
+            st.dataframe(pd.DataFrame(graph_report["high_risk"]), use_container_width=True, hide_index=True,
+                         column_config={"score": st.column_config.ProgressColumn("score", min_value=0.0,
+                                                                                 max_value=1.0)})
+        else:
+            st.info("No high-risk accounts in the last scan")
+    col1, col2 = st.columns(2)
+    if col1.button("Score graph", key="graph_dry_run", help="Analyze without flagging"):
+        graph.scan(dry_run=True)
+        st.rerun(scope="fragment")
+    if col2.button("Scan and flag", key="graph_scan"):
+        graph.scan()
+        st.rerun(scope="fragment")
+
+    # Online anomaly detector
+    st.markdown("---")
+    st.subheader("📈 Online detector")
+    online = online_detector.detector
+    online_report = online.report()
+    st.caption(f"Half-Space Trees: {online_report['trees']} trees of height {online_report['height']}, "
+               f"window of {online_report['window']} transactions, {online_report['memory_kb']:,.0f} KB · "
+               f"last checkpoint {online_report['last_checkpoint'] or 'never'}")
+    if online.last_error:
+        st.error(f"Last checkpoint failed: {online.last_error}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Transactions learned", online_report["updates"])
+    col2.metric("Windows", online_report["windows"],
+                help="Scores are 0 until the first window is complete")
+    col3.metric("Not checkpointed", online_report["unsaved"])
+    if st.button("Save checkpoint", key="online_checkpoint"):
+        online.save()
+        st.rerun(scope="fragment")
+
+    # Rerun profiler
+    st.markdown("---")
+    st.subheader("🔬 Rerun profiler")
+    script_ctx = get_script_run_ctx()
+    col1, col2 = st.columns(2)
+    with col1:
+        profiling = st.toggle("Profile reruns", value=profiler.enabled, key="profiler_enabled",
+                              help="Samples the script every few milliseconds while it runs")
+    with col2:
+        scope = st.radio("Sessions", ["This session", "All sessions"], horizontal=True, key="profiler_scope")
+    if profiling:
+        profiler.enable([script_ctx.session_id] if scope == "This session" and script_ctx else None)
+    else:
+        profiler.disable()
+
+    finished = [p for p in profiler.recent() if p.finished is not None]
+    if finished:
+        st.dataframe(pd.DataFrame([p.summary() for p in finished]), use_container_width=True, hide_index=True)
+        index = st.selectbox("Profile", range(len(finished)), key="profile_choice",
+                             format_func=lambda i: f"{finished[i].started_at} · {finished[i].page} · "
+                                                   f"{finished[i].wall_ms:.0f} ms")
+        chosen = finished[index]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Sections**")
+            st.dataframe(pd.DataFrame(chosen.section_times(),
+                                      columns=["section", "wall_ms", "sampled_ms", "samples"]),
+                         use_container_width=True, hide_index=True)
+        with col2:
+            st.markdown("**Calls out of app.py**")
+            st.dataframe(pd.DataFrame(chosen.outside_calls(), columns=["call", "sampled_ms", "samples"]),
+                         use_container_width=True, hide_index=True)
+
+        stamp = chosen.started_at.replace(":", "").replace(" ", "_").replace("-", "")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("Download .pstats", chosen.pstats_bytes(),
+                               file_name=f"rerun_{stamp}.pstats", mime="application/octet-stream")
+        with col2:
+            st.download_button("Download collapsed stacks", chosen.collapsed(),
+                               file_name=f"rerun_{stamp}.collapsed", mime="text/plain")
+        with col3:
+            if st.button("Clear profiles", key="clear_profiles"):
+                profiler.clear()
+                st.rerun(scope="fragment")
+    else:
+        st.info("No profiles yet. Switch profiling on and use the app.")
+
+@timed_fragment("Fraud analytics")
+def admin_fraud_tab():
+    st.header("Comprehensive Fraud Detection")
+
+    # 1. System-wide Fraud Dashboard
+    st.subheader("System-wide Fraud Analytics")
+    snapshot_status("refresh_snapshot_fraud")
+
+    # Aggregated once per snapshot generation (DuckDB over the snapshot when available)
+    results = analytics.results(snapshot)
+    summary = results["summary"]
+
+    # 2. Fraud Metrics Cards
+    col1, col2, col3, col4 = st.columns(4)
+
+    # Total flagged transactions
+    total_flagged = summary["total"]
+    col1.metric("🚨 Flagged Transactions", total_flagged)
+
+    # Pending review count
+    col2.metric("⏳ Pending Review", summary["pending"], 
+               help="Transactions awaiting manual review")
+
+    # Confirmed fraud
+    confirmed = summary["confirmed"]
+    col3.metric("✅ Confirmed Fraud", confirmed, 
+               delta=f"{confirmed/total_flagged*100:.1f}%" if total_flagged > 0 else 0)
+
+    # False positives
+    false_pos = summary["approved"]
+    col4.metric("❌ False Alarms", false_pos, 
+               delta=f"{false_pos/total_flagged*100:.1f}%" if total_flagged > 0 else 0)
+
+    # 3. Interactive Fraud Analysis
+    st.subheader("📈 Fraud Patterns Analysis")
+    st.caption(f"Computed with {analytics.last_engine} in {analytics.last_seconds * 1000:.0f} ms")
+
+    if total_flagged:
+        tab1, tab2, tab3 = st.tabs(["By Time", "By Type", "By Account"])
+
+        with tab1:
+            # Fraud by day
+            st.write("**Fraud Cases by Day**")
+            st.line_chart(results["daily"], x='date', y='count')
+
+            # Fraud by hour
+            st.write("**Fraud Cases by Hour of Day**")
+            st.bar_chart(results["hourly"], x='hour', y='count')
+
+        with tab2:
+            # Fraud by transaction type
+            st.write("**Fraud by Transaction Type**")
+            st.dataframe(results["by_type"])
+
+            # Amount distribution by type
+            st.write("**Amount Distribution by Type**")
+            st.bar_chart(results["amount_by_type"], x='type', y='amount')
+
+        with tab3:
+            # High-risk accounts
+            st.write("**High-Risk Accounts**")
+            st.dataframe(results["by_account"])
+
+            # Account age vs fraud
+            st.write("**Account Age vs Fraud Cases**")
+            st.scatter_chart(results["account_age"], x='age_days', y='fraud_count')
+
+@timed_fragment("Review queue")
+def review_queue():
+    st.subheader("🔍 Transaction Review Queue")
+
+    all_flagged = load_flagged_transactions()
+    if all_flagged:
+        fraud_df = pd.DataFrame(all_flagged, columns=FLAGGED_COLUMNS)
+
+        # Filter options
+        col1, col2 = st.columns(2)
+        with col1:
+            show_status = st.selectbox(
+                "Filter by Status",
+                ["All", "Pending", "Confirmed", "Approved"]
+            )
+        with col2:
+            min_amount = st.number_input(
+                "Minimum Amount", 
+                min_value=0, 
+                value=0
+            )
+
+        # Apply filters
+        filtered = fraud_df
+        if show_status != "All":
+            filtered = filtered[filtered['status'] == show_status.lower()]
+        filtered = filtered[filtered['amount'] >= min_amount]
+
+        # Display filtered transactions
+        for _, row in filtered.iterrows():
+            with st.expander(f"{row['type']} - {row['amount']:.2f} - {row['status']}"):
+                col1, col2 = st.columns([3,1])
+                with col1:
+                    st.write(f"**Account:** {row['name']} ({row['account']})")
+                    st.write(f"**Amount:** {row['amount']:.2f}")
+                    st.write(f"**Date:** {row['timestamp']}")
+                    st.write(f"**Description:** {row['description']}")
+                    st.write(f"**Flagged At:** {row['flagged_at']}")
+
+                    if pd.notna(row['reviewed_at']):
+                        st.write(f"**Reviewed By:** {row['reviewed_by']} at {row['reviewed_at']}")
+
+                with col2:
+                    # Action buttons; the fraud tab's counts and charts read the
+                    # reporting snapshot, so a review also asks for a fresh copy
+                    if row['status'] == 'pending':
+                        if st.button("✅ Confirm Fraud", key=f"confirm_{row['id']}"):
+                            cursor.execute("""
+                                UPDATE flagged_transactions 
+                                SET status='confirmed', 
+                                    reviewed_by=?,
+                                    reviewed_at=datetime('now')
+                                WHERE id=?
+                            """, (st.session_state.logged_in_user.username, row['id']))
+                            conn.commit()
+                            st.success("Marked as confirmed fraud")
+                            snapshot.request_refresh()
+                            st.rerun()
+
+                        if st.button("👍 Approve", key=f"approve_{row['id']}"):
+                            cursor.execute("""
+                                UPDATE flagged_transactions 
+                                SET status='approved', 
+                                    reviewed_by=?,
+                                    reviewed_at=datetime('now')
+                                WHERE id=?
+                            """, (st.session_state.logged_in_user.username, row['id']))
+                            conn.commit()
+                            st.success("Transaction approved")
+                            snapshot.request_refresh()
+                            st.rerun()
+
+                    if st.button("🗑️ Delete Flag", key=f"delete_{row['id']}"):
+                        cursor.execute("DELETE FROM flagged_transactions WHERE id=?", (row['id'],))
+                        conn.commit()
+                        st.warning("Flag removed")
+                        snapshot.request_refresh()
+                        st.rerun()
+    else:
+        st.info("No flagged transactions in the system")
+
+
+st.header("Admin Panel")
+
+tab1, tab2, tab3 = st.tabs(["Accounts", "System", "Fraud"])
+
+with tab1:
+    admin_accounts_tab()
+
+with tab2:
+    admin_system_tab()
+
+    # Backup and restore; outside the fragment so the progress bar can poll
+    st.markdown("---")
+    st.subheader("💾 Backups")
+    manager = db_backup.manager
+    schedule = (f"every {manager.interval / 60:g} min, keeping {manager.keep}" if manager.interval > 0
+                else "scheduled backups off")
+    st.caption(f"{os.path.abspath(manager.backup_dir)} · {schedule} · "
+               f"last backup {manager.last_backup_at or 'not this run'}")
+    if manager.last_error:
+        st.error(f"Last scheduled backup failed: {manager.last_error}")
+
+    if st.button("Back up now", key="backup_now") and "db_backup" not in st.session_state.tasks:
+        start_task("db_backup", "Database backup", run_backup, with_task=True)
+    if "db_backup" in st.session_state.tasks:
+        task = poll_task("db_backup", "Backing up bank.db...")
+        if task and task.status == "failed":
+            st.error(f"Backup failed: {task.error}")
+        elif task:
+            st.success(f"Backed up to {task.result['name']} in {task.result['seconds']:.1f}s")
+
+    backups = manager.backups()
+    if backups:
+        st.dataframe(pd.DataFrame([{"backup": b["name"], "created_at": b["created_at"], "reason": b["reason"],
+                                    "size_mb": round(b["bytes"] / 1e6, 2)} for b in backups]),
+                     use_container_width=True, hide_index=True)
+    else:
+        st.info("No backups yet")
+
+    st.write("**Restore**")
+    st.caption("The current database is backed up first. Sessions wait while the restore runs.")
+    source = st.radio("Restore from", ["Uploaded file", "Existing backup"], horizontal=True, key="restore_source")
+    if source == "Uploaded file":
+        uploaded_db = st.file_uploader("SQLite database file", type=["db"], key="restore_upload")
+        chosen_backup = None
+    else:
+        uploaded_db = None
+        chosen_backup = st.selectbox("Backup", [b["name"] for b in backups], key="restore_backup")
+
+    ready = uploaded_db is not None or chosen_backup is not None
+    if (st.button("Restore", key="restore_db", disabled=not ready)
+            and "db_restore" not in st.session_state.tasks):
+        if uploaded_db is not None:
+            os.makedirs(manager.backup_dir, exist_ok=True)
+            staging_path = os.path.join(manager.backup_dir, f"staging-{uploaded_db.file_id}.db")
+            with open(staging_path, "wb") as f:
+                f.write(uploaded_db.getbuffer())
+            start_task("db_restore", "Database restore", run_restore, staging_path, True, with_task=True)
+        else:
+            start_task("db_restore", "Database restore", run_restore,
+                       os.path.join(manager.backup_dir, chosen_backup), False, with_task=True)
+    if "db_restore" in st.session_state.tasks:
+        task = poll_task("db_restore", "Restoring bank.db...")
+        if task and task.status == "failed":
+            st.error(f"Restore failed: {task.error}")
+        elif task:
+            st.success(f"Database restored. The previous one was saved as {task.result['name']}.")
+
+with tab3:  # Fraud Monitoring tab
+    admin_fraud_tab()
+
+    # 4. Detailed Transaction Review
+    review_queue()
+
+
+    # 5. Proactive Fraud Detection
+    st.subheader("🕵️ Proactive Detection")
+
+    if st.button("Scan Recent Transactions for Fraud") and "fraud_scan" not in st.session_state.tasks:
+        start_task("fraud_scan", "Fraud scan", scan_recent_transactions, with_task=True, limit=500)
+
+    if "fraud_scan" in st.session_state.tasks:
+        task = poll_task("fraud_scan", "Scanning last 500 transactions...")
+        if task and task.status == "failed":
+            st.error(f"Scan failed: {task.error}")
+        elif task:
+            st.success(f"Scan complete! Found {task.result} new suspicious transactions")
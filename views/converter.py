@@ -0,0 +1,28 @@
+"""Currency converter"""
+import streamlit as st
+from backend import CurrencyConverter
+
+st.subheader("Currency Converter")
+
+currencies = CurrencyConverter.SUPPORTED_CURRENCIES
+
+col1, col2 = st.columns(2)
+with col1:
+    amount = st.number_input("Amount", min_value=0.01, value=1.0, step=0.1)
+    from_currency = st.selectbox("From", currencies, index=currencies.index("USD"))
+with col2:
+    to_currency = st.selectbox("To", currencies, index=currencies.index("GHS"))
+
+if st.button("Convert"):
+    try:
+        converted_amount = CurrencyConverter.convert(amount, from_currency, to_currency)
+        st.success(f"""
+        **{amount:.2f} {from_currency} = {converted_amount:.2f} {to_currency}**
+        """)
+
+        reverse_amount = CurrencyConverter.convert(1, to_currency, from_currency)
+        st.caption(f"1 {to_currency} ≈ {reverse_amount:.4f} {from_currency}")
+    except Exception as e:
+        st.error(f"Conversion failed: {str(e)}")
+
+st.caption("ℹ Rates update every 24 hours. For investments, verify with your bank.")
@@ -0,0 +1,46 @@
+"""Deposit page with Paystack checkout and verification"""
+import streamlit as st
+from backend import Account, initiate_deposit, verify_payment
+from ui import poll_task, start_task
+
+user = st.session_state.logged_in_user
+st.header("Deposit Money")
+
+method = st.selectbox("Payment Method", ["card", "momo"])
+amount = st.number_input("Amount to Deposit", min_value=0.01, step=0.01, format="%.2f")
+pin = st.text_input("Enter 4‑digit PIN", type="password", max_chars=4, key="deposit_pin")
+if st.button("Proceed to Pay"):
+    if not Account.find_by_login(user.username, user.account_number, pin):
+        st.error("Invalid PIN. Deposit cancelled.")
+    elif "deposit_init" not in st.session_state.tasks:
+        start_task("deposit_init", "Initialise deposit", initiate_deposit, user, amount, method)
+
+if "deposit_init" in st.session_state.tasks:
+    task = poll_task("deposit_init", "Contacting Paystack...")
+    if task and task.status == "failed":
+        st.error(f"Could not initialise payment: {task.error}")
+    elif task:
+        auth_url, ref = task.result
+        st.session_state.deposit_ref = ref
+        st.success("Payment initialized. Complete payment:")
+        st.markdown(f"[Pay Now]({auth_url})", unsafe_allow_html=True)
+        st.info("After completing payment, click 'Verify Payment' below to update your balance.")
+
+# Verification step
+if 'deposit_ref' in st.session_state:
+    if st.button("Verify Payment") and "deposit_verify" not in st.session_state.tasks:
+        start_task("deposit_verify", "Verify deposit", verify_payment, st.session_state.deposit_ref)
+
+    if "deposit_verify" in st.session_state.tasks:
+        task = poll_task("deposit_verify", "Verifying payment...")
+        if task and task.status == "failed":
+            st.error(f"Verification failed: {task.error}")
+        elif task and task.result == 'success':
+            # Refresh user object
+            user = Account.get_by_account_number(user.account_number)
+            st.session_state.logged_in_user = user
+            # Once credited, clear the ref to prevent re-verification
+            del st.session_state['deposit_ref']
+            st.success(f"Payment successful! New balance: ₵{user.balance:,.2f}")
+        elif task:
+            st.warning(f"Payment status: {task.result}")
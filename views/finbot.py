@@ -0,0 +1,23 @@
+"""Finbot: financial literacy chatbot"""
+import streamlit as st
+from backend import finance_chatbot
+
+st.subheader("Financial Literacy Bot")
+
+user_input = st.text_input("Ask me about saving, investing, or debt:")
+
+if user_input:
+    response = finance_chatbot.get_response(user_input)
+    st.markdown(f"""
+    <div style="background:#f0f2f6; padding:10px; border-radius:5px;">
+        <strong>AI Assistant:</strong> {response}
+    </div>
+    """, unsafe_allow_html=True)
+
+st.markdown("**Try asking:**")
+st.markdown("- How to save money?")
+st.markdown("- Best investment options?")
+st.markdown("- What is compound interest?")
+st.markdown("- How to get out of debt?")
+st.markdown("- Explain inflation")
+st.markdown("- How does credit score work?")
@@ -0,0 +1,121 @@
+"""Transaction history with keyset pagination and statement downloads"""
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import query_tracing
+from statements import Statement, write_statement_csv, write_statement_pdf
+from ui import format_currency
+
+user = st.session_state.logged_in_user
+st.header("Transaction History")
+
+# Cursor stack: history_cursors[i] is the keyset cursor page i starts after
+if 'history_cursors' not in st.session_state:
+    st.session_state.history_cursors = [None]
+    st.session_state.history_filters = {}
+
+with st.form("history_filters_form"):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        types = st.multiselect("Type", [
+            "Deposit", "Withdrawal", "Transfer In", "Transfer Out",
+            "Savings Contribution", "Savings Withdrawal"
+        ])
+    with col2:
+        start_date = st.date_input("From", value=None)
+        end_date = st.date_input("To", value=None)
+    with col3:
+        min_amount = st.number_input("Min Amount", min_value=0.0, value=None, format="%.2f")
+        max_amount = st.number_input("Max Amount", min_value=0.0, value=None, format="%.2f")
+    page_size = st.selectbox("Rows per page", [20, 50, 100])
+
+    if st.form_submit_button("Apply Filters"):
+        st.session_state.history_filters = {
+            "types": types,
+            "start_date": start_date.strftime('%Y-%m-%d') if start_date else None,
+            "end_date": end_date.strftime('%Y-%m-%d') if end_date else None,
+            "min_amount": min_amount,
+            "max_amount": max_amount,
+        }
+        st.session_state.history_page_size = page_size
+        st.session_state.history_cursors = [None]
+
+page_size = st.session_state.get("history_page_size", 20)
+cursors = st.session_state.history_cursors
+rows, next_cursor = user.get_history_page(
+    after=cursors[-1],
+    page_size=page_size,
+    filters=st.session_state.history_filters
+)
+
+if rows:
+    df = pd.DataFrame(rows, columns=["ID", "Type", "Amount", "Description", "Timestamp", "Reference"])
+    st.dataframe(df.drop(columns=["ID"]), use_container_width=True, hide_index=True)
+else:
+    st.info("No transactions match these filters")
+
+col1, col2, col3 = st.columns([1, 2, 1])
+with col1:
+    if st.button("← Newer", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+with col2:
+    st.caption(f"Page {len(cursors)}")
+with col3:
+    if st.button("Older →", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+
+if rows:
+    selected_ref = st.selectbox("Transaction", [row[5] for row in rows])
+    if st.button("View Receipt"):
+        st.session_state.receipt_data = user.get_transaction_by_reference(selected_ref)
+        st.session_state.page = "receipt"
+        st.rerun()
+
+with st.expander("📄 Download Statement"):
+    with st.form("statement_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            statement_start = st.date_input("Statement From", value=datetime.now().date().replace(day=1))
+        with col2:
+            statement_end = st.date_input("Statement To", value=datetime.now().date())
+        with col3:
+            statement_format = st.radio("Format", ["CSV", "PDF"], horizontal=True)
+        generate = st.form_submit_button("Generate Statement")
+
+    if generate:
+        if statement_start > statement_end:
+            st.error("Start date must be before end date")
+        else:
+            # Stream rows into a temp file on a dedicated read connection
+            with st.spinner("Generating statement..."):
+                statement_conn = query_tracing.connect("bank.db")
+                try:
+                    statement = Statement(
+                        statement_conn, user.account_number,
+                        statement_start.strftime('%Y-%m-%d'),
+                        statement_end.strftime('%Y-%m-%d')
+                    )
+                    with tempfile.TemporaryFile() as statement_file:
+                        if statement_format == "CSV":
+                            write_statement_csv(statement, statement_file)
+                        else:
+                            write_statement_pdf(statement, statement_file)
+                        statement_file.seek(0)
+                        statement_data = statement_file.read()
+                finally:
+                    statement_conn.close()
+
+            st.write(f"**Opening balance:** {format_currency(statement.opening_balance)} | "
+                     f"**Closing balance:** {format_currency(statement.closing_balance)} | "
+                     f"**Transactions:** {statement.transaction_count}")
+            st.download_button(
+                label=f"Download {statement_format}",
+                data=statement_data,
+                file_name=f"statement_{user.account_number}_{statement.start_date}_{statement.end_date}.{statement_format.lower()}",
+                mime="text/csv" if statement_format == "CSV" else "application/pdf"
+            )
@@ -0,0 +1,330 @@
+"""Home page: balance, quick actions, account overview and recent transactions"""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from ui import db, format_currency, get_time_of_day, get_transaction_icon, picture_html, timed_fragment
+
+_, cursor = db()
+
+def load_monthly_totals(account_number, outgoing):
+    """Totals per month for the last 6 months of money out (outgoing) or in"""
+    cursor.execute(f"""
+        SELECT strftime('%Y-%m', timestamp) as month, 
+               SUM(amount) as total 
+        FROM transactions 
+        WHERE account_number=? AND amount {'<' if outgoing else '>'} 0
+        GROUP BY strftime('%Y-%m', timestamp)
+        ORDER BY month DESC
+        LIMIT 6
+    """, (account_number,))
+    return cursor.fetchall()
+
+@timed_fragment("Account overview")
+def dashboard_analytics(account_number):
+    col1, col2 = st.columns(2)
+    with col1:
+        with st.container():
+            st.markdown("#### 💸 Spending Analytics")
+            spending_data = load_monthly_totals(account_number, outgoing=True)
+            
+            if spending_data:
+                df = pd.DataFrame(spending_data, columns=['Month', 'Amount'])
+                df['Amount'] = df['Amount'].abs()
+                df['Month'] = pd.to_datetime(df['Month'])
+                
+                # Use native Streamlit chart with style enhancements
+                st.area_chart(
+                    df.set_index('Month'), 
+                    color="#ae2012",
+                    use_container_width=True,
+                    height=200
+                )
+            else:
+                st.info("No spending data available")
+
+    with col2:
+        with st.container():
+            st.markdown("#### 💰 Income Analytics")
+            income_data = load_monthly_totals(account_number, outgoing=False)
+            
+            if income_data:
+                df = pd.DataFrame(income_data, columns=['Month', 'Amount'])
+                df['Month'] = pd.to_datetime(df['Month'])
+                
+                st.area_chart(
+                    df.set_index('Month'), 
+                    color="#0a9396",
+                    use_container_width=True,
+                    height=200
+                )
+            else:
+                st.info("No income data available")
+
+@timed_fragment("Recent transactions")
+def recent_transactions(user):
+    history = user.get_transaction_history(5)
+    if history:
+        for txn in history:
+            txn_type, amt, desc, ts, ref = txn
+            color = "#0a9396" if amt > 0 else "#ae2012"
+            icon = get_transaction_icon(txn_type)
+            
+            st.markdown(f"""
+                <div class='transaction-item'>
+                    <div style='font-size: 24px; margin-right: 16px;'>{icon}</div>
+                    <div style='flex: 1;'>
+                        <div style='font-weight: 600;'>{txn_type}</div>
+                        <div style='font-size: 14px; color: #666;'>{desc}</div>
+                        <div style='font-size: 12px; color: #999;'>{ts}</div>
+                    </div>
+                    <div style='
+                        font-weight: 700;
+                        color: {color};
+                        font-size: 18px;
+                    '>
+                        {format_currency(amt)}
+                    </div>
+                </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.info("No transactions yet")
+
+    if st.button("View full history", key="view_history"):
+        st.session_state.page = "history"
+        st.rerun()
+
+
+user = st.session_state.logged_in_user
+
+# (image in assets/, title, description)
+CAROUSEL_SLIDES = [
+    ("5.jpg", '"XXXXXXXX XXXXXX XXXX"', "XXXXX XXXXXXXXX XXXXXXXXXX XXXXXXXXXXXXX XXXXXXXXXXXX XXXXXXXXXXXX..."),
+    ("7.png", '"XXXXXX XXXXXXXX XXXXXXXXX"', "XXXXXXX XXXXXXXXXXX XXXXXXXX XXXXXXXXXXX XXXXX XXXXXXXXX ..."),
+    ("6.jpg", '"The Gate Keeper"', "XXXXXXX XXXXXXXXXXXXX XXXXXXXXXX XXXXXXXXXXXXXXm..."),
+    ("8.png", '"Last Trace Of Us"', "Lorem ipsum dolor sit amet consectetur adipisicing elit. Tempore fuga voluptatum..."),
+]
+carousel_slides = "\n".join(f"""    <li class='item'>
+    {picture_html(image)}
+    <div class='content'>
+        <h2 class='title'>{title}</h2>
+        <p class='description'>{description}</p>
+        <button>Read More</button>
+    </div>
+    </li>""" for image, title, description in CAROUSEL_SLIDES)
+
+carousel_html = """
+<style>
+* { margin: 0; padding: 0; box-sizing: border-box; }
+/* Allow overflow so off-screen slides aren’t clipped */
+body {
+    height: 100vh;
+    display: grid;
+    place-items: center;
+}
+
+main {
+    position: relative;
+    width: 100%;
+    height: 100%;
+    box-shadow: 0 3px 10px rgba(0,0,0,0.3);
+    overflow: visible;
+}
+
+.slider {
+    position: relative;
+    list-style: none;
+    height: 100%;
+}
+
+
+.item {
+    width: 200px;
+    height: 300px;
+    position: absolute;
+    top: 50%;
+    transform: translateY(-50%);
+    overflow: hidden;
+    border-radius: 20px;
+    box-shadow: 0 20px 30px rgba(255,255,255,0.3) inset;
+    transition: transform 0.1s, left 0.75s, top 0.75s, width 0.75s, height 0.75s;
+}
+
+/* Slide images come from static/, see build_assets.py */
+.item picture,
+.item img {
+    position: absolute;
+    inset: 0;
+    width: 100%;
+    height: 100%;
+    object-fit: cover;
+    border-radius: inherit;
+}
+
+/* Center slide styling */
+.item:nth-child(1),
+.item:nth-child(2) {
+    left: 0;
+    top: 0;
+    width: 100%;
+    height: 100%;
+    transform: none;
+    border-radius: 0;
+    box-shadow: none;
+    opacity: 1;
+}
+
+.item:nth-child(3) { left: 50%; }
+.item:nth-child(4) { left: calc(50% + 220px); }
+.item:nth-child(5) { left: calc(50% + 440px); }
+.item:nth-child(6) { left: calc(50% + 660px); opacity: 0; }
+
+.content {
+    width: min(30vw,400px);
+    position: absolute;
+    top: 50%;
+    left: 3rem;
+    transform: translateY(-50%);
+    font: 400 0.85rem helvetica,sans-serif;
+    color: white;
+    text-shadow: 0 3px 8px rgba(0,0,0,0.5);
+    opacity: 0;
+    display: none;
+}
+
+.content .title {
+    font-family: 'arial-black';
+    text-transform: uppercase;
+}
+
+.content .description {
+    line-height: 1.7;
+    margin: 1rem 0 1.5rem;
+    font-size: 0.8rem;
+}
+
+.content button {
+    width: fit-content;
+    background-color: rgba(0,0,0,0.1);
+    color: white;
+    border: 2px solid white;
+    border-radius: 0.25rem;
+    padding: 0.75rem;
+    cursor: pointer;
+}
+
+.item:nth-of-type(2) .content {
+    display: block;
+    animation: show 0.75s ease-in-out 0.3s forwards;
+}
+
+@keyframes show {
+    0% {
+    filter: blur(5px);
+    transform: translateY(calc(-50% + 75px));
+    }
+    100% {
+    opacity: 1;
+    filter: blur(0);
+    }
+}
+
+.nav {
+    position: absolute;
+    bottom: 2rem;
+    left: 50%;
+    transform: translateX(-50%);
+    z-index: 5;
+    user-select: none;
+}
+
+.nav .btn {
+    font-size: 1rem;
+    line-height: 1;
+    background-color: rgba(255,255,255,0.5);
+    color: rgba(0,0,0,0.7);
+    border: 2px solid rgba(0,0,0,0.6);
+    margin: 0 0.25rem;
+    padding: 0.75rem;
+    border-radius: 50%;
+    cursor: pointer;
+}
+
+.nav .btn:hover {
+    background-color: rgba(255,255,255,0.3);
+}
+</style>
+
+
+<main>
+<ul class='slider'>
+""" + carousel_slides + """
+</ul>
+<nav class='nav'>
+    <button class='btn prev' aria-label='Previous'>&#8592;</button>
+    <button class='btn next' aria-label='Next'>&#8594;</button>
+</nav>
+</main>
+
+<script>
+const slider = document.querySelector('.slider');
+function activate(e) {
+    const items = document.querySelectorAll('.item');
+    if (e.target.matches('.next')) slider.append(items[0]);
+    if (e.target.matches('.prev')) slider.prepend(items[items.length-1]);
+}
+document.addEventListener('click', activate, false);
+</script>
+"""
+
+# Embed with enough height to show the full width
+components.html(carousel_html, height=400, scrolling=True)
+
+st.markdown(f"""
+    <div style='display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px;'>
+        <div>
+            <h1 style='margin-bottom: 0;'>Good {get_time_of_day()}, {user.name.split()[0]}</h1>
+            <p style='color: #666; margin-top: 4px;'>
+                Account: {user.account_number} | Last login: {datetime.now().strftime('%b %d, %Y %I:%M %p')}
+            </p>
+        </div>
+        <div style='background: var(--primary); color: white; padding: 12px 20px; border-radius: 10px; text-align: center;'>
+            <p style='margin: 0; font-size: 14px;'>Available Balance</p>
+            <h2 style='margin: 0; color: white;'>{format_currency(user.balance)}</h2>
+        </div>
+    </div>
+""", unsafe_allow_html=True)
+
+st.markdown("---")
+
+
+
+
+# Quick Actions with Icon Buttons
+st.subheader("Quick Actions")
+action_cols = st.columns(3)
+with action_cols[0]:
+    if st.button("💳 Deposit", key="quick_deposit", use_container_width=True):
+        st.session_state.page = "deposit"
+        st.rerun()
+with action_cols[1]:
+    if st.button("🏧 Withdraw", key="quick_withdraw", use_container_width=True):
+        st.session_state.page = "withdraw"
+        st.rerun()
+with action_cols[2]:
+    if st.button("↗️ Transfer", key="quick_transfer", use_container_width=True):
+        st.session_state.page = "transfer"
+        st.rerun()
+
+
+# Account Overview Section
+st.markdown("---")
+st.subheader("Account Overview")
+dashboard_analytics(user.account_number)
+
+# Recent Transactions with Enhanced UI
+st.markdown("---")
+st.subheader("Recent Transactions")
+recent_transactions(user)
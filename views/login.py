@@ -0,0 +1,39 @@
+"""Login page"""
+import streamlit as st
+from backend import Account
+from ui import asset_file
+
+col1, col2 = st.columns([1,2])
+with col1:
+    st.image(asset_file("wb.png", 300), width=150)  # 2x variant for high-DPI screens
+    st.markdown("""
+        <h2 style='color: #2563eb;'>Welcome Back</h2>
+        <p style='color: #64748b;'>Securely access your accounts</p>
+    """, unsafe_allow_html=True)
+with col2:
+    with st.container(border=True):
+        st.markdown("#### Sign In")
+        with st.form("login_form"):
+            username = st.text_input("Username", placeholder="Enter your username")
+            account_number = st.text_input("Account Number", placeholder="10-digit account number")
+            pin = st.text_input("PIN", type="password", placeholder="4-digit PIN", max_chars=4)
+
+            if st.form_submit_button("Login", type="primary"):
+                user = Account.find_by_login(username, account_number, pin)
+                if user:
+                    if not user.is_active:
+                        st.error("Account is frozen. Please contact support.")
+                    else:
+                        st.session_state.logged_in_user = user
+                        st.session_state.page = "dashboard"
+                        st.rerun()
+                else:
+                    st.error("Invalid credentials. Please try again.")
+
+        st.markdown("---")
+        st.markdown("""
+            <div style='text-align: center;'>
+                <p>Don't have an account? <a href='#' onclick='window.streamlit:componentBridge.setValue("register")'>Sign up</a></p>
+                <p><a href='#'>Forgot PIN?</a></p>
+            </div>
+        """, unsafe_allow_html=True)
@@ -0,0 +1,122 @@
+"""Savings goals planner"""
+from datetime import datetime
+
+import streamlit as st
+from backend import savings_predictor
+from ui import format_currency
+
+user = st.session_state.logged_in_user
+st.header("Savings Goals")
+
+tab1, tab2 = st.tabs(["My Goals", "New Goal"])
+
+with tab1:
+    goals = user.get_savings_goals()
+    if goals:
+        for goal in goals:
+            goal_id, name, target, current, target_date, created_at = goal
+            progress = min(current / target * 100, 100)
+            remaining = max(0, target - current)
+            days_remaining = (datetime.strptime(target_date, "%Y-%m-%d") - datetime.now()).days
+
+            with st.expander(f"{name} - {progress:.1f}% complete"):
+                st.write(f"**Target:** {format_currency(target)} by {target_date}")
+                st.write(f"**Saved:** {format_currency(current)}")
+                st.write(f"**Remaining:** {format_currency(remaining)}")
+                st.progress(int(progress))
+
+                # Add prediction
+                prediction = savings_predictor.predict_achievement_date(goal_id, user.account_number)
+
+                if "Current daily average" in prediction:
+                    parts = prediction.split("\n")
+                    st.info(f"**{parts[0]}**")
+                    st.info(f"**{parts[1]}**")
+                    if "on track" in parts[2]:
+                        st.success(f"**Status:** {parts[2]}")
+                    else:
+                        st.warning(f"**Status:** {parts[2]}")
+                else:
+                    st.info(f"**Prediction:** {prediction}")
+
+                # Daily savings needed calculation
+                if days_remaining > 0:
+                    daily_needed = remaining / days_remaining
+                    st.warning(f"**Daily savings needed:** {format_currency(daily_needed)}")
+                else:
+                    st.error("Target date has passed!")
+
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    # Add Funds Button
+                    with st.form(key=f"add_form_{goal_id}"):
+                        add_amount = st.number_input(
+                            "Amount to add",
+                            min_value=0.01,
+                            max_value=float(user.balance),
+                            key=f"add_amount_{goal_id}",
+                            step=0.01,
+                            format="%.2f"
+                        )
+                        if st.form_submit_button("Add Funds"):
+                            if user.balance < add_amount:
+                                st.error("Insufficient account balance")
+                            else:
+                                success, msg = user.contribute_to_goal(goal_id, add_amount)
+                                if success:
+                                    st.success(msg)
+                                    st.rerun()
+                                else:
+                                    st.error(msg)
+
+                with col2:
+                    # Withdraw Button - Only show if current balance > 0
+                    if current > 0:
+                        with st.form(key=f"withdraw_form_{goal_id}"):
+                            withdraw_amount = st.number_input(
+                                "Amount to withdraw",
+                                min_value=0.01,
+                                max_value=float(current),
+                                key=f"withdraw_amount_{goal_id}",
+                                step=0.01,
+                                format="%.2f"
+                            )
+                            if st.form_submit_button("Withdraw"):
+                                if current < withdraw_amount:
+                                    st.error("Insufficient funds in goal")
+                                else:
+                                    success, msg = user.withdraw_from_goal(goal_id, withdraw_amount)
+                                    if success:
+                                        st.success(msg)
+                                        st.rerun()
+                                    else:
+                                        st.error(msg)
+                    else:
+                        st.write("No funds available to withdraw")
+
+                with col3:
+                    if st.button(f"Delete", key=f"delete_{goal_id}"):
+                        if user.delete_savings_goal(goal_id):
+                            st.success("Goal deleted")
+                            st.rerun()
+                        else:
+                            st.error("Failed to delete goal")
+
+
+with tab2:
+    with st.form("new_goal_form"):
+        goal_name = st.text_input("Goal Name", max_chars=30)
+        target_amount = st.number_input("Target Amount", min_value=0.01, format="%.2f")
+        target_date = st.date_input("Target Date", min_value=datetime.now().date())
+
+        if st.form_submit_button("Create Goal"):
+            if goal_name and target_amount:
+                goal_id = user.create_savings_goal(
+                    goal_name, 
+                    target_amount, 
+                    target_date.strftime('%Y-%m-%d')
+                )
+                st.success(f"Goal '{goal_name}' created successfully!")
+                st.rerun()
+            else:
+                st.error("Please fill all fields")
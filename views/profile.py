@@ -0,0 +1,53 @@
+"""Profile page"""
+import streamlit as st
+from ui import format_currency, validate_pin
+
+user = st.session_state.logged_in_user
+st.header("My Profile")
+
+with st.form("profile_form"):
+    st.subheader("Personal Information")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        name = st.text_input("Full Name", value=user.name)
+        username = st.text_input("Username", value=user.username)
+        account_number = st.text_input("Account Number", value=user.account_number, disabled=True)
+
+    with col2:
+        national_id = st.text_input("National ID", value=user.national_id)
+        address = st.text_area("Address", value=user.address)
+        balance = st.text_input("Account Balance", value=format_currency(user.balance), disabled=True)
+
+    st.subheader("Security")
+    current_pin = st.text_input("Current PIN", type="password", max_chars=4)
+    new_pin = st.text_input("New PIN (leave blank to keep current)", type="password", max_chars=4)
+    confirm_pin = st.text_input("Confirm New PIN", type="password", max_chars=4)
+
+    if st.form_submit_button("Update Profile"):
+        user.name = name
+        user.username = username
+        user.national_id = national_id
+        user.address = address
+
+        pin_changed = False
+        if new_pin:
+            if not current_pin or current_pin != user.pin:
+                st.error("Current PIN is incorrect")
+            elif new_pin != confirm_pin:
+                st.error("New PINs don't match")
+            elif not validate_pin(new_pin):
+                st.error("PIN must be 4 digits")
+            else:
+                user.pin = new_pin
+                pin_changed = True
+
+        try:
+            user.update_profile_in_db()
+            st.success("Profile updated successfully!")
+            if pin_changed:
+                st.success("PIN changed successfully!")
+            st.session_state.logged_in_user = user
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error updating profile: {str(e)}")
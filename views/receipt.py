@@ -0,0 +1,49 @@
+"""Receipt page"""
+from io import StringIO
+
+import streamlit as st
+from backend import ReceiptGenerator, transaction_classifier
+
+user = st.session_state.logged_in_user
+transaction = st.session_state.receipt_data
+
+st.header("Transaction Receipt")
+transfer_notice = st.session_state.pop("transfer_notice", None)
+if transfer_notice:
+    st.success(transfer_notice)
+    st.balloons()
+
+if transaction:
+    receipt = ReceiptGenerator.generate_receipt(transaction, user)
+    st.code(receipt)
+
+    # Create downloadable receipt
+    receipt_io = StringIO()
+    receipt_io.write(receipt)
+    st.download_button(
+        label="Download Receipt",
+        data=receipt_io.getvalue(),
+        file_name=f"receipt_{transaction[4]}.txt",
+        mime="text/plain"
+    )
+
+    # Category correction feeds the classifier's incremental training
+    categories = transaction_classifier.categories
+    current_category = user.get_transaction_category(transaction[4])
+    st.write(f"**Category:** {current_category or 'Uncategorized'}")
+    with st.form("category_form"):
+        new_category = st.selectbox(
+            "Correct category",
+            categories,
+            index=categories.index(current_category) if current_category in categories else 0
+        )
+        if st.form_submit_button("Update Category"):
+            success, msg = user.correct_transaction_category(transaction[4], new_category)
+            if success:
+                st.success(msg)
+            else:
+                st.error(msg)
+
+if st.button("Back to Dashboard"):
+    st.session_state.page = "dashboard"
+    st.rerun()
@@ -0,0 +1,34 @@
+"""Registration page"""
+import streamlit as st
+from backend import Account
+from ui import validate_phone, validate_pin
+
+st.header("Register Account")
+with st.form("registration_form"):
+    full_name = st.text_input("Full Name*", max_chars=50)
+    username = st.text_input("Username*", max_chars=20)
+    national_id = st.text_input("National ID*", max_chars=20)
+    phone = st.text_input("Phone (10-digit)*", max_chars=10)
+    address = st.text_area("Address", max_chars=100)
+    pin = st.text_input("4-digit PIN*", type="password", max_chars=4)
+    pin_confirm = st.text_input("Confirm PIN*", type="password", max_chars=4)
+
+    submitted = st.form_submit_button("Create Account")
+    if submitted:
+        if not all([full_name, username, national_id, phone, pin, pin_confirm]):
+            st.error("Please fill all required fields (*)")
+        elif pin != pin_confirm:
+            st.error("PINs don't match!")
+        elif not validate_phone(phone):
+            st.error("Phone must be 10 digits")
+        elif not validate_pin(pin):
+            st.error("PIN must be 4 digits")
+        else:
+            try:
+                acc = Account(full_name, phone, pin, username, national_id, address)
+                acc.save_to_db()
+                st.success(f"Account created successfully! Your account number is: {phone}")
+                st.session_state.page = "login"
+                st.rerun()
+            except Exception as e:
+                st.error(f"Registration failed: {str(e)}")
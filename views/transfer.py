@@ -0,0 +1,62 @@
+"""Transfer money page"""
+import streamlit as st
+from backend import Account
+from ui import format_currency
+
+user = st.session_state.logged_in_user
+st.header("Transfer Money")
+
+if user.balance <= 0:
+    st.warning("Your account balance is zero. You cannot make any transfers.")
+    if st.button("Back to Dashboard"):
+        st.session_state.page = "dashboard"
+        st.rerun()
+else:
+    st.success(f"Available Balance: {format_currency(user.balance)}")
+
+    with st.form("transfer_form"):
+        recipient_acc = st.text_input(
+            "Recipient Account Number", 
+            placeholder="Enter 10-digit account/phone number"
+        )
+
+        amount = st.number_input(
+            "Amount",
+            min_value=0.01,
+            max_value=float(user.balance),
+            step=0.01,
+            format="%.2f",
+            help=f"Maximum transferable: {format_currency(user.balance)}"
+        )
+
+        pin = st.text_input("Enter 4‑digit PIN", type="password", max_chars=4, key="deposit_pin")
+
+        submitted = st.form_submit_button("Send Money")
+
+        if submitted:
+            if not Account.find_by_login(user.username, user.account_number, pin):
+                st.error("Invalid PIN. Deposit cancelled.")
+
+            elif not recipient_acc.isdigit() or len(recipient_acc) != 10:
+                st.error("Account number must be 10 digits")
+            elif amount <= 0:
+                st.error("Amount must be positive")
+            elif recipient_acc == user.account_number:
+                st.error("Cannot transfer to your own account")
+            else:
+                with st.spinner("Processing transfer..."):
+                    reference_id, message = user.send_money(recipient_acc, amount)
+                    if reference_id:
+                        # Confirmed on the receipt page, which is shown straight away
+                        st.session_state.transfer_notice = (
+                            f"Transfer successful!\n"
+                            f"**{format_currency(amount)}** sent to account **{recipient_acc}**"
+                        )
+
+                        # Get transaction details for receipt
+                        transaction = user.get_transaction_by_reference(reference_id)
+                        st.session_state.receipt_data = transaction
+                        st.session_state.page = "receipt"
+                        st.rerun()
+                    else:
+                        st.error(f"Transfer failed: {message}")
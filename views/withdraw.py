@@ -0,0 +1,43 @@
+"""Withdrawal page with Paystack transfers"""
+import streamlit as st
+from backend import Account, initiate_withdrawal, verify_withdrawal
+from ui import poll_task, start_task
+
+user = st.session_state.logged_in_user
+st.header("Withdraw Money to Mobile Money")
+
+st.write(f"Available Balance: {user.balance:,.2f} ₵")
+momo = st.text_input("Mobile Money Number (10 digits)")
+amount = st.number_input("Amount to Withdraw", min_value=0.01, max_value=float(user.balance), step=0.01)
+pin = st.text_input("Enter 4‑digit PIN", type="password", max_chars=4, key="deposit_pin")
+
+if st.button("Initiate Withdrawal"):
+    if not Account.find_by_login(user.username, user.account_number, pin):
+        st.error("Invalid PIN. Deposit cancelled.")
+    elif "withdraw_init" not in st.session_state.tasks:
+        start_task("withdraw_init", "Initiate withdrawal", initiate_withdrawal, user, amount, momo)
+
+if "withdraw_init" in st.session_state.tasks:
+    task = poll_task("withdraw_init", "Sending to Mobile Money...")
+    if task and task.status == "failed":
+        st.error(f"Error: {task.error}")
+    elif task:
+        st.session_state.withdraw_ref = task.result
+        st.success("Withdrawal initiated. It may take a few minutes.")
+        st.info("Click 'Verify Withdrawal' to update status.")
+
+if 'withdraw_ref' in st.session_state:
+    if st.button("Verify Withdrawal") and "withdraw_verify" not in st.session_state.tasks:
+        start_task("withdraw_verify", "Verify withdrawal", verify_withdrawal, st.session_state.withdraw_ref)
+
+    if "withdraw_verify" in st.session_state.tasks:
+        task = poll_task("withdraw_verify", "Checking withdrawal status...")
+        if task and task.status == "failed":
+            st.error(f"Verification failed: {task.error}")
+        elif task and task.result.lower() == 'success':
+            del st.session_state['withdraw_ref']
+            user = Account.get_by_account_number(user.account_number)
+            st.session_state.logged_in_user = user
+            st.success(f"Withdrawal successful! New balance: {user.balance:,.2f} ₵")
+        elif task:
+            st.warning(f"Withdrawal status: {task.result}")
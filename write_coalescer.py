@@ -0,0 +1,184 @@
+"""Group commit for the ledger writes.
+
+Deposits, withdrawals, transfers and the other balance changes hand their
+statements to one writer thread as a function of a cursor. The writer takes
+the operations that queued up, up to ``MAX_BATCH`` of them, and runs them
+in a single transaction,
+each inside its own savepoint: an operation that raises is rolled back on
+its own and its caller gets the exception, while the rest commit together.
+Callers wait on a Future that resolves once their batch has committed, so
+a returned result is durable to the configured ``synchronous`` level.
+
+While writes contend (more were queued, or the last batch held more than
+one) the writer waits up to ``FLUSH_MS`` after the first operation for
+others to join the batch; a lone write is committed straight away.
+
+    WIREBUDDY_COMMIT_WINDOW_MS  longest wait for more operations (default 2)
+    WIREBUDDY_COMMIT_BATCH      most operations per transaction (default 64, 1 commits each one)
+    WIREBUDDY_SYNCHRONOUS       PRAGMA synchronous of the writer: OFF, NORMAL, FULL (default), EXTRA
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import metrics_exporter
+import query_tracing
+
+
+DB_PATH = "bank.db"
+FLUSH_MS = float(os.environ.get("WIREBUDDY_COMMIT_WINDOW_MS", "2"))
+MAX_BATCH = int(os.environ.get("WIREBUDDY_COMMIT_BATCH", "64"))
+SYNCHRONOUS = os.environ.get("WIREBUDDY_SYNCHRONOUS", "FULL").upper()
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+MAX_RETRIES = 5
+RETRY_DELAY = 0.2  # seconds
+LOCK_TIMEOUT = 30  # seconds SQLite waits for another connection's lock
+
+
+class _Operation:
+    __slots__ = ("fn", "args", "kwargs", "future", "result")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.result = None
+
+
+class WriteCoalescer:
+    def __init__(self, path=DB_PATH, flush_ms=FLUSH_MS, max_batch=MAX_BATCH, synchronous=SYNCHRONOUS):
+        if synchronous not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"synchronous must be one of {', '.join(SYNCHRONOUS_LEVELS)}, not {synchronous}")
+        self.path = path
+        self.flush_ms = flush_ms
+        self.max_batch = max(1, max_batch)
+        self.synchronous = synchronous
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.operations = 0
+        self._last_batch = 0
+
+    def _start(self):
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-coalescer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(cursor, *args, **kwargs) for the next batch; returns a Future of its result"""
+        if self._thread is None:
+            self._start()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Write operations cannot submit further write operations")
+        op = _Operation(fn, args, kwargs)
+        self.queue.put(op)
+        return op.future
+
+    def execute(self, fn, *args, **kwargs):
+        """Run fn(cursor, *args, **kwargs) in the next batch and return its result once committed"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def execute_sql(self, sql, params=()):
+        """Run one statement in the next batch; returns its rowcount once committed"""
+        return self.execute(lambda cursor: cursor.execute(sql, params).rowcount)
+
+    def close(self):
+        """Stop the writer thread once the queued operations are committed"""
+        with self.lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+
+    def _next_batch(self):
+        first = self.queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        contended = self._last_batch > 1 or not self.queue.empty()
+        deadline = time.perf_counter() + (self.flush_ms / 1000 if contended else 0)
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                op = self.queue.get(block=remaining > 0, timeout=max(remaining, 0) or None)
+            except queue.Empty:
+                break
+            if op is None:
+                self.queue.put(None)  # stop after this batch
+                break
+            batch.append(op)
+        return batch
+
+    def _apply(self, cursor, batch):
+        """Run the batch in one transaction; returns the operations that succeeded"""
+        cursor.execute("BEGIN IMMEDIATE")
+        applied = []
+        for op in batch:
+            cursor.execute("SAVEPOINT op")
+            try:
+                op.result = op.fn(cursor, *op.args, **op.kwargs)
+            except Exception as e:
+                cursor.execute("ROLLBACK TO op")
+                cursor.execute("RELEASE op")
+                op.future.set_exception(e)
+                continue
+            cursor.execute("RELEASE op")
+            applied.append(op)
+        cursor.execute("COMMIT")
+        return applied
+
+    def _commit(self, conn, cursor, batch):
+        for attempt in range(MAX_RETRIES):
+            try:
+                started = time.perf_counter()
+                applied = self._apply(cursor, batch)
+                metrics_exporter.WRITE_COMMIT_SECONDS.observe(time.perf_counter() - started)
+                return applied
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                # Operations that failed on their own have their exception set already
+                batch = [op for op in batch if not op.future.done()]
+                if "database is locked" in str(e) and attempt < MAX_RETRIES - 1:
+                    metrics_exporter.DB_LOCK_RETRIES.inc()
+                    time.sleep(RETRY_DELAY)
+                    continue
+                if "database is locked" in str(e):
+                    metrics_exporter.DB_LOCK_FAILURES.inc()
+                raise
+
+    def _run(self):
+        conn = query_tracing.connect(self.path, check_same_thread=False,
+                                     isolation_level=None, timeout=LOCK_TIMEOUT)
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        cursor = conn.cursor()
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                conn.close()
+                return
+            try:
+                applied = self._commit(conn, cursor, batch)
+            except Exception as e:
+                print(f"Write batch of {len(batch)} failed: {e}")
+                if conn.in_transaction:
+                    conn.rollback()
+                for op in batch:
+                    if not op.future.done():
+                        op.future.set_exception(e)
+                continue
+            self.batches += 1
+            self.operations += len(batch)
+            self._last_batch = len(batch)
+            metrics_exporter.WRITE_BATCH_SIZE.observe(len(batch))
+            for op in applied:
+                op.future.set_result(op.result)
+
+
+coalescer = WriteCoalescer()